@@ -5,6 +5,9 @@ This module contains adapters for different evaluation frameworks.
 Each adapter implements the BaseAdapter interface to convert framework-specific
 output to the standard data models.
 
+Adapters are registered in the registry and imported on first use, so
+importing this module does not pull in any framework's dependencies.
+
 Current implementations:
 - EvalScopeAdapter: For evalscope framework
 
@@ -15,35 +18,48 @@ Future implementations:
 """
 
 from .base import BaseAdapter
-from .evalscope import EvalScopeAdapter
-
-# Registry of available adapters
-ADAPTER_REGISTRY = {
-    "evalscope": EvalScopeAdapter,
-    # Future: "lm-harness": LMHarnessAdapter,
-    # Future: "opencompass": OpenCompassAdapter,
-}
-
-
-def get_adapter(framework: str) -> type:
-    """
-    Get adapter class by framework name
-
-    Args:
-        framework: Framework name (e.g., "evalscope")
+from .registry import (
+    ADAPTER_REGISTRY,
+    ENTRY_POINT_GROUP,
+    AdapterSpec,
+    available_frameworks,
+    detect_adapter,
+    get_adapter,
+    register_adapter,
+)
+from .sources import (
+    ARCHIVE_SUFFIXES,
+    DirectorySource,
+    RunSource,
+    TarSource,
+    ZipSource,
+    is_run_archive,
+    open_run_source,
+)
 
-    Returns:
-        Adapter class
 
-    Raises:
-        ValueError: If framework is not supported
-    """
-    if framework not in ADAPTER_REGISTRY:
-        available = ", ".join(ADAPTER_REGISTRY.keys())
-        raise ValueError(
-            f"Unsupported framework: {framework}. Available: {available}"
-        )
-    return ADAPTER_REGISTRY[framework]
+def __getattr__(name: str):
+    """Import adapter classes lazily (e.g. `from adapters import EvalScopeAdapter`)"""
+    if name == "EvalScopeAdapter":
+        return get_adapter("evalscope")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-__all__ = ["BaseAdapter", "EvalScopeAdapter", "get_adapter", "ADAPTER_REGISTRY"]
+__all__ = [
+    "BaseAdapter",
+    "RunSource",
+    "DirectorySource",
+    "ZipSource",
+    "TarSource",
+    "ARCHIVE_SUFFIXES",
+    "is_run_archive",
+    "open_run_source",
+    "EvalScopeAdapter",
+    "AdapterSpec",
+    "get_adapter",
+    "detect_adapter",
+    "register_adapter",
+    "available_frameworks",
+    "ADAPTER_REGISTRY",
+    "ENTRY_POINT_GROUP",
+]
@@ -6,7 +6,8 @@ This ensures consistency across different evaluation framework adapters.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
 
 from ..core.models import (
@@ -14,6 +15,8 @@ from ..core.models import (
     StandardBenchmarkResult,
     StandardSample,
 )
+from ..core.scheduler import MemoryBudget, estimate_dataset_memory, run_budgeted
+from .sources import RunSource, open_run_source
 
 
 class BaseAdapter(ABC):
@@ -26,16 +29,29 @@ class BaseAdapter(ABC):
     3. Converting to standard data models
     """
 
-    def __init__(self, raw_dir: str):
+    # Glob patterns (relative to a run directory) that identify this
+    # framework's output; used for per-run auto-detection
+    SIGNATURE: Tuple[str, ...] = ()
+
+    def __init__(self, raw_dir: Union[str, Path, RunSource]):
         """
         Initialize adapter with raw output directory
 
         Args:
-            raw_dir: Path to framework's raw output directory
+            raw_dir: Path to framework's raw output directory, or to an
+                archive of it (.tar.gz, .tar.zst, .zip, ...), or an open
+                RunSource (e.g. a run on a storage backend)
         """
-        self.raw_dir = Path(raw_dir)
-        if not self.raw_dir.exists():
-            raise FileNotFoundError(f"Raw directory not found: {raw_dir}")
+        if isinstance(raw_dir, RunSource):
+            self.source: RunSource = raw_dir
+            self.raw_dir = raw_dir.location
+        else:
+            # Read access to the run's files, from disk or from the archive
+            self.raw_dir = Path(raw_dir)
+            self.source = open_run_source(self.raw_dir)
+
+        # Worker processes used to parse a single large sample file
+        self.parse_workers = 1
 
     @abstractmethod
     def extract_meta(self) -> StandardRunMeta:
@@ -65,14 +81,15 @@ class BaseAdapter(ABC):
 
     @abstractmethod
     def extract_samples(
-        self, dataset: str, limit: int = 100
+        self, dataset: str, limit: Optional[int] = 100
     ) -> List[StandardSample]:
         """
         Extract sample predictions for a specific dataset
 
         Args:
             dataset: Dataset name
-            limit: Maximum number of samples to extract (default: 100)
+            limit: Maximum number of samples to extract (default: 100),
+                or None for all samples
 
         Returns:
             List[StandardSample]: List of standardized samples
@@ -82,14 +99,64 @@ class BaseAdapter(ABC):
         """
         pass
 
+    def iter_all_samples(
+        self, dataset: str, workers: int = 1
+    ) -> Iterator[StandardSample]:
+        """
+        Iterate over every sample of a dataset, in file order
+
+        Adapters that can parse one sample file in parallel override this;
+        the default extracts all samples at once.
+
+        Args:
+            dataset: Dataset name
+            workers: Number of worker processes to parse with
+
+        Yields:
+            StandardSample objects
+        """
+        yield from self.extract_samples(dataset, limit=None)
+
+    def iter_sample_scores(
+        self,
+        dataset: str,
+        metadata_fields: Sequence[str] = (),
+        workers: int = 1,
+    ) -> Iterator[Tuple[Any, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Iterate over the scores of every sample of a dataset
+
+        Used by the statistics stages, which need ids, scores and a few
+        metadata fields but not the sample texts. Adapters that can read
+        scores without decoding whole samples override this; the default
+        goes through iter_all_samples.
+
+        Args:
+            dataset: Dataset name
+            metadata_fields: Metadata fields to include
+            workers: Number of worker processes to parse with
+
+        Yields:
+            Tuples of (sample id, {metric: score}, {field: value}) with
+            only the requested metadata fields that are present
+        """
+        for sample in self.iter_all_samples(dataset, workers):
+            metadata = {
+                name: sample.metadata[name]
+                for name in metadata_fields
+                if name in sample.metadata
+            }
+            yield sample.id, sample.scores, metadata
+
     def extract_all_samples(
-        self, limit: int = 100
+        self, limit: Optional[int] = 100
     ) -> Dict[str, List[StandardSample]]:
         """
         Extract samples for all datasets
 
         Args:
-            limit: Maximum number of samples per dataset (default: 100)
+            limit: Maximum number of samples per dataset (default: 100),
+                or None for all samples
 
         Returns:
             Dict[str, List[StandardSample]]: Dictionary mapping dataset name to samples
@@ -97,16 +164,87 @@ class BaseAdapter(ABC):
         Raises:
             Exception: If sample extraction fails
         """
-        meta = self.extract_meta()
-        samples_by_dataset = {}
-        for dataset in meta.datasets:
+        return dict(self.iter_dataset_samples(limit))
+
+    def iter_dataset_samples(
+        self,
+        limit: Optional[int] = 100,
+        workers: int = 1,
+        budget: Optional[MemoryBudget] = None,
+    ) -> Iterator[Tuple[str, List[StandardSample]]]:
+        """
+        Extract the samples of every dataset, yielding each dataset when ready
+
+        With workers > 1 datasets are extracted concurrently in a thread
+        pool, largest first, with at most `workers` datasets and at most
+        `budget` estimated bytes in flight. Datasets are yielded in
+        completion order; a dataset's reservation is held until the caller
+        has handled it (e.g. written and released its samples). A dataset
+        that fails to extract is reported and yielded with no samples.
+
+        Args:
+            limit: Maximum number of samples per dataset (default: 100),
+                or None for all samples
+            workers: Number of datasets extracted concurrently
+            budget: Memory budget, possibly shared with other runs (default:
+                no limit)
+
+        Yields:
+            Tuples of (dataset name, samples)
+        """
+        datasets = self.extract_meta().datasets
+
+        def extract(dataset: str) -> List[StandardSample]:
             try:
-                samples = self.extract_samples(dataset, limit)
-                samples_by_dataset[dataset] = samples
+                return self.extract_samples(dataset, limit)
             except Exception as e:
                 print(f"Warning: Failed to extract samples for {dataset}: {e}")
-                samples_by_dataset[dataset] = []
-        return samples_by_dataset
+                return []
+
+        if workers <= 1 and budget is None:
+            for dataset in datasets:
+                yield dataset, extract(dataset)
+            return
+
+        budget = budget if budget is not None else MemoryBudget()
+        tasks = [
+            (dataset, estimate_dataset_memory(self, dataset), extract, (dataset,))
+            for dataset in datasets
+        ]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for dataset, future in run_budgeted(executor, tasks, budget, max(1, workers)):
+                yield dataset, future.result()
+
+    def sample_file_bytes(self, dataset: str) -> int:
+        """
+        Size of the raw files a dataset's samples are read from
+
+        Used to estimate memory for scheduling (see core/scheduler.py).
+
+        Args:
+            dataset: Dataset name
+
+        Returns:
+            Size in bytes, or 0 if unknown
+        """
+        return 0
+
+    def result_file_bytes(self) -> int:
+        """Size of the raw files results are read from, or 0 if unknown"""
+        return 0
+
+    def split_models(self) -> List["BaseAdapter"]:
+        """
+        Split the run into one adapter per evaluated model
+
+        Frameworks that can store several models in one run directory
+        override this; each returned adapter is processed as its own
+        logical run.
+
+        Returns:
+            List of adapters (just [self] for single-model runs)
+        """
+        return [self]
 
     @abstractmethod
     def get_framework_name(self) -> str:
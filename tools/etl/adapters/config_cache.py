@@ -0,0 +1,183 @@
+"""
+Config Cache
+
+Parses the YAML configs of runs (e.g. evalscope's task_config_*.yaml)
+with the libyaml CSafeLoader when PyYAML was built with it, and caches the
+result by a fingerprint of the file's bytes, so configs shared by many
+runs (sweeps) or unchanged since the last build are not parsed again:
+
+- In memory, for the runs and per-model adapters of one process.
+- On disk, one JSON file per fingerprint in a cache directory (the build
+  uses ~/.cache/evalscope-viewer/configs, never the published output
+  directory, since configs may hold credentials), so repeated builds skip
+  the YAML parser and do not even import it when every config is cached.
+  Entries are written atomically by whichever process parses the config
+  first.
+
+Only configs that survive a JSON round trip unchanged are cached; others
+(e.g. with timestamps or non-string keys) are parsed on every call.
+Cached configs are returned as fresh objects, so callers may modify them.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+# Cache directory that older builds kept inside the output directory
+LEGACY_CONFIG_CACHE_DIR = ".config_cache"
+
+# Parsed configs kept in memory per process
+MAX_MEMORY_ENTRIES = 4096
+
+
+def config_fingerprint(data: bytes) -> str:
+    """Fingerprint of a config file's content"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def parse_yaml(text: Union[str, bytes]) -> Any:
+    """
+    Parse YAML with the safe loader, in C when available
+
+    Args:
+        text: YAML document
+
+    Returns:
+        Parsed document
+    """
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(text, Loader=loader)
+
+
+class ConfigCache:
+    """Parsed YAML configs keyed by content fingerprint"""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Args:
+            cache_dir: Directory of the on-disk cache (default: memory only)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        # Fingerprint -> JSON text of the parsed config
+        self._memory: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load_yaml(self, data: Union[str, bytes]) -> Any:
+        """
+        Parse a YAML config, or return its cached parse
+
+        Args:
+            data: Content of the config file
+
+        Returns:
+            Parsed config
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        fingerprint = config_fingerprint(data)
+
+        text = self._memory.get(fingerprint)
+        if text is None:
+            text = self._read(fingerprint)
+        if text is not None:
+            try:
+                config = json.loads(text)
+            except ValueError:
+                # A damaged cache entry is parsed again and replaced
+                pass
+            else:
+                with self._lock:
+                    self.hits += 1
+                    self._remember(fingerprint, text)
+                return config
+
+        config = parse_yaml(data)
+        with self._lock:
+            self.misses += 1
+        try:
+            text = json.dumps(config, ensure_ascii=False, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return config
+        if json.loads(text) != config:
+            return config
+
+        with self._lock:
+            self._remember(fingerprint, text)
+        self._write(fingerprint, text)
+        return config
+
+    def _remember(self, fingerprint: str, text: str):
+        """Keep a parse in memory (call with the lock held)"""
+        if len(self._memory) >= MAX_MEMORY_ENTRIES:
+            self._memory.pop(next(iter(self._memory)))
+        self._memory[fingerprint] = text
+
+    def _path(self, fingerprint: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{fingerprint}.json"
+
+    def _read(self, fingerprint: str) -> Optional[str]:
+        """JSON text of a parse cached on disk, or None"""
+        path = self._path(fingerprint)
+        if path is None:
+            return None
+        try:
+            return path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def _write(self, fingerprint: str, text: str):
+        """Store a parse on disk; a cache that cannot be written is skipped"""
+        path = self._path(fingerprint)
+        if path is None:
+            return
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(text, encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Cannot write config cache {path}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+
+_config_cache = ConfigCache()
+
+
+def get_config_cache() -> ConfigCache:
+    """Get the config cache of this process"""
+    return _config_cache
+
+
+def set_config_cache_dir(cache_dir: Optional[Path]):
+    """
+    Set the on-disk cache directory of this process's config cache
+
+    Parses cached in memory are kept. Worker processes call this with the
+    directory of the build, so they share its on-disk cache.
+
+    Args:
+        cache_dir: Cache directory, or None for a memory-only cache
+    """
+    _config_cache.cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+
+def load_yaml_config(data: Union[str, bytes]) -> Any:
+    """
+    Parse a YAML config through the config cache of this process
+
+    Args:
+        data: Content of the config file
+
+    Returns:
+        Parsed config
+    """
+    return _config_cache.load_yaml(data)
@@ -5,11 +5,11 @@ Converts evalscope-specific output format to standard data models.
 """
 
 import json
-import yaml
-from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 from datetime import datetime
 import hashlib
+from functools import partial
+from itertools import islice
 
 from ...core.models import (
     StandardRunMeta,
@@ -19,7 +19,48 @@ from ...core.models import (
     StandardCategory,
     StandardSubset,
 )
+from ...core.jsonl import decode_record
+from ...core.parallel_jsonl import parallel_index_jsonl, parallel_map_jsonl
 from ..base import BaseAdapter
+from ..config_cache import load_yaml_config
+from ..sources import RunSource
+
+# Review file and its id -> byte offset index in a parallel-parse worker
+_worker_review_file = None
+_worker_review_offsets: Dict[Any, int] = {}
+
+
+def _init_review_worker(review_path: Optional[str], review_offsets: Dict[Any, int]):
+    """Worker initializer: open the review file and install its offset index"""
+    global _worker_review_file, _worker_review_offsets
+    _worker_review_file = open(review_path, "rb") if review_path is not None else None
+    _worker_review_offsets = review_offsets
+
+
+def _merge_with_review(pred: dict) -> StandardSample:
+    """Worker transform: read a prediction's review and merge the two"""
+    review = {}
+    offset = _worker_review_offsets.get(pred.get("id", 0))
+    if _worker_review_file is not None and offset is not None:
+        _worker_review_file.seek(offset)
+        review = decode_record(_worker_review_file.readline())
+    return EvalScopeAdapter.merge_sample(pred, review)
+
+
+def _project_review(fields: Tuple[str, ...], review: dict) -> Tuple[Any, dict, dict]:
+    """Transform: id, sample scores and selected metadata of a review"""
+    metadata = review.get("metadata", {})
+    return (
+        review.get("id", 0),
+        review.get("sample_scores", {}),
+        {name: metadata[name] for name in fields if name in metadata},
+    )
+
+
+def _project_prediction(fields: Tuple[str, ...], pred: dict) -> Tuple[Any, dict]:
+    """Transform: id and selected metadata of a prediction"""
+    metadata = pred.get("metadata", {})
+    return pred.get("id", 0), {name: metadata[name] for name in fields if name in metadata}
 
 
 class EvalScopeAdapter(BaseAdapter):
@@ -41,12 +82,33 @@ class EvalScopeAdapter(BaseAdapter):
         └── reports/
             └── <model_name>/
                 └── <dataset_name>.json
+
+    A run directory may hold several models (e.g. sweep runs); split_models
+    then returns one adapter per <model_name>, each a logical run of its own.
+
+    The run may also be an archive of this directory; all files are read
+    through self.source, and file paths are relative to the run root.
     """
 
-    def __init__(self, raw_dir: str):
+    # Output kinds and their file suffixes, keyed by directory name
+    _OUTPUT_KINDS = (
+        ("predictions", ".jsonl"),
+        ("reviews", ".jsonl"),
+        ("reports", ".json"),
+    )
+
+    def __init__(self, raw_dir: Union[str, RunSource], model_dir: Optional[str] = None):
+        """
+        Args:
+            raw_dir: Path to the evalscope run directory (or archive), or
+                its RunSource
+            model_dir: Restrict the adapter to one <model_name> directory
+        """
         super().__init__(raw_dir)
         self._config = None
         self._run_id = None
+        self._layout: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None
+        self.model_dir = model_dir
 
     def get_framework_name(self) -> str:
         return "evalscope"
@@ -61,30 +123,112 @@ class EvalScopeAdapter(BaseAdapter):
             return self._config
 
         configs_dir = self.raw_dir / "configs"
-        if not configs_dir.exists():
+        if not self.source.is_dir("configs"):
             raise FileNotFoundError(f"Configs directory not found: {configs_dir}")
 
         # Find first task_config_*.yaml file
-        config_files = list(configs_dir.glob("task_config_*.yaml"))
+        config_files = self.source.glob("configs/task_config_*.yaml")
         if not config_files:
             raise FileNotFoundError(f"No task_config_*.yaml found in {configs_dir}")
 
-        with open(config_files[0], "r", encoding="utf-8") as f:
-            self._config = yaml.safe_load(f)
+        self._config = load_yaml_config(self.source.read_bytes(config_files[0]))
 
         return self._config
 
+    def _scan_layout(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+        """
+        Map output files by kind, model and dataset in one listing pass
+
+        The layout is shared by all per-model adapters of a run.
+
+        Returns:
+            {kind: {model_name: {dataset: relative path}}}
+        """
+        if self._layout is not None:
+            return self._layout
+
+        suffixes = dict(self._OUTPUT_KINDS)
+        layout: Dict[str, Dict[str, Dict[str, str]]] = {
+            kind: {} for kind in suffixes
+        }
+        for path in self.source.list_files():
+            kind, _, rest = path.partition("/")
+            suffix = suffixes.get(kind)
+            if not rest or suffix is None or not rest.endswith(suffix):
+                continue
+            parts = rest.split("/")
+            model_name = parts[0] if len(parts) > 1 else ""
+            dataset = parts[-1][: -len(suffix)]
+            layout[kind].setdefault(model_name, {}).setdefault(dataset, path)
+
+        self._layout = layout
+        return layout
+
+    def list_models(self) -> List[str]:
+        """
+        List the <model_name> directories of the run
+
+        Returns:
+            Sorted model directory names found under predictions, reviews
+            and reports
+        """
+        models = set()
+        for by_model in self._scan_layout().values():
+            models.update(name for name in by_model if name)
+        return sorted(models)
+
+    def split_models(self) -> List["EvalScopeAdapter"]:
+        """Split a multi-model run into one adapter per model directory"""
+        if self.model_dir is not None:
+            return [self]
+        models = self.list_models()
+        if len(models) <= 1:
+            return [self]
+
+        adapters = []
+        for model_name in models:
+            adapter = EvalScopeAdapter(self.source, model_dir=model_name)
+            adapter._config = self._config
+            adapter._layout = self._layout
+            adapter.parse_workers = self.parse_workers
+            adapters.append(adapter)
+        return adapters
+
+    def _model_files(self, kind: str) -> Dict[str, str]:
+        """
+        Get the dataset -> file map of one output kind for this adapter
+
+        Without a model directory, files of all models are merged and the
+        first model (in name order) wins for each dataset.
+        """
+        by_model = self._scan_layout().get(kind, {})
+        if self.model_dir is not None:
+            return by_model.get(self.model_dir, {})
+
+        files: Dict[str, str] = {}
+        for model_name in sorted(by_model):
+            for dataset, path in by_model[model_name].items():
+                files.setdefault(dataset, path)
+        return files
+
+    def _model_name(self) -> str:
+        """Model name of this adapter's logical run"""
+        config = self._load_config()
+        model_id = config.get("model", {}).get("model_id", "unknown")
+        if self.model_dir is None or self.model_dir == model_id.replace("/", "_"):
+            return model_id
+        return self.model_dir
+
     def _generate_run_id(self) -> str:
         """Generate unique run_id from timestamp and model name"""
         if self._run_id is not None:
             return self._run_id
 
-        config = self._load_config()
-        timestamp = self.raw_dir.name
-        model_id = config.get("model", {}).get("model_id", "unknown")
+        timestamp = self.source.name
+        model_name = self._model_name()
 
-        # Create short hash of model_id
-        model_hash = hashlib.md5(model_id.encode()).hexdigest()[:8]
+        # Create short hash of the model name
+        model_hash = hashlib.md5(model_name.encode()).hexdigest()[:8]
         self._run_id = f"run_{timestamp}_{model_hash}"
 
         return self._run_id
@@ -96,8 +240,8 @@ class EvalScopeAdapter(BaseAdapter):
         Returns:
             Tuple of (start_time, end_time, duration_seconds)
         """
-        log_file = self.raw_dir / "logs" / "eval_log.log"
-        if not log_file.exists():
+        log_file = "logs/eval_log.log"
+        if not self.source.exists(log_file):
             # Return defaults if log doesn't exist
             return (
                 datetime.utcnow().isoformat() + "Z",
@@ -106,8 +250,7 @@ class EvalScopeAdapter(BaseAdapter):
             )
 
         try:
-            with open(log_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
+            lines = self.source.read_text(log_file).splitlines()
 
             if not lines:
                 raise ValueError("Log file is empty")
@@ -143,12 +286,12 @@ class EvalScopeAdapter(BaseAdapter):
         """Extract run metadata from evalscope config"""
         config = self._load_config()
         run_id = self._generate_run_id()
-        timestamp = self.raw_dir.name
+        timestamp = self.source.name
 
         # Parse model information
         model_config = config.get("model", {})
         model = StandardModel(
-            name=model_config.get("model_id", "unknown"),
+            name=self._model_name(),
             revision=model_config.get("model_revision", "master"),
             type=config.get("eval_type", "unknown"),
             metadata=model_config.get("generation_config", {}),
@@ -157,6 +300,12 @@ class EvalScopeAdapter(BaseAdapter):
         # Parse eval configuration
         eval_config = config.get("eval", {})
         datasets = eval_config.get("datasets", [])
+        if self.model_dir is not None:
+            # Only the datasets this model has output for
+            produced = set(self._model_files("predictions")) | set(
+                self._model_files("reports")
+            )
+            datasets = [d for d in datasets if d in produced] or sorted(produced)
 
         # Parse timestamps from log
         start_time, end_time, duration = self._parse_log_timestamps()
@@ -188,16 +337,15 @@ class EvalScopeAdapter(BaseAdapter):
     def extract_results(self) -> List[StandardBenchmarkResult]:
         """Extract benchmark results from evalscope reports"""
         reports_dir = self.raw_dir / "reports"
-        if not reports_dir.exists():
+        if not self.source.is_dir("reports"):
             raise FileNotFoundError(f"Reports directory not found: {reports_dir}")
 
         results = []
 
-        # Find all report JSON files
-        for report_file in reports_dir.rglob("*.json"):
+        # Report JSON files of this adapter's model(s)
+        for report_file in self._model_files("reports").values():
             try:
-                with open(report_file, "r", encoding="utf-8") as f:
-                    report = json.load(f)
+                report = json.loads(self.source.read_bytes(report_file))
 
                 result = self._parse_report(report)
                 results.append(result)
@@ -269,56 +417,188 @@ class EvalScopeAdapter(BaseAdapter):
         return category
 
     def extract_samples(
-        self, dataset: str, limit: int = 100
+        self, dataset: str, limit: Optional[int] = 100
     ) -> List[StandardSample]:
         """Extract samples for a specific dataset"""
-        predictions_dir = self.raw_dir / "predictions"
-        reviews_dir = self.raw_dir / "reviews"
+        if limit is None:
+            return list(self.iter_all_samples(dataset, self.parse_workers))
 
-        # Find prediction and review files
-        pred_files = list(predictions_dir.rglob(f"{dataset}.jsonl"))
-        review_files = list(reviews_dir.rglob(f"{dataset}.jsonl"))
+        pred_file, review_file = self.find_sample_files(dataset)
 
-        if not pred_files:
-            raise FileNotFoundError(f"No predictions found for dataset: {dataset}")
-
-        # Load predictions
-        predictions = self._load_jsonl(pred_files[0])
+        # Decode only the predictions that are exported
+        predictions = list(islice(self.source.iter_jsonl(pred_file), limit))
 
-        # Load reviews (optional)
+        # Load reviews (optional), stopping once every exported id is found
         reviews_dict = {}
-        if review_files:
-            reviews = self._load_jsonl(review_files[0])
-            reviews_dict = {r["id"]: r for r in reviews}
+        if review_file is not None:
+            wanted = {pred.get("id", 0) for pred in predictions}
+            for review in self.source.iter_jsonl(review_file):
+                if review["id"] in wanted:
+                    reviews_dict[review["id"]] = review
+                    if len(reviews_dict) == len(wanted):
+                        break
 
         # Merge and convert to standard format
         samples = []
-        for pred in predictions[:limit]:
-            sample_id = pred.get("id", 0)
-            review = reviews_dict.get(sample_id, {})
-
-            sample = StandardSample(
-                id=sample_id,
-                input=pred.get("input", ""),
-                target=pred.get("target", ""),
-                prediction=pred.get("prediction", ""),
-                scores=review.get("sample_scores", {}),
-                metadata={
-                    **pred.get("metadata", {}),
-                    **review.get("metadata", {}),
-                },
-                choices=pred.get("choices"),
-            )
-            samples.append(sample)
+        for pred in predictions:
+            review = reviews_dict.get(pred.get("id", 0), {})
+            samples.append(self.merge_sample(pred, review))
 
         return samples
 
-    def _load_jsonl(self, file_path: Path) -> List[dict]:
-        """Load JSONL file"""
-        data = []
-        with open(file_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    data.append(json.loads(line))
-        return data
+    def iter_all_samples(
+        self, dataset: str, workers: int = 1
+    ) -> Iterator[StandardSample]:
+        """
+        Iterate over every sample of a dataset, in file order
+
+        With workers > 1 the predictions file is split into newline-aligned
+        byte ranges that are decoded and merged with their reviews in a
+        process pool. The reviews are not loaded by this process: an
+        id -> byte offset index of the review file is built in parallel,
+        and each worker reads the reviews of its own predictions through
+        it. Files without a local path (e.g. zip members) are always
+        streamed sequentially.
+        """
+        pred_file, review_file = self.find_sample_files(dataset)
+
+        local_pred_file = self.source.local_path(pred_file)
+        local_review_file = None
+        if review_file is not None:
+            local_review_file = self.source.local_path(review_file)
+        parallel = workers > 1 and local_pred_file is not None
+        if parallel and (review_file is None or local_review_file is not None):
+            review_offsets = {}
+            if local_review_file is not None:
+                review_offsets = parallel_index_jsonl(local_review_file, workers=workers)
+            yield from parallel_map_jsonl(
+                local_pred_file,
+                _merge_with_review,
+                workers=workers,
+                initializer=_init_review_worker,
+                initargs=(
+                    str(local_review_file) if local_review_file is not None else None,
+                    review_offsets,
+                ),
+            )
+            return
+
+        reviews_dict = {}
+        if review_file is not None:
+            reviews_dict = {r["id"]: r for r in self.source.iter_jsonl(review_file)}
+        for pred in self.source.iter_jsonl(pred_file):
+            review = reviews_dict.get(pred.get("id", 0), {})
+            yield self.merge_sample(pred, review)
+
+    def iter_sample_scores(
+        self,
+        dataset: str,
+        metadata_fields: Sequence[str] = (),
+        workers: int = 1,
+    ) -> Iterator[Tuple[Any, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Iterate over the scores of every sample of a dataset
+
+        Scores come from the review file. Predictions, which hold the long
+        texts, are only read when metadata fields are requested (or there
+        are no reviews), and only the ids and those fields are kept. With
+        metadata fields samples are in prediction order, otherwise in
+        review order. Review metadata overrides prediction metadata, as in
+        merge_sample.
+        """
+        pred_file, review_file = self.find_sample_files(dataset)
+        fields = tuple(metadata_fields)
+
+        reviews = ()
+        if review_file is not None:
+            reviews = self._iter_projected(
+                review_file, partial(_project_review, fields), workers
+            )
+        if not fields and review_file is not None:
+            yield from reviews
+            return
+
+        joined = {sample_id: (scores, metadata) for sample_id, scores, metadata in reviews}
+        predictions = self._iter_projected(
+            pred_file, partial(_project_prediction, fields), workers
+        )
+        for sample_id, metadata in predictions:
+            scores, review_metadata = joined.get(sample_id, ({}, {}))
+            yield sample_id, scores, {**metadata, **review_metadata}
+
+    def _iter_projected(
+        self, path: str, transform: Any, workers: int
+    ) -> Iterator[Any]:
+        """Decode a JSONL file and map its records, in parallel when possible"""
+        local_path = self.source.local_path(path)
+        if workers > 1 and local_path is not None:
+            return parallel_map_jsonl(local_path, transform, workers=workers)
+        return (transform(record) for record in self.source.iter_jsonl(path))
+
+    def find_sample_files(self, dataset: str) -> Tuple[str, Optional[str]]:
+        """
+        Find the prediction and review files of a dataset
+
+        Args:
+            dataset: Dataset name
+
+        Returns:
+            Tuple of (prediction file, review file or None), as paths
+            relative to the run root (see self.source)
+
+        Raises:
+            FileNotFoundError: If there are no predictions for the dataset
+        """
+        predictions = self._model_files("predictions")
+        reviews = self._model_files("reviews")
+        pred_file = predictions.get(dataset)
+        review_file = reviews.get(dataset)
+
+        # Datasets are read in an order unrelated to an archive's: announce
+        # all sample files so a tar source keeps those it passes
+        self.source.announce([*predictions.values(), *reviews.values()])
+
+        if pred_file is None:
+            raise FileNotFoundError(f"No predictions found for dataset: {dataset}")
+
+        return pred_file, review_file
+
+    def sample_file_bytes(self, dataset: str) -> int:
+        """Size of the dataset's prediction and review files"""
+        try:
+            pred_file, review_file = self.find_sample_files(dataset)
+        except FileNotFoundError:
+            return 0
+        files = [pred_file] + ([review_file] if review_file is not None else [])
+        return sum(self.source.file_size(path) for path in files)
+
+    def result_file_bytes(self) -> int:
+        """Size of the model's report files"""
+        return sum(
+            self.source.file_size(path) for path in self._model_files("reports").values()
+        )
+
+    @staticmethod
+    def merge_sample(pred: dict, review: dict) -> StandardSample:
+        """
+        Merge a prediction record and its review into a standard sample
+
+        Args:
+            pred: Record from predictions/<model>/<dataset>.jsonl
+            review: Matching record from reviews/, or {} if there is none
+
+        Returns:
+            StandardSample
+        """
+        return StandardSample(
+            id=pred.get("id", 0),
+            input=pred.get("input", ""),
+            target=pred.get("target", ""),
+            prediction=pred.get("prediction", ""),
+            scores=review.get("sample_scores", {}),
+            metadata={
+                **pred.get("metadata", {}),
+                **review.get("metadata", {}),
+            },
+            choices=pred.get("choices"),
+        )
@@ -0,0 +1,182 @@
+"""
+Adapter Registry
+
+Maps framework names to adapters without importing them. Each adapter is
+described by an AdapterSpec holding its import target and the signature
+files that identify its run directories, so a mixed archive can be
+dispatched per run while only the detected frameworks get imported.
+
+Third-party adapters register through the "evalscope_viewer.adapters"
+entry point group. An entry point may refer to an AdapterSpec (detection
+stays import-free) or directly to a BaseAdapter subclass (imported when
+detection first needs its SIGNATURE).
+"""
+
+import importlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from .sources import RunSource, is_run_archive, open_run_source
+
+ENTRY_POINT_GROUP = "evalscope_viewer.adapters"
+
+
+@dataclass(frozen=True)
+class AdapterSpec:
+    """Lazily imported adapter registration"""
+    name: str
+    target: str
+    signature: Tuple[str, ...] = ()
+
+    def load(self) -> type:
+        """
+        Import the adapter class
+
+        Targets are "module:ClassName"; modules starting with "." are
+        relative to this package.
+
+        Returns:
+            Adapter class
+        """
+        module_name, _, class_name = self.target.partition(":")
+        module = importlib.import_module(module_name, package=__package__)
+        return getattr(module, class_name)
+
+    def matches(self, run_dir: Union[Path, RunSource]) -> bool:
+        """
+        Check whether a run directory carries this adapter's signature
+
+        Every signature glob pattern must match at least one path. Only
+        the first match of each pattern is looked up. Run archives are
+        matched against their member list.
+
+        Args:
+            run_dir: Run directory, run archive or RunSource
+
+        Returns:
+            True if the run directory belongs to this framework
+        """
+        if not self.signature:
+            return False
+        if isinstance(run_dir, RunSource):
+            return all(run_dir.glob(pattern) for pattern in self.signature)
+        if is_run_archive(run_dir):
+            source = open_run_source(run_dir)
+            try:
+                return all(source.glob(pattern) for pattern in self.signature)
+            finally:
+                source.close()
+        return all(
+            next(iter(run_dir.glob(pattern)), None) is not None
+            for pattern in self.signature
+        )
+
+
+# Registry of available adapters
+ADAPTER_REGISTRY: Dict[str, AdapterSpec] = {
+    "evalscope": AdapterSpec(
+        name="evalscope",
+        target=".evalscope.adapter:EvalScopeAdapter",
+        signature=("configs/task_config_*.yaml", "reports/*/*.json"),
+    ),
+    # Future: "lm-harness": AdapterSpec(...),
+    # Future: "opencompass": AdapterSpec(...),
+}
+
+_entry_points_loaded = False
+_entry_points_lock = threading.Lock()
+
+
+def register_adapter(spec: AdapterSpec):
+    """
+    Register an adapter
+
+    Args:
+        spec: Adapter specification; replaces any adapter with the same name
+    """
+    ADAPTER_REGISTRY[spec.name] = spec
+
+
+def _load_entry_points():
+    """Add adapters registered through entry points (once)"""
+    global _entry_points_loaded
+    with _entry_points_lock:
+        if _entry_points_loaded:
+            return
+        _entry_points_loaded = True
+
+        # importlib.metadata is slow to import: only pay for it when an
+        # unknown framework or detection needs the entry points
+        from importlib.metadata import entry_points
+
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            if entry_point.name in ADAPTER_REGISTRY:
+                continue
+            try:
+                target = entry_point.load()
+            except Exception as e:
+                print(f"Warning: Failed to load adapter {entry_point.name}: {e}")
+                continue
+
+            if isinstance(target, AdapterSpec):
+                spec = target
+            else:
+                spec = AdapterSpec(
+                    name=entry_point.name,
+                    target=f"{target.__module__}:{target.__qualname__}",
+                    signature=tuple(getattr(target, "SIGNATURE", ())),
+                )
+            ADAPTER_REGISTRY[entry_point.name] = spec
+
+
+def available_frameworks() -> Tuple[str, ...]:
+    """
+    Get the names of all registered frameworks
+
+    Returns:
+        Framework names, built-in adapters first
+    """
+    _load_entry_points()
+    return tuple(ADAPTER_REGISTRY)
+
+
+def get_adapter(framework: str) -> type:
+    """
+    Get adapter class by framework name
+
+    Args:
+        framework: Framework name (e.g., "evalscope")
+
+    Returns:
+        Adapter class
+
+    Raises:
+        ValueError: If framework is not supported
+    """
+    if framework not in ADAPTER_REGISTRY:
+        _load_entry_points()
+    if framework not in ADAPTER_REGISTRY:
+        available = ", ".join(ADAPTER_REGISTRY.keys())
+        raise ValueError(
+            f"Unsupported framework: {framework}. Available: {available}"
+        )
+    return ADAPTER_REGISTRY[framework].load()
+
+
+def detect_adapter(run_dir: Union[Path, RunSource]) -> Optional[AdapterSpec]:
+    """
+    Detect the adapter of a run directory from its signature files
+
+    Args:
+        run_dir: Run directory, run archive or RunSource
+
+    Returns:
+        The first matching AdapterSpec, or None if no adapter matches
+    """
+    _load_entry_points()
+    for spec in ADAPTER_REGISTRY.values():
+        if spec.matches(run_dir):
+            return spec
+    return None
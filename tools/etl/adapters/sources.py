@@ -0,0 +1,540 @@
+"""
+Run Sources
+
+A run source gives adapters uniform read access to the files of one run,
+whether the run is a directory or an archive bundle (.tar, .tar.gz,
+.tar.bz2, .tar.xz, .tar.zst, .zip), so archived runs can be indexed
+without being extracted.
+
+Paths are POSIX paths relative to the run root, e.g. "configs/x.yaml".
+When an archive holds a single top-level directory (the usual result of
+archiving a run directory), that directory is the run root and its name
+is the run name.
+
+- DirectorySource reads files from disk; local_path() exposes them for
+  memory-mapped and parallel parsing.
+- ZipSource uses the zip central directory for random access.
+- TarSource streams the archive: one sequential pass lists the members
+  and keeps small ones (configs, reports, logs) in memory, which is all
+  that indexing a run needs. Large members (JSONL samples) are read
+  through a second, forward-only pass that is kept open between reads:
+  each read spools only the member asked for to a temporary directory,
+  plus members announced with announce() that the pass goes by on the
+  way. Members are never extracted unless they are read, and a run whose
+  sample files are announced is decompressed at most twice however many
+  datasets it has.
+
+Sources can be pickled (to hand them to worker processes): archive
+listings and small tar members are kept, open handles are reopened.
+"""
+
+import fnmatch
+import io
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from ..core.jsonl import decode_record, iter_jsonl
+
+# Archive suffixes accepted as runs, longest first
+ARCHIVE_SUFFIXES = (
+    ".tar.gz",
+    ".tar.bz2",
+    ".tar.xz",
+    ".tar.zst",
+    ".tgz",
+    ".tbz2",
+    ".txz",
+    ".tzst",
+    ".tar",
+    ".zip",
+)
+
+# Tar members up to this size are kept in memory by the listing pass
+TAR_MEMORY_MEMBER_BYTES = 4 * 1024 * 1024
+
+# Prefix of the temporary directories large tar members are spooled to
+TAR_SPOOL_PREFIX = "evalscope-tar-"
+
+
+def archive_suffix(path: Path) -> Optional[str]:
+    """Get the archive suffix of a path, or None if it is not an archive"""
+    name = path.name.lower()
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.endswith(suffix):
+            return suffix
+    return None
+
+
+def is_run_archive(path: Path) -> bool:
+    """Whether a path is an archive file that can be read as a run"""
+    return path.is_file() and archive_suffix(path) is not None
+
+
+def _member_path(name: str) -> str:
+    """Normalize a tar member name ("./a/b" -> "a/b")"""
+    while name.startswith("./"):
+        name = name[2:]
+    return name
+
+
+def _match_path(path: str, pattern: str) -> bool:
+    """Match a relative path against a glob pattern, segment by segment"""
+    parts = path.split("/")
+    pattern_parts = pattern.split("/")
+    return len(parts) == len(pattern_parts) and all(
+        fnmatch.fnmatchcase(part, pattern_part)
+        for part, pattern_part in zip(parts, pattern_parts)
+    )
+
+
+class RunSource(ABC):
+    """Read access to the files of one run"""
+
+    def __init__(self, location: Path):
+        """
+        Args:
+            location: Run directory or archive file
+        """
+        self.location = Path(location)
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def __str__(self) -> str:
+        return str(self.location)
+
+    @property
+    def name(self) -> str:
+        """Run name (directory name, or the archive's root directory)"""
+        return self.location.name
+
+    @abstractmethod
+    def list_files(self) -> List[str]:
+        """List the relative paths of all regular files of the run"""
+        pass
+
+    @abstractmethod
+    def open_binary(self, path: str) -> IO[bytes]:
+        """
+        Open a file of the run for binary reading
+
+        Raises:
+            FileNotFoundError: If the run has no such file
+        """
+        pass
+
+    def local_path(self, path: str) -> Optional[Path]:
+        """Path of a file on the local filesystem, or None if it has none"""
+        return None
+
+    def announce(self, paths: Iterable[str]):
+        """
+        Announce files that are going to be read
+
+        Sources that can only read sequentially use this to keep the
+        announced files they pass while reading others; the default
+        ignores it.
+
+        Args:
+            paths: Relative paths of the files
+        """
+        pass
+
+    def file_size(self, path: str) -> int:
+        """
+        Uncompressed size of a file of the run in bytes
+
+        Sources that know sizes from their listing override this; the
+        default reads the file.
+
+        Raises:
+            FileNotFoundError: If the run has no such file
+        """
+        return len(self.read_bytes(path))
+
+    def exists(self, path: str) -> bool:
+        """Whether a file or directory exists in the run"""
+        prefix = path.rstrip("/") + "/"
+        return any(name == path or name.startswith(prefix) for name in self.list_files())
+
+    def is_dir(self, path: str) -> bool:
+        """Whether a directory (with at least one file) exists in the run"""
+        prefix = path.rstrip("/") + "/"
+        return any(name.startswith(prefix) for name in self.list_files())
+
+    def glob(self, pattern: str) -> List[str]:
+        """
+        Find files matching a glob pattern
+
+        Unlike Path.glob, "*" never crosses a "/", and "**" is not supported.
+
+        Args:
+            pattern: Relative glob pattern, e.g. "reports/*/*.json"
+
+        Returns:
+            Sorted matching relative paths
+        """
+        return sorted(name for name in self.list_files() if _match_path(name, pattern))
+
+    def read_bytes(self, path: str) -> bytes:
+        """Read a whole file of the run"""
+        with self.open_binary(path) as f:
+            return f.read()
+
+    def read_text(self, path: str, encoding: str = "utf-8") -> str:
+        """Read a whole text file of the run"""
+        return self.read_bytes(path).decode(encoding)
+
+    def iter_jsonl(self, path: str) -> Iterator[Any]:
+        """
+        Iterate over the records of a JSONL file of the run
+
+        Local files are memory-mapped; archive members are streamed.
+
+        Args:
+            path: Relative path of the JSONL file
+
+        Yields:
+            Decoded JSON records
+        """
+        local = self.local_path(path)
+        if local is not None:
+            yield from iter_jsonl(local)
+            return
+
+        with self.open_binary(path) as f:
+            for line in f:
+                if line.strip():
+                    yield decode_record(line)
+
+    def close(self):
+        """Release open file handles"""
+        pass
+
+
+class DirectorySource(RunSource):
+    """Run stored as a directory"""
+
+    def __init__(self, location: Path):
+        super().__init__(location)
+        self._files: Optional[List[str]] = None
+
+    def list_files(self) -> List[str]:
+        with self._lock:
+            if self._files is None:
+                files = []
+                for dirpath, _, filenames in os.walk(self.location):
+                    relative = Path(dirpath).relative_to(self.location).as_posix()
+                    for filename in filenames:
+                        files.append(
+                            filename if relative == "." else f"{relative}/{filename}"
+                        )
+                self._files = sorted(files)
+            return self._files
+
+    def exists(self, path: str) -> bool:
+        return (self.location / path).exists()
+
+    def is_dir(self, path: str) -> bool:
+        return (self.location / path).is_dir()
+
+    def glob(self, pattern: str) -> List[str]:
+        return sorted(
+            p.relative_to(self.location).as_posix()
+            for p in self.location.glob(pattern)
+            if p.is_file()
+        )
+
+    def open_binary(self, path: str) -> IO[bytes]:
+        return open(self.location / path, "rb")
+
+    def local_path(self, path: str) -> Optional[Path]:
+        return self.location / path
+
+    def file_size(self, path: str) -> int:
+        return (self.location / path).stat().st_size
+
+
+class _ArchiveSource(RunSource):
+    """Common handling of the archive root directory"""
+
+    def __init__(self, location: Path):
+        super().__init__(location)
+        self._root = ""
+        self._members: Optional[Dict[str, Any]] = None
+        self._files: List[str] = []
+
+    @property
+    def name(self) -> str:
+        self.list_files()
+        if self._root:
+            return self._root.rstrip("/")
+        suffix = archive_suffix(self.location) or ""
+        return self.location.name[: len(self.location.name) - len(suffix)]
+
+    def list_files(self) -> List[str]:
+        with self._lock:
+            if self._members is None:
+                self._index()
+            return self._files
+
+    @abstractmethod
+    def _index(self):
+        """List the archive members into self._members"""
+        pass
+
+    def _set_members(self, members: Dict[str, Any]):
+        """Install members keyed by archive path, stripping a single root"""
+        tops = {name.split("/", 1)[0] for name in members}
+        if len(tops) == 1 and all("/" in name for name in members):
+            self._root = f"{tops.pop()}/"
+        self._members = {
+            name[len(self._root):]: member for name, member in members.items()
+        }
+        self._files = sorted(self._members)
+
+    def _member(self, path: str) -> Any:
+        """Get the member of a relative path"""
+        self.list_files()
+        if path not in self._members:
+            raise FileNotFoundError(f"{path} not found in {self.location}")
+        return self._members[path]
+
+
+class ZipSource(_ArchiveSource):
+    """Run stored as a zip archive, read with random access"""
+
+    def __init__(self, location: Path):
+        super().__init__(location)
+        self._zip: Optional["zipfile.ZipFile"] = None
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.update(_zip=None, _members=None)
+        return state
+
+    def _index(self):
+        import zipfile
+
+        self._zip = zipfile.ZipFile(self.location)
+        self._set_members(
+            {
+                info.filename: info
+                for info in self._zip.infolist()
+                if not info.is_dir()
+            }
+        )
+
+    def open_binary(self, path: str) -> IO[bytes]:
+        member = self._member(path)
+        return self._zip.open(member)
+
+    def file_size(self, path: str) -> int:
+        return self._member(path).file_size
+
+    def close(self):
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+                self._members = None
+
+
+class TarSource(_ArchiveSource):
+    """
+    Run stored as a (compressed) tar archive, read by sequential streaming
+
+    Members are values of self._members: the bytes of small members, or
+    None for large members. A large member is spooled to a temporary
+    directory (deleted by close(), or when the source is garbage
+    collected) when it is first read, by a forward-only cursor over the
+    archive. The cursor stays open, so reading members in archive order
+    decompresses the archive once; reading a member behind the cursor
+    opens a new one. Members announced with announce() are spooled as the
+    cursor passes them, so they never need a new cursor. Spooling needs
+    free space in the temporary directory for the members read.
+    """
+
+    def __init__(self, location: Path):
+        super().__init__(location)
+        self._sizes: Dict[str, int] = {}
+        # Position of each member among the archive's files
+        self._positions: Dict[str, int] = {}
+        self._wanted: Set[str] = set()
+        self._spool_dir: Optional["tempfile.TemporaryDirectory"] = None
+        self._spooled: Dict[str, Path] = {}
+        self._cursor: Optional["tarfile.TarFile"] = None
+        # Position of the last file the cursor passed
+        self._cursor_position = -1
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.update(
+            _wanted=set(),
+            _spool_dir=None,
+            _spooled={},
+            _cursor=None,
+            _cursor_position=-1,
+        )
+        return state
+
+    def _open_stream(self):
+        """Open the archive as a forward-only tar stream"""
+        # Archive modules are imported on first use to keep startup cheap
+        import tarfile
+
+        suffix = archive_suffix(self.location)
+        if suffix in (".tar.zst", ".tzst"):
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError(
+                    f"Reading {self.location.name} requires the zstandard package"
+                ) from None
+            raw = open(self.location, "rb")
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+            return tarfile.open(fileobj=stream, mode="r|")
+        return tarfile.open(self.location, mode="r|*")
+
+    def _index(self):
+        members = {}
+        sizes = {}
+        with self._open_stream() as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                data = None
+                if member.size <= TAR_MEMORY_MEMBER_BYTES:
+                    data = archive.extractfile(member).read()
+                members[_member_path(member.name)] = data
+                sizes[_member_path(member.name)] = member.size
+        self._set_members(members)
+        # Archives list their files in order, and dicts keep insertion order
+        self._sizes = {name[len(self._root):]: size for name, size in sizes.items()}
+        self._positions = {name: position for position, name in enumerate(self._sizes)}
+
+    def announce(self, paths: Iterable[str]):
+        """Announce large members to spool when the cursor passes them"""
+        with self._lock:
+            for path in paths:
+                if self._member(path) is None and path not in self._spooled:
+                    self._wanted.add(path)
+
+    def _spool(self, path: str) -> Path:
+        """
+        Spool a large member (and announced ones on the way) with the cursor
+
+        Returns:
+            Path of the spooled copy
+        """
+        import shutil
+        import tempfile
+
+        with self._lock:
+            if path in self._spooled:
+                return self._spooled[path]
+
+            if self._cursor is None or self._positions[path] <= self._cursor_position:
+                self._close_cursor()
+                self._cursor = self._open_stream()
+            if self._spool_dir is None:
+                self._spool_dir = tempfile.TemporaryDirectory(prefix=TAR_SPOOL_PREFIX)
+
+            try:
+                while True:
+                    member = self._cursor.next()
+                    if member is None:
+                        raise FileNotFoundError(f"{path} not found in {self.location}")
+                    if not member.isfile():
+                        continue
+                    self._cursor_position += 1
+                    name = _member_path(member.name)[len(self._root):]
+                    if name != path and name not in self._wanted:
+                        continue
+                    # Members are numbered, so names need no sanitizing
+                    target = Path(self._spool_dir.name) / f"{len(self._spooled)}.bin"
+                    with open(target, "wb") as f:
+                        shutil.copyfileobj(self._cursor.extractfile(member), f)
+                    self._spooled[name] = target
+                    self._wanted.discard(name)
+                    if name == path:
+                        return target
+            except BaseException:
+                # A partly read member leaves the cursor unusable
+                self._close_cursor()
+                raise
+
+    def _close_cursor(self):
+        """Close the cursor, if one is open"""
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+        self._cursor_position = -1
+
+    def local_path(self, path: str) -> Optional[Path]:
+        """Spooled copy of a large member; small members are in memory"""
+        if self._member(path) is not None:
+            return None
+        return self._spool(path)
+
+    def open_binary(self, path: str) -> IO[bytes]:
+        data = self._member(path)
+        if data is not None:
+            return io.BytesIO(data)
+        return open(self.local_path(path), "rb")
+
+    def file_size(self, path: str) -> int:
+        self._member(path)
+        return self._sizes[path]
+
+    def close(self):
+        with self._lock:
+            self._close_cursor()
+            self._wanted = set()
+            if self._spool_dir is not None:
+                self._spool_dir.cleanup()
+                self._spool_dir = None
+                self._spooled = {}
+
+
+def open_run_source(location: Path) -> RunSource:
+    """
+    Open the source of a run directory or archive
+
+    Archives are not read until a file is requested.
+
+    Args:
+        location: Run directory or archive file
+
+    Returns:
+        RunSource for the run
+
+    Raises:
+        FileNotFoundError: If the location does not exist
+        ValueError: If the location is a file but not a supported archive
+    """
+    location = Path(location)
+    if not location.exists():
+        raise FileNotFoundError(f"Raw directory not found: {location}")
+    if location.is_dir():
+        return DirectorySource(location)
+
+    suffix = archive_suffix(location)
+    if suffix == ".zip":
+        return ZipSource(location)
+    if suffix is not None:
+        return TarSource(location)
+    raise ValueError(
+        f"Unsupported run archive: {location.name}. "
+        f"Available: {', '.join(ARCHIVE_SUFFIXES)}"
+    )
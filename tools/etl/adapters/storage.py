@@ -0,0 +1,434 @@
+"""
+Storage Backends
+
+Lets adapters read raw output from storage other than a local directory,
+e.g. object stores where every list, stat or read is a network request.
+
+A StorageBackend only needs two operations: a recursive listing of a
+prefix and a (ranged) read of one object. StorageSource turns a backend
+into a RunSource and keeps the request count low:
+
+- List-once snapshots: the whole run root is listed with one request;
+  exists/is_dir/glob are answered from the snapshot.
+- Parallel prefetch: small files (configs, reports, logs) are read in a
+  thread pool the first time any of them is needed.
+- Block reads with readahead: large files (sample JSONL) are streamed in
+  fixed-size ranged reads, with the next blocks requested in the
+  background while the current one is consumed.
+
+Backends are selected by URL scheme (see open_storage and
+register_storage). LocalStorage ("file://") and FakeStorage, an in-memory
+backend with injected latency and request counters for measurements
+without a live service, are included.
+"""
+
+import fnmatch
+import io
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Callable, Dict, List, Optional, Tuple
+
+from .sources import RunSource
+
+# Files up to this size are prefetched as a whole
+PREFETCH_MAX_BYTES = 1024 * 1024
+
+# Threads used to prefetch small files
+PREFETCH_WORKERS = 16
+
+# Size of one ranged read of a large file
+READ_BLOCK_BYTES = 8 * 1024 * 1024
+
+# Blocks requested ahead of the one being consumed
+READAHEAD_BLOCKS = 2
+
+
+class StorageBackend(ABC):
+    """
+    Minimal object storage interface.
+
+    Keys are "/"-separated paths. Every call counts as one request in
+    self.requests (by operation name).
+    """
+
+    def __init__(self):
+        self.requests: Counter = Counter()
+        self._counter_lock = threading.Lock()
+        # URL the backend was opened from (set by open_storage)
+        self.url: Optional[str] = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_counter_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._counter_lock = threading.Lock()
+
+    def _count(self, operation: str):
+        with self._counter_lock:
+            self.requests[operation] += 1
+
+    @property
+    def request_count(self) -> int:
+        """Total number of requests made"""
+        return sum(self.requests.values())
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> List[Tuple[str, int]]:
+        """
+        List all objects under a prefix, recursively
+
+        Args:
+            prefix: Key prefix ("" for everything)
+
+        Returns:
+            List of (key, size) pairs
+        """
+        pass
+
+    @abstractmethod
+    def read(self, key: str, start: int = 0, length: Optional[int] = None) -> bytes:
+        """
+        Read an object or a byte range of it
+
+        Args:
+            key: Object key
+            start: First byte
+            length: Number of bytes (default: to the end)
+
+        Returns:
+            The bytes read
+
+        Raises:
+            FileNotFoundError: If the object does not exist
+        """
+        pass
+
+
+class LocalStorage(StorageBackend):
+    """Storage backend over a local directory"""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Directory whose files are the objects
+        """
+        super().__init__()
+        self.root = Path(root)
+
+    def list(self, prefix: str = "") -> List[Tuple[str, int]]:
+        self._count("list")
+        objects = []
+        for dirpath, _, filenames in os.walk(self.root):
+            relative = Path(dirpath).relative_to(self.root).as_posix()
+            for filename in filenames:
+                key = filename if relative == "." else f"{relative}/{filename}"
+                if key.startswith(prefix):
+                    size = os.path.getsize(os.path.join(dirpath, filename))
+                    objects.append((key, size))
+        return sorted(objects)
+
+    def read(self, key: str, start: int = 0, length: Optional[int] = None) -> bytes:
+        self._count("read")
+        with open(self.root / key, "rb") as f:
+            f.seek(start)
+            return f.read() if length is None else f.read(length)
+
+
+class FakeStorage(StorageBackend):
+    """
+    In-memory storage backend with injected per-request latency.
+
+    Used to measure request counts and latency effects of access patterns
+    without a live object store.
+    """
+
+    def __init__(self, objects: Dict[str, bytes], latency: float = 0.0):
+        """
+        Args:
+            objects: Object contents keyed by key
+            latency: Seconds every request sleeps before answering
+        """
+        super().__init__()
+        self.objects = dict(objects)
+        self.latency = latency
+
+    @classmethod
+    def from_directory(cls, root: str, latency: float = 0.0) -> "FakeStorage":
+        """Load every file of a local directory into a fake backend"""
+        root_path = Path(root)
+        objects = {
+            path.relative_to(root_path).as_posix(): path.read_bytes()
+            for path in root_path.rglob("*")
+            if path.is_file()
+        }
+        return cls(objects, latency)
+
+    def list(self, prefix: str = "") -> List[Tuple[str, int]]:
+        self._count("list")
+        time.sleep(self.latency)
+        return sorted(
+            (key, len(data)) for key, data in self.objects.items() if key.startswith(prefix)
+        )
+
+    def read(self, key: str, start: int = 0, length: Optional[int] = None) -> bytes:
+        self._count("read")
+        time.sleep(self.latency)
+        if key not in self.objects:
+            raise FileNotFoundError(key)
+        data = self.objects[key]
+        end = len(data) if length is None else start + length
+        return data[start:end]
+
+
+# Storage backend factories keyed by URL scheme
+STORAGE_BACKENDS: Dict[str, Callable[[str], StorageBackend]] = {
+    "file": LocalStorage,
+}
+
+
+def register_storage(scheme: str, factory: Callable[[str], StorageBackend]):
+    """
+    Register a storage backend for a URL scheme
+
+    Args:
+        scheme: URL scheme, e.g. "s3"
+        factory: Called with the URL without "<scheme>://"; returns the backend
+    """
+    STORAGE_BACKENDS[scheme] = factory
+
+
+def is_storage_url(location: str) -> bool:
+    """Whether a raw location is a storage URL ("<scheme>://...")"""
+    return "://" in str(location)
+
+
+def open_storage(url: str) -> StorageBackend:
+    """
+    Open the storage backend of a URL
+
+    Args:
+        url: "<scheme>://<location>", e.g. "file:///data/outputs"
+
+    Returns:
+        Storage backend rooted at the location
+
+    Raises:
+        ValueError: If no backend is registered for the scheme
+    """
+    scheme, _, location = url.partition("://")
+    factory = STORAGE_BACKENDS.get(scheme)
+    if factory is None:
+        raise ValueError(
+            f"Unsupported storage scheme: {scheme}. "
+            f"Available: {', '.join(STORAGE_BACKENDS)}"
+        )
+    backend = factory(location)
+    backend.url = url
+    return backend
+
+
+class StorageSnapshot:
+    """One listing of a storage prefix, shared by the runs under it"""
+
+    def __init__(self, backend: StorageBackend, prefix: str = ""):
+        """
+        Args:
+            backend: Storage backend
+            prefix: Prefix to list (e.g. "outputs/")
+        """
+        self.backend = backend
+        self.prefix = prefix
+        self.sizes: Dict[str, int] = dict(backend.list(prefix))
+
+    def run_sources(self, pattern: str = "*", **options) -> List["StorageSource"]:
+        """
+        Create a source for every run directory directly under the prefix
+
+        Args:
+            pattern: Glob pattern for run directory names
+            **options: StorageSource options
+
+        Returns:
+            Sources of the matching runs, sorted by name
+        """
+        by_run: Dict[str, Dict[str, int]] = {}
+        for key, size in self.sizes.items():
+            run_name, _, path = key[len(self.prefix):].partition("/")
+            if path and fnmatch.fnmatchcase(run_name, pattern):
+                by_run.setdefault(run_name, {})[path] = size
+
+        return [
+            StorageSource(self.backend, f"{self.prefix}{name}/", files, **options)
+            for name, files in sorted(by_run.items())
+        ]
+
+
+class StorageSource(RunSource):
+    """Run stored under a prefix of a storage backend"""
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        prefix: str,
+        files: Optional[Dict[str, int]] = None,
+        prefetch_max_bytes: int = PREFETCH_MAX_BYTES,
+        prefetch_workers: int = PREFETCH_WORKERS,
+        block_bytes: int = READ_BLOCK_BYTES,
+        readahead: int = READAHEAD_BLOCKS,
+    ):
+        """
+        Args:
+            backend: Storage backend
+            prefix: Key prefix of the run root, ending with "/"
+            files: Snapshot of the run's files {relative path: size}; listed
+                with one request when not given
+            prefetch_max_bytes: Files up to this size are prefetched
+            prefetch_workers: Threads used to prefetch
+            block_bytes: Size of one ranged read of a large file
+            readahead: Blocks requested ahead while streaming
+        """
+        super().__init__(Path(prefix.rstrip("/") or "."))
+        self.backend = backend
+        self.prefix = prefix
+        self.prefetch_max_bytes = prefetch_max_bytes
+        self.prefetch_workers = prefetch_workers
+        self.block_bytes = block_bytes
+        self.readahead = readahead
+        self._sizes = files
+        self._files: List[str] = sorted(files) if files is not None else []
+        self._cache: Optional[Dict[str, bytes]] = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @property
+    def uri(self) -> str:
+        """URL of the run root, or its prefix if the backend has no URL"""
+        if self.backend.url is None:
+            return self.prefix
+        return f"{self.backend.url.rstrip('/')}/{self.prefix}"
+
+    def _snapshot(self) -> Dict[str, int]:
+        """List the run's files once"""
+        with self._lock:
+            if self._sizes is None:
+                self._sizes = {
+                    key[len(self.prefix):]: size
+                    for key, size in self.backend.list(self.prefix)
+                }
+                self._files = sorted(self._sizes)
+            return self._sizes
+
+    def list_files(self) -> List[str]:
+        self._snapshot()
+        return self._files
+
+    def file_size(self, path: str) -> int:
+        sizes = self._snapshot()
+        if path not in sizes:
+            raise FileNotFoundError(f"{path} not found in {self.prefix}")
+        return sizes[path]
+
+    def prefetch(self):
+        """Read all small files of the run in parallel (once)"""
+        with self._lock:
+            if self._cache is not None:
+                return
+            small = [
+                path
+                for path, size in self._snapshot().items()
+                if size <= self.prefetch_max_bytes
+            ]
+            with ThreadPoolExecutor(max_workers=self.prefetch_workers) as executor:
+                contents = executor.map(
+                    lambda path: self.backend.read(self.prefix + path), small
+                )
+                self._cache = dict(zip(small, contents))
+
+    def open_binary(self, path: str) -> IO[bytes]:
+        sizes = self._snapshot()
+        if path not in sizes:
+            raise FileNotFoundError(f"{path} not found in {self.prefix}")
+
+        if sizes[path] <= self.prefetch_max_bytes:
+            self.prefetch()
+            return io.BytesIO(self._cache[path])
+
+        stream = _ReadaheadStream(
+            self.backend,
+            self.prefix + path,
+            sizes[path],
+            self.block_bytes,
+            self.readahead,
+        )
+        return io.BufferedReader(stream, self.block_bytes)
+
+
+class _ReadaheadStream(io.RawIOBase):
+    """Sequential stream of a large object, read in blocks with readahead"""
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        key: str,
+        size: int,
+        block_bytes: int,
+        readahead: int,
+    ):
+        super().__init__()
+        self._backend = backend
+        self._key = key
+        self._size = size
+        self._block_bytes = block_bytes
+        self._executor = ThreadPoolExecutor(max_workers=max(1, readahead))
+        self._pending = deque()
+        self._next_offset = 0
+        self._buffer = memoryview(b"")
+        for _ in range(readahead + 1):
+            self._request_block()
+
+    def _request_block(self):
+        """Request the next block in the background"""
+        if self._next_offset >= self._size:
+            return
+        length = min(self._block_bytes, self._size - self._next_offset)
+        self._pending.append(
+            self._executor.submit(self._backend.read, self._key, self._next_offset, length)
+        )
+        self._next_offset += length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._buffer:
+            if not self._pending:
+                return 0
+            self._buffer = memoryview(self._pending.popleft().result())
+            self._request_block()
+
+        count = min(len(buffer), len(self._buffer))
+        buffer[:count] = self._buffer[:count]
+        self._buffer = self._buffer[count:]
+        return count
+
+    def close(self):
+        if not self.closed:
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown(wait=False)
+        super().close()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Benchmark Script: ETL Cold Start and Config Parsing
+
+Watch and cron setups start the ETL thousands of times a day, so its
+startup cost matters. This script measures, in fresh interpreters:
+
+- the import time of build_static_data.py (the CLI's cold start) and of
+  the evalscope adapter (paid on first use);
+- that modules kept out of startup on purpose (multiprocessing, YAML,
+  archive and entry point machinery) are not imported by the CLI;
+
+and, in this process, the cost of parsing a run config with the pure
+Python and the libyaml loaders against hits of the config cache.
+
+It exits with status 1 when a guarded module is imported at startup or
+a limit given on the command line is exceeded, so it can run in CI.
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --config ./outputs/<run>/configs/task_config_x.yaml
+    python bench_startup.py --max-import-ms 80 --min-cache-speedup 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Import the ETL as the tools.etl package so that relative imports resolve
+# when this file is run as a script
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.etl.adapters.config_cache import ConfigCache, parse_yaml
+
+# Modules the CLI must not import before they are needed
+LAZY_MODULES = (
+    "multiprocessing",
+    "concurrent.futures.process",
+    "importlib.metadata",
+    "yaml",
+    "tarfile",
+    "zipfile",
+    "numpy",
+)
+
+# Modules whose import time is measured
+IMPORT_TARGETS = {
+    "cli": "tools.etl.build_static_data",
+    "evalscope_adapter": "tools.etl.adapters.evalscope.adapter",
+}
+
+# Representative evalscope task config, used without --config
+SAMPLE_CONFIG = """\
+model: Qwen/Qwen2-7B-Instruct
+model_id: Qwen2-7B-Instruct
+model_args:
+  revision: master
+  precision: torch.float16
+  device_map: auto
+generation_config:
+  do_sample: false
+  max_new_tokens: 2048
+  temperature: 0.0
+  top_p: 1.0
+  top_k: 50
+datasets:
+  - mmlu
+  - gsm8k
+  - arc
+  - hellaswag
+dataset_args:
+  mmlu:
+    subset_list: [abstract_algebra, anatomy, astronomy, college_biology]
+    few_shot_num: 5
+    metric_list: [AverageAccuracy]
+  gsm8k:
+    few_shot_num: 4
+    metric_list: [AverageAccuracy]
+  arc:
+    subset_list: [ARC-Easy, ARC-Challenge]
+    metric_list: [AverageAccuracy]
+  hellaswag:
+    metric_list: [AverageAccuracy]
+eval_batch_size: 8
+eval_type: checkpoint
+judge_strategy: auto
+limit: null
+seed: 42
+work_dir: ./outputs/20251124_143025
+use_cache: null
+debug: false
+"""
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the ETL's cold start and config parsing",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=None,
+        help="YAML config to parse (default: a representative task config)",
+    )
+
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Fresh interpreters per import measurement (default: 5)",
+    )
+
+    parser.add_argument(
+        "--parses",
+        type=int,
+        default=200,
+        help="Config parses per parse measurement (default: 200)",
+    )
+
+    parser.add_argument(
+        "--max-import-ms",
+        type=float,
+        default=None,
+        help="Fail if the CLI's median import time exceeds this (default: no limit)",
+    )
+
+    parser.add_argument(
+        "--min-cache-speedup",
+        type=float,
+        default=None,
+        help=(
+            "Fail if a config cache hit is not this many times faster than "
+            "the fastest YAML parse (default: no limit)"
+        ),
+    )
+
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the results as JSON",
+    )
+
+    return parser.parse_args()
+
+
+def measure_import(module: str) -> Dict[str, object]:
+    """
+    Import a module in a fresh interpreter
+
+    Args:
+        module: Module name
+
+    Returns:
+        {"ms": cumulative import time, "modules": names in sys.modules}
+    """
+    code = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {str(PROJECT_ROOT)!r})\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "import json\n"
+        "print(json.dumps({'ms': elapsed * 1000, 'modules': sorted(sys.modules)}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def median_import(module: str, repeat: int) -> Dict[str, object]:
+    """Median import time of a module over fresh interpreters"""
+    runs = [measure_import(module) for _ in range(repeat)]
+    return {
+        "median_ms": statistics.median(run["ms"] for run in runs),
+        "modules": runs[-1]["modules"],
+    }
+
+
+def time_per_call(func: Callable[[], object], calls: int) -> float:
+    """Mean time of a call in microseconds"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def benchmark_parsing(text: str, calls: int) -> Dict[str, float]:
+    """
+    Time the ways a run config can be loaded
+
+    Args:
+        text: YAML config
+        calls: Parses per measurement
+
+    Returns:
+        Microseconds per load keyed by method
+    """
+    import yaml
+
+    data = text.encode("utf-8")
+    results = {
+        "safe_load": time_per_call(lambda: yaml.safe_load(text), calls),
+    }
+    if hasattr(yaml, "CSafeLoader"):
+        results["csafe_load"] = time_per_call(lambda: parse_yaml(data), calls)
+
+    memory_cache = ConfigCache()
+    memory_cache.load_yaml(data)
+    results["cache_memory_hit"] = time_per_call(lambda: memory_cache.load_yaml(data), calls)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        ConfigCache(cache_dir).load_yaml(data)
+        # A new cache per load, as in a new process reading the disk cache
+        results["cache_disk_hit"] = time_per_call(
+            lambda: ConfigCache(cache_dir).load_yaml(data), calls
+        )
+    return results
+
+
+def fastest_parse(parsing: Dict[str, float]) -> float:
+    """Microseconds of the fastest YAML loader"""
+    return min(parsing.get("csafe_load", parsing["safe_load"]), parsing["safe_load"])
+
+
+def print_results(results: Dict[str, object], failures: List[str]):
+    """Print benchmark results as text"""
+    print("=" * 60)
+    print("EvalScope Viewer - Startup Benchmark")
+    print("=" * 60)
+    for name, info in results["imports"].items():
+        print(f"Import {name + ':':<20} {info['median_ms']:8.1f} ms")
+    print(f"Lazy modules at startup:    {', '.join(results['lazy_loaded']) or 'none'}")
+    print("=" * 60)
+
+    parsing = results["parsing"]
+    for method, micros in parsing.items():
+        speedup = parsing["safe_load"] / micros
+        print(f"  {method:<20} {micros:10.1f} µs/config  {speedup:7.1f}x")
+    print(f"  libyaml available:   {'yes' if 'csafe_load' in parsing else 'no'}")
+    print(
+        f"  cache hit vs parse:  "
+        f"{fastest_parse(parsing) / parsing['cache_disk_hit']:.1f}x (disk)"
+    )
+
+    print("\n" + "=" * 60)
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    if not failures:
+        print("All startup guards passed")
+    print("=" * 60)
+
+
+def main():
+    """Run the startup benchmark"""
+    args = parse_args()
+
+    if args.config:
+        text = Path(args.config).read_text(encoding="utf-8")
+    else:
+        text = SAMPLE_CONFIG
+
+    imports = {
+        name: median_import(module, args.repeat)
+        for name, module in IMPORT_TARGETS.items()
+    }
+    cli_modules = set(imports["cli"].pop("modules"))
+    imports["evalscope_adapter"].pop("modules")
+    lazy_loaded = [
+        name
+        for name in LAZY_MODULES
+        if name in cli_modules or any(m.startswith(name + ".") for m in cli_modules)
+    ]
+
+    parsing = benchmark_parsing(text, args.parses)
+    results = {"imports": imports, "lazy_loaded": lazy_loaded, "parsing": parsing}
+
+    failures = [f"{name} is imported at startup" for name in lazy_loaded]
+    if args.max_import_ms is not None and imports["cli"]["median_ms"] > args.max_import_ms:
+        failures.append(
+            f"CLI import takes {imports['cli']['median_ms']:.1f} ms "
+            f"(limit {args.max_import_ms:g} ms)"
+        )
+    if args.min_cache_speedup is not None:
+        speedup = fastest_parse(parsing) / parsing["cache_disk_hit"]
+        if speedup < args.min_cache_speedup:
+            failures.append(
+                f"Config cache hits are {speedup:.1f}x faster than parsing "
+                f"(minimum {args.min_cache_speedup:g}x)"
+            )
+
+    if args.json:
+        json.dump({**results, "failures": failures}, sys.stdout, indent=2)
+        print()
+    else:
+        print_results(results, failures)
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,17 +12,71 @@ Supported frameworks:
     - evalscope (current)
     - lm-harness (future)
     - opencompass (future)
+
+Use --framework auto to detect the framework of each run directory, so a
+mixed archive is processed in one build.
 """
 
 import argparse
+import shutil
+import signal
 import sys
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Import the ETL as the tools.etl package so that the adapters' relative
+# imports of core resolve when this file is run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from tools.etl.core import DataBuilder
+from tools.etl.core.builder import DEFAULT_BLOB_THRESHOLD, INDEX_LAYOUTS
+from tools.etl.core.catalog import CATALOG_FILENAME
+from tools.etl.core.payload import (
+    DEFAULT_PAYLOAD_BUDGET,
+    PAYLOAD_REPORT_FILENAME,
+    payload_warnings,
+)
+from tools.etl.core.journal import BuildJournal, run_key
+from tools.etl.core.state import SPILLED_SCORES_DIR, config_cache_dir
+from tools.etl.core.shards import (
+    COMPARISON_SCORES_DIR,
+    SHARD_INDEX_FILENAME,
+    parse_shard,
+    select_shard,
+    write_shard_index,
+)
+from tools.etl.core.trends import TRENDS_DIR
+from tools.etl.core.models import StandardBenchmarkResult, StandardIndexEntry
+from tools.etl.core.scheduler import (
+    MemoryBudget,
+    estimate_run_memory,
+    format_memory_size,
+    parse_memory_size,
+    run_budgeted,
+)
+from tools.etl.adapters import BaseAdapter, detect_adapter, get_adapter
+from tools.etl.adapters.sources import is_run_archive, open_run_source
+from tools.etl.adapters.config_cache import LEGACY_CONFIG_CACHE_DIR, set_config_cache_dir
+from tools.etl.adapters.storage import StorageSnapshot, is_storage_url, open_storage
+from tools.etl.utils import scan_runs
 
-from core import DataBuilder
-from core.models import StandardIndexEntry
-from adapters import get_adapter
-from utils import scan_directories
+
+def remove_legacy_config_cache(output_dir: Path):
+    """
+    Delete a config cache that older builds kept in the output directory
+
+    It holds raw run configs, which may contain credentials, and must not
+    be published.
+
+    Args:
+        output_dir: Output directory of the static data
+    """
+    legacy_dir = Path(output_dir) / LEGACY_CONFIG_CACHE_DIR
+    if legacy_dir.is_dir():
+        shutil.rmtree(legacy_dir, ignore_errors=True)
+        print(f"Removed the config cache from the output directory: {legacy_dir}")
 
 
 def parse_args():
@@ -36,14 +90,20 @@ def parse_args():
         "--framework",
         type=str,
         default="evalscope",
-        help="Evaluation framework name (default: evalscope)",
+        help=(
+            "Evaluation framework name, or 'auto' to detect it per run "
+            "directory (default: evalscope)"
+        ),
     )
 
     parser.add_argument(
         "--raw-dir",
         type=str,
         required=True,
-        help="Directory containing framework output (e.g., ./outputs)",
+        help=(
+            "Directory containing framework output (e.g., ./outputs), or a "
+            "storage URL (e.g., file:///data/outputs)"
+        ),
     )
 
     parser.add_argument(
@@ -57,7 +117,67 @@ def parse_args():
         "--sample-limit",
         type=int,
         default=100,
-        help="Maximum number of samples per dataset (default: 100)",
+        help="Maximum number of samples per dataset, 0 for all (default: 100)",
+    )
+
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=1,
+        help=(
+            "Processes used to parse one sample file when exporting all "
+            "samples (--sample-limit 0) (default: 1)"
+        ),
+    )
+
+    parser.add_argument(
+        "--dataset-workers",
+        type=int,
+        default=1,
+        help=(
+            "Datasets of one run extracted concurrently; each is written "
+            "as soon as it is ready (default: 1)"
+        ),
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=parse_memory_size,
+        default=None,
+        help=(
+            "Memory for in-flight runs and datasets, e.g. 8G; work is "
+            "admitted largest-first while its estimate fits (default: no limit)"
+        ),
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Skip runs finished by an interrupted build into the same output "
+            "directory whose files are intact"
+        ),
+    )
+
+    parser.add_argument(
+        "--state-dir",
+        type=str,
+        default=None,
+        help=(
+            "Directory for the build journal, outside the published output "
+            "(default: a directory per --out-dir under "
+            "~/.cache/evalscope-viewer/builds)"
+        ),
+    )
+
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        metavar="I/N",
+        help=(
+            "Only process shard I of N (0-based) and write a partial index "
+            "for merge_shards.py instead of the index"
+        ),
     )
 
     parser.add_argument(
@@ -67,32 +187,563 @@ def parse_args():
         help="Glob pattern to match run directories (default: *)",
     )
 
+    parser.add_argument(
+        "--catalog",
+        action="store_true",
+        help="Also write catalog.sqlite, an indexed run catalog for filtered queries",
+    )
+
+    parser.add_argument(
+        "--index-layout",
+        type=str,
+        choices=INDEX_LAYOUTS,
+        default="single",
+        help=(
+            "Run index layout: index.json, monthly index pages with a "
+            "manifest, or both (default: single)"
+        ),
+    )
+
+    parser.add_argument(
+        "--trends",
+        action="store_true",
+        help="Also update the per-model score trend files in trends/",
+    )
+
+    parser.add_argument(
+        "--blob-threshold",
+        type=int,
+        default=DEFAULT_BLOB_THRESHOLD,
+        help=(
+            "Move sample fields longer than this many characters to a "
+            "per-dataset blob file, keeping a preview inline; 0 keeps all "
+            f"text inline (default: {DEFAULT_BLOB_THRESHOLD})"
+        ),
+    )
+
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=0,
+        metavar="RESAMPLES",
+        help=(
+            "Compute bootstrap confidence intervals of dataset, category and "
+            "subset scores with this many resamples (default: 0, disabled)"
+        ),
+    )
+
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Confidence level of bootstrap intervals (default: 0.95)",
+    )
+
+    parser.add_argument(
+        "--verify-aggregates",
+        action="store_true",
+        help=(
+            "Recompute dataset, category and subset scores from samples and "
+            "flag drift from the report in eval_summary.json"
+        ),
+    )
+
+    parser.add_argument(
+        "--group-by",
+        action="append",
+        metavar="FIELD",
+        help=(
+            "Also aggregate scores by this sample metadata field, e.g. "
+            "difficulty (can be repeated)"
+        ),
+    )
+
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help=(
+            "Test all pairs of runs for significant differences on shared "
+            "datasets and write comparisons/<dataset>.json"
+        ),
+    )
+
+    parser.add_argument(
+        "--permutations",
+        type=int,
+        default=10000,
+        help="Sign flips of the paired permutation test (default: 10000)",
+    )
+
+    parser.add_argument(
+        "--leaderboard",
+        action="store_true",
+        help=(
+            "Rank runs by Bradley–Terry ratings fitted to per-sample wins on "
+            "shared samples and write leaderboard.json"
+        ),
+    )
+
+    parser.add_argument(
+        "--leaderboard-resamples",
+        type=int,
+        default=200,
+        help="Bootstrap resamples of the leaderboard rating intervals (default: 200)",
+    )
+
+    parser.add_argument(
+        "--failure-clusters",
+        action="store_true",
+        help=(
+            "Cluster failed samples into near-duplicate failure patterns and "
+            "write runs/<run_id>/failure_clusters.json"
+        ),
+    )
+
+    parser.add_argument(
+        "--failure-threshold",
+        type=float,
+        default=0.5,
+        help="Samples whose primary score is below this are failures (default: 0.5)",
+    )
+
+    parser.add_argument(
+        "--cluster-input",
+        action="store_true",
+        help="Cluster failures on the input text as well as the prediction",
+    )
+
+    parser.add_argument(
+        "--config-cache-dir",
+        type=str,
+        default=None,
+        help=(
+            "Directory of the parsed run config cache, outside the published "
+            "output (default: ~/.cache/evalscope-viewer/configs)"
+        ),
+    )
+
+    parser.add_argument(
+        "--no-config-cache",
+        action="store_true",
+        help="Do not cache parsed run configs on disk across builds",
+    )
+
+    parser.add_argument(
+        "--payload-budget",
+        type=parse_memory_size,
+        default=DEFAULT_PAYLOAD_BUDGET,
+        help=(
+            "First-paint bytes a page route may download, e.g. 512K; runs "
+            "over it are flagged in payload_report.json (default: "
+            f"{format_memory_size(DEFAULT_PAYLOAD_BUDGET)})"
+        ),
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of runs processed in parallel processes (default: 1)",
+    )
+
     return parser.parse_args()
 
 
+@dataclass
+class RunOptions:
+    """Options applied to every processed run"""
+    sample_limit: int = 100
+    parse_workers: int = 1
+    dataset_workers: int = 1
+    memory_budget: Optional[int] = None
+    bootstrap_resamples: int = 0
+    confidence: float = 0.95
+    verify_aggregates: bool = False
+    group_by: Tuple[str, ...] = ()
+    failure_clusters: bool = False
+    failure_threshold: float = 0.5
+    cluster_input: bool = False
+    config_cache_dir: Optional[Path] = None
+    # Set when runs are compared: each run's scores are spilled there
+    scores_dir: Optional[Path] = None
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "RunOptions":
+        """Create options from parsed command line arguments"""
+        return cls(
+            sample_limit=args.sample_limit,
+            parse_workers=args.parse_workers,
+            dataset_workers=args.dataset_workers,
+            memory_budget=args.memory_budget,
+            bootstrap_resamples=args.bootstrap,
+            confidence=args.confidence,
+            verify_aggregates=args.verify_aggregates,
+            group_by=tuple(args.group_by or ()),
+            failure_clusters=args.failure_clusters,
+            failure_threshold=args.failure_threshold,
+            cluster_input=args.cluster_input,
+            config_cache_dir=(
+                None
+                if args.no_config_cache
+                else Path(args.config_cache_dir or config_cache_dir())
+            ),
+        )
+
+    def uses_sample_scores(self) -> bool:
+        """Whether any enabled stage needs per-sample scores"""
+        return self.uses_sample_groups() or self.scores_dir is not None
+
+    def uses_sample_groups(self) -> bool:
+        """Whether any enabled stage needs the grouping fields of samples"""
+        return (
+            self.bootstrap_resamples > 0 or self.verify_aggregates or bool(self.group_by)
+        )
+
+
+def assign_adapters(
+    framework: str, run_dirs: List[Path]
+) -> Tuple[List[Tuple[type, Path]], List[Tuple[Path, str]]]:
+    """
+    Assign an adapter class to each run directory
+
+    With framework "auto", each run directory is matched against the
+    signature files of the registered adapters; only the adapters that are
+    actually detected get imported. A run archive is opened once for
+    detection, and its task carries the open source (archive listing and
+    small members), so the adapter does not read the archive again.
+
+    Args:
+        framework: Framework name or "auto"
+        run_dirs: Run directories
+
+    Returns:
+        Tuple of ((adapter_class, run_dir) tasks, (run_dir, error) failures)
+
+    Raises:
+        ValueError: If framework is not supported
+    """
+    if framework != "auto":
+        adapter_class = get_adapter(framework)
+        return [(adapter_class, run_dir) for run_dir in run_dirs], []
+
+    tasks = []
+    failed = []
+    for run_dir in run_dirs:
+        if isinstance(run_dir, Path) and is_run_archive(run_dir):
+            run_dir = open_run_source(run_dir)
+        spec = detect_adapter(run_dir)
+        if spec is None:
+            failed.append((run_dir, "No registered adapter matches this run"))
+            continue
+        tasks.append((spec.load(), run_dir))
+    return tasks, failed
+
+
+def process_runs(
+    tasks: List[Tuple[type, Path]],
+    builder: DataBuilder,
+    options: RunOptions,
+    workers: int = 1,
+    journal: Optional[BuildJournal] = None,
+    stop: Optional[threading.Event] = None,
+) -> Tuple[List[StandardIndexEntry], List[Tuple[Path, str]]]:
+    """
+    Process runs, in parallel processes when workers > 1
+
+    Runs whose journal record is loaded and whose outputs are intact are
+    not processed again; every run that finishes is appended to the
+    journal. Once stop is set no further runs are started, and runs never
+    started are neither in the entries nor in the failures.
+
+    Args:
+        tasks: (adapter_class, run_dir) pairs
+        builder: DataBuilder instance
+        options: Per-run processing options
+        workers: Number of worker processes
+        journal: Build journal (default: none)
+        stop: Event set to stop the build after the runs in progress
+
+    Returns:
+        Tuple of (index entries in task order, (run_dir, error) failures)
+    """
+    outcomes: Dict[int, Union[List[StandardIndexEntry], str]] = {}
+    remaining = []
+    for index, (_, run_dir) in enumerate(tasks):
+        entries = journal.resume_entries(run_dir) if journal is not None else None
+        if entries is None:
+            remaining.append(index)
+        else:
+            print(f"\nResumed from journal: {run_dir.name}")
+            # The journal's checksums were just verified against the files
+            builder.manifest.record_digests(journal.records[run_key(run_dir)]["files"])
+            outcomes[index] = entries
+
+    def finish(index: int, entries: List[StandardIndexEntry]):
+        if journal is not None:
+            digests = {}
+            for entry in entries:
+                digests.update(builder.manifest.digests(f"runs/{entry.run_id}/"))
+            journal.record(tasks[index][1], entries, digests)
+        outcomes[index] = entries
+
+    if workers <= 1:
+        for index in remaining:
+            if stop is not None and stop.is_set():
+                break
+            adapter_class, run_dir = tasks[index]
+            try:
+                entries = process_run(adapter_class, run_dir, builder, options)
+            except Exception as e:
+                print(f"  ✗ Failed: {e}")
+                outcomes[index] = str(e)
+                continue
+            finish(index, entries)
+    else:
+        # Only parallel builds pay for importing multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Runs are admitted largest-first while their memory estimates fit
+        # in the budget; without a budget every run counts as 0 bytes
+        budget = MemoryBudget(options.memory_budget)
+        worker_builder = builder.for_worker()
+        scheduled = []
+        for index in remaining:
+            adapter_class, run_dir = tasks[index]
+            reservation = 0
+            if options.memory_budget is not None:
+                reservation = min(
+                    estimate_task_memory(adapter_class, run_dir, options),
+                    options.memory_budget,
+                )
+            scheduled.append(
+                (
+                    index,
+                    reservation,
+                    process_run_in_worker,
+                    (adapter_class, run_dir, worker_builder, options, reservation),
+                )
+            )
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=ignore_stop_signals
+        ) as executor:
+            for index, future in run_budgeted(
+                executor, scheduled, budget, workers, stop
+            ):
+                try:
+                    entries, written = future.result()
+                except Exception as e:
+                    print(f"  ✗ Failed: {tasks[index][1].name}: {e}")
+                    outcomes[index] = str(e)
+                    continue
+                builder.manifest.files.update(written)
+                finish(index, entries)
+
+    index_entries: List[StandardIndexEntry] = []
+    failed_runs = []
+    for index, (_, run_dir) in enumerate(tasks):
+        outcome = outcomes.get(index)
+        if isinstance(outcome, str):
+            failed_runs.append((run_dir, outcome))
+        elif outcome is not None:
+            index_entries.extend(outcome)
+
+    return index_entries, failed_runs
+
+
+def process_run_in_worker(
+    adapter_class: type,
+    run_dir: Path,
+    builder: DataBuilder,
+    options: RunOptions,
+    reservation: int = 0,
+) -> Tuple[List[StandardIndexEntry], Dict[str, Dict[str, Any]]]:
+    """
+    Process a run in a worker process
+
+    The builder is a copy made by DataBuilder.for_worker. Its manifest
+    starts empty, so only the hashes of the files this run wrote are
+    returned for the deployment manifest of the parent.
+
+    Returns:
+        (index entries, deployment manifest entries of the written files)
+    """
+    entries = process_run(adapter_class, run_dir, builder, options, reservation)
+    return entries, builder.manifest.files
+
+
+def install_stop_handlers(stop: threading.Event):
+    """
+    Make SIGINT and SIGTERM stop the build cleanly
+
+    The first signal sets stop, so the runs in progress finish and are
+    journaled; a second one aborts immediately.
+
+    Args:
+        stop: Event checked before starting each run
+    """
+
+    def handle(signum, frame):
+        if stop.is_set():
+            raise KeyboardInterrupt
+        stop.set()
+        print(
+            f"\nReceived {signal.Signals(signum).name}: finishing runs in "
+            "progress, then stopping (send again to abort)"
+        )
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, handle)
+
+
+def ignore_stop_signals():
+    """Leave SIGINT and SIGTERM to the main process (run worker initializer)"""
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, signal.SIG_IGN)
+
+
+def estimate_task_memory(
+    adapter_class: type, run_dir: Path, options: RunOptions
+) -> int:
+    """
+    Estimate the peak memory of processing a run from its raw file sizes
+
+    Args:
+        adapter_class: Adapter class for the framework
+        run_dir: Path to run directory
+        options: Per-run processing options
+
+    Returns:
+        Estimated bytes, or 0 if the run cannot be inspected
+    """
+    try:
+        return estimate_run_memory(adapter_class(run_dir), options.dataset_workers)
+    except Exception as e:
+        print(f"Warning: Cannot estimate memory of {run_dir.name}: {e}")
+        return 0
+
+
 def process_run(
     adapter_class: type,
     run_dir: Path,
     builder: DataBuilder,
-    sample_limit: int,
-) -> StandardIndexEntry:
+    options: RunOptions,
+    reservation: Optional[int] = None,
+) -> List[StandardIndexEntry]:
     """
-    Process a single evaluation run
+    Process a single evaluation run directory
+
+    A directory holding several models is split into one logical run per
+    model. The models are processed one after another: their work is
+    CPU-bound, so parallelism comes from the run-level process pool
+    (--workers).
 
     Args:
         adapter_class: Adapter class for the framework
         run_dir: Path to run directory
         builder: DataBuilder instance
-        sample_limit: Maximum samples per dataset
+        options: Per-run processing options
+        reservation: Memory reserved for this run by the run scheduler;
+            its datasets share it (default: the whole --memory-budget)
 
     Returns:
-        StandardIndexEntry for the processed run
+        StandardIndexEntry for each processed model
     """
     print(f"\nProcessing: {run_dir}")
 
+    # Worker processes share the build's on-disk config cache
+    set_config_cache_dir(options.config_cache_dir)
+
     # Initialize adapter
-    adapter = adapter_class(str(run_dir))
+    adapter = adapter_class(run_dir)
+    adapter.parse_workers = options.parse_workers
+
+    budget = None
+    if options.memory_budget is not None:
+        budget = MemoryBudget(
+            reservation if reservation is not None else options.memory_budget
+        )
+
+    try:
+        model_adapters = adapter.split_models()
+        if len(model_adapters) > 1:
+            print(f"  → Found {len(model_adapters)} models")
+        return [
+            process_model_run(model_adapter, builder, options, budget)
+            for model_adapter in model_adapters
+        ]
+    finally:
+        # Release spooled archive members before the next run
+        adapter.source.close()
+
+
+def run_stages(
+    adapter: BaseAdapter,
+    run_id: str,
+    results: List[StandardBenchmarkResult],
+    options: RunOptions,
+):
+    """
+    Run the enabled sample-level analysis stages on a run's results
+
+    Sample scores are loaded once and shared by all stages.
 
+    Args:
+        adapter: Adapter for the model's run
+        results: Benchmark results, updated in place
+        options: Per-run processing options
+    """
+    from tools.etl.stages.sample_scores import (
+        DEFAULT_GROUP_FIELDS,
+        load_run_scores,
+        spill_run_scores,
+    )
+
+    print("  → Loading sample scores...")
+    group_fields = ()
+    if options.uses_sample_groups():
+        group_fields = tuple(dict.fromkeys(DEFAULT_GROUP_FIELDS + options.group_by))
+    scores_by_dataset = load_run_scores(
+        adapter, [r.dataset for r in results], group_fields
+    )
+
+    if options.scores_dir is not None:
+        spill_run_scores(options.scores_dir, run_id, scores_by_dataset)
+
+    if options.verify_aggregates or options.group_by:
+        from tools.etl.stages.aggregates import verify_aggregates
+
+        print("  → Verifying aggregates...")
+        verify_aggregates(scores_by_dataset, results, group_by=options.group_by)
+
+    if options.bootstrap_resamples > 0:
+        from tools.etl.stages.bootstrap import attach_confidence_intervals
+
+        print("  → Computing bootstrap confidence intervals...")
+        attach_confidence_intervals(
+            scores_by_dataset, results, options.bootstrap_resamples, options.confidence
+        )
+
+
+def process_model_run(
+    adapter: BaseAdapter,
+    builder: DataBuilder,
+    options: RunOptions,
+    budget: Optional[MemoryBudget] = None,
+) -> StandardIndexEntry:
+    """
+    Process the logical run of a single model
+
+    Args:
+        adapter: Adapter for the model's run
+        builder: DataBuilder instance
+        options: Per-run processing options
+        budget: Memory budget for in-flight datasets, shared by the models
+            of a run (default: no limit)
+
+    Returns:
+        StandardIndexEntry for the processed run
+    """
     # Extract data using adapter
     print("  → Extracting metadata...")
     meta = adapter.extract_meta()
@@ -100,20 +751,47 @@ def process_run(
     print("  → Extracting evaluation results...")
     results = adapter.extract_results()
 
-    print("  → Extracting samples...")
-    samples_by_dataset = adapter.extract_all_samples(limit=sample_limit)
+    if options.uses_sample_scores():
+        run_stages(adapter, meta.run_id, results, options)
 
     # Build static JSON files
     print("  → Building static files...")
     builder.build_meta(meta)
     builder.build_eval_summary(meta.run_id, results)
-    builder.build_samples(meta.run_id, samples_by_dataset)
+
+    # Each dataset's samples are written as soon as they are extracted and
+    # released before the next one, so only the in-flight datasets are held
+    print("  → Extracting samples...")
+    sample_counts: Dict[str, int] = {}
+    for dataset, samples in adapter.iter_dataset_samples(
+        limit=options.sample_limit or None,
+        workers=options.dataset_workers,
+        budget=budget,
+    ):
+        builder.build_dataset_samples(meta.run_id, dataset, samples)
+        sample_counts[dataset] = len(samples)
+        del samples
+    total_samples = sum(sample_counts.values())
+
+    clusters = None
+    if options.failure_clusters:
+        from tools.etl.stages.failure_clusters import cluster_run_failures
+
+        print("  → Clustering failed samples...")
+        clusters = cluster_run_failures(
+            adapter,
+            {r.dataset: next(iter(r.metrics), None) for r in results},
+            threshold=options.failure_threshold,
+            include_input=options.cluster_input,
+        )
+        builder.build_failure_clusters(meta.run_id, clusters)
+
+    builder.build_run_bundle(meta, results, sample_counts, clusters)
 
     # Create index entry
     overall_score = (
         sum(r.overall_score for r in results) / len(results) if results else None
     )
-    total_samples = sum(len(samples) for samples in samples_by_dataset.values())
 
     index_entry = StandardIndexEntry(
         run_id=meta.run_id,
@@ -137,6 +815,146 @@ def process_run(
     return index_entry
 
 
+def collect_scores(
+    tasks: List[Tuple[type, Path]],
+    entries: List[StandardIndexEntry],
+    scores_dir: Path,
+    min_runs: int = 2,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Gather the sample scores of all successfully processed runs
+
+    Scores are read from the files spilled by run_stages. Only runs
+    without one (resumed from a build that did not compare runs) are
+    parsed again, and their scores are spilled for later builds.
+
+    Args:
+        tasks: (adapter_class, run_dir) pairs
+        entries: Index entries of the processed runs, in task order
+        scores_dir: Directory of spilled scores
+        min_runs: Datasets with fewer runs are left out
+
+    Returns:
+        {dataset: {run_id: SampleScores}}, runs in task order
+    """
+    from tools.etl.stages.sample_scores import (
+        load_run_scores,
+        read_spilled_scores,
+        spill_run_scores,
+    )
+
+    scores_by_run = {}
+    missing = set()
+    for entry in entries:
+        spilled = read_spilled_scores(scores_dir, entry.run_id)
+        if spilled is None:
+            missing.add(entry.run_id)
+        else:
+            scores_by_run[entry.run_id] = spilled
+
+    if missing:
+        print(f"  → Loading sample scores of {len(missing)} resumed run(s)...")
+        for adapter_class, run_dir in tasks:
+            try:
+                for adapter in adapter_class(run_dir).split_models():
+                    meta = adapter.extract_meta()
+                    if meta.run_id in missing:
+                        adapter.parse_workers = 1
+                        scores = load_run_scores(adapter, meta.datasets, ())
+                        spill_run_scores(scores_dir, meta.run_id, scores)
+                        scores_by_run[meta.run_id] = scores
+                        missing.discard(meta.run_id)
+            except Exception as e:
+                print(f"Warning: Skipping {run_dir.name} in comparisons: {e}")
+            if not missing:
+                break
+
+    runs_by_dataset: Dict[str, Dict[str, Any]] = {}
+    for entry in entries:
+        for dataset, scores in scores_by_run.get(entry.run_id, {}).items():
+            runs_by_dataset.setdefault(dataset, {})[entry.run_id] = scores
+
+    return {
+        dataset: runs
+        for dataset, runs in sorted(runs_by_dataset.items())
+        if len(runs) >= min_runs
+    }
+
+
+def compare_runs(
+    scores_by_dataset: Dict[str, Dict[str, Any]],
+    builder: DataBuilder,
+    n_permutations: int,
+) -> Dict[str, Path]:
+    """
+    Run paired significance tests between all successfully processed runs
+
+    Args:
+        scores_by_dataset: Sample scores (see collect_scores)
+        builder: DataBuilder instance
+        n_permutations: Sign flips of the permutation test
+
+    Returns:
+        Dictionary mapping dataset name to comparison file path
+    """
+    from tools.etl.stages.significance import compare_dataset_scores
+
+    comparisons = compare_dataset_scores(scores_by_dataset, n_permutations)
+    return builder.build_comparisons(comparisons)
+
+
+def rank_runs(
+    scores_by_dataset: Dict[str, Dict[str, Any]],
+    entries: List[StandardIndexEntry],
+    builder: DataBuilder,
+    n_resamples: int,
+    confidence: float,
+) -> Path:
+    """
+    Fit the Bradley–Terry leaderboard of all successfully processed runs
+
+    Args:
+        scores_by_dataset: Sample scores (see collect_scores)
+        entries: Index entries of the processed runs
+        builder: DataBuilder instance
+        n_resamples: Bootstrap resamples of the rating intervals
+        confidence: Confidence level of the rating intervals
+
+    Returns:
+        Path to leaderboard.json
+    """
+    from tools.etl.stages.leaderboard import compute_leaderboard
+
+    models = {entry.run_id: entry.model.get("name", "unknown") for entry in entries}
+    leaderboard = compute_leaderboard(
+        scores_by_dataset, models, n_resamples=n_resamples, confidence=confidence
+    )
+    return builder.build_leaderboard(leaderboard)
+
+
+def export_comparison_scores(
+    scores_by_dataset: Dict[str, Dict[str, Any]], builder: DataBuilder
+) -> Dict[str, Path]:
+    """
+    Write the sample scores of a shard's runs for the merge step
+
+    Args:
+        scores_by_dataset: Sample scores (see collect_scores)
+        builder: DataBuilder instance
+
+    Returns:
+        Dictionary mapping dataset name to score file path
+    """
+    from tools.etl.stages.sample_scores import scores_to_dict
+
+    return builder.build_comparison_scores(
+        {
+            dataset: {run_id: scores_to_dict(scores) for run_id, scores in runs.items()}
+            for dataset, runs in scores_by_dataset.items()
+        }
+    )
+
+
 def main():
     """Main ETL pipeline"""
     args = parse_args()
@@ -148,57 +966,160 @@ def main():
     print(f"Raw directory:  {args.raw_dir}")
     print(f"Output directory: {args.out_dir}")
     print(f"Sample limit:   {args.sample_limit}")
+    print(f"Workers:        {args.workers}")
+    if args.memory_budget is not None:
+        print(f"Memory budget:  {format_memory_size(args.memory_budget)}")
+    print(f"Index layout:   {args.index_layout}")
     print("=" * 60)
 
-    # Get adapter class
+    # Scan for run directories
+    if is_storage_url(args.raw_dir):
+        try:
+            snapshot = StorageSnapshot(open_storage(args.raw_dir))
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        run_dirs = snapshot.run_sources(args.run_pattern)
+    else:
+        raw_dir = Path(args.raw_dir)
+        if not raw_dir.exists():
+            print(f"Error: Raw directory not found: {raw_dir}")
+            sys.exit(1)
+        run_dirs = scan_runs(raw_dir, args.run_pattern)
+
+    if args.shard is not None:
+        total_runs = len(run_dirs)
+        run_dirs = select_shard(run_dirs, *args.shard)
+        print(f"\nShard {args.shard[0]}/{args.shard[1]}: {len(run_dirs)} of {total_runs} run(s)")
+
+    if not run_dirs and args.shard is None:
+        print(f"Error: No run directories found in {args.raw_dir}")
+        sys.exit(1)
+
+    print(f"\nFound {len(run_dirs)} run(s)")
+
+    # Assign an adapter to each run
     try:
-        adapter_class = get_adapter(args.framework)
+        tasks, failed_runs = assign_adapters(args.framework, run_dirs)
     except ValueError as e:
         print(f"Error: {e}")
         sys.exit(1)
 
-    # Scan for run directories
-    raw_dir = Path(args.raw_dir)
-    if not raw_dir.exists():
-        print(f"Error: Raw directory not found: {raw_dir}")
-        sys.exit(1)
+    # Initialize builder
+    builder = DataBuilder(
+        args.out_dir,
+        catalog=args.catalog,
+        index_layout=args.index_layout,
+        blob_threshold=args.blob_threshold,
+        trends=args.trends,
+        payload_budget=args.payload_budget,
+    )
 
-    run_dirs = scan_directories(raw_dir, args.run_pattern)
-    if not run_dirs:
-        print(f"Error: No run directories found in {raw_dir}")
-        sys.exit(1)
+    options = RunOptions.from_args(args)
+    set_config_cache_dir(options.config_cache_dir)
+    remove_legacy_config_cache(builder.output_dir)
 
-    print(f"\nFound {len(run_dirs)} run(s)")
+    # Journal finished runs so an interrupted build can be resumed
+    journal = BuildJournal(builder.output_dir, args.state_dir)
+    scores_dir = journal.path.parent / SPILLED_SCORES_DIR
+    if args.resume:
+        records = journal.load()
+        print(f"\nResuming: {len(records)} run(s) in {journal.path}")
+    else:
+        journal.reset()
+        shutil.rmtree(scores_dir, ignore_errors=True)
 
-    # Initialize builder
-    builder = DataBuilder(args.out_dir)
+    # Comparisons and the leaderboard reuse the scores loaded for each run
+    if args.compare or args.leaderboard:
+        options.scores_dir = scores_dir
+
+    stop = threading.Event()
+    install_stop_handlers(stop)
 
     # Process each run
-    index_entries: List[StandardIndexEntry] = []
-    failed_runs = []
+    index_entries, process_failures = process_runs(
+        tasks, builder, options, args.workers, journal, stop
+    )
+    failed_runs.extend(process_failures)
 
-    for run_dir in run_dirs:
-        try:
-            entry = process_run(adapter_class, run_dir, builder, args.sample_limit)
-            index_entries.append(entry)
-        except Exception as e:
-            print(f"  ✗ Failed: {e}")
-            failed_runs.append((run_dir, str(e)))
-            continue
+    if stop.is_set():
+        print(
+            f"\nBuild stopped: {len(index_entries)} run(s) finished and journaled. "
+            "Run again with --resume to continue."
+        )
+        sys.exit(130)
+
+    # Comparisons and the leaderboard share the scores spilled by the runs;
+    # a shard exports them and the merge step runs both
+    scores_by_dataset = {}
+    min_runs = 1 if args.shard is not None else 2
+    if options.scores_dir is not None and len(index_entries) >= min_runs:
+        print("\nGathering sample scores of all runs...")
+        scores_by_dataset = collect_scores(
+            tasks, index_entries, options.scores_dir, min_runs
+        )
+
+    if args.shard is not None:
+        if scores_by_dataset:
+            score_paths = export_comparison_scores(scores_by_dataset, builder)
+            print(
+                f"  ✓ Scores exported: {len(score_paths)} datasets "
+                f"({builder.output_dir / COMPARISON_SCORES_DIR})"
+            )
+
+        finished = {entry.run_id for entry in index_entries}
+        records = journal.load()
+        shard_runs = []
+        for _, run_dir in tasks:
+            record = records.get(run_key(run_dir))
+            if record is not None and any(
+                entry["run_id"] in finished for entry in record["entries"]
+            ):
+                entries = [StandardIndexEntry(**entry) for entry in record["entries"]]
+                # Archives are named by file, as in select_shard
+                shard_runs.append((getattr(run_dir, "location", run_dir).name, entries))
+        print("\nWriting partial index...")
+        write_shard_index(builder.output_dir, args.shard, shard_runs)
+        builder.write_manifest()
+        print(f"  ✓ Partial index created: {builder.output_dir / SHARD_INDEX_FILENAME}")
+
+    elif scores_by_dataset:
+        if args.compare:
+            print("\nComparing runs...")
+            comparison_paths = compare_runs(scores_by_dataset, builder, args.permutations)
+            print(f"  ✓ Comparisons created: {len(comparison_paths)} datasets")
+
+        if args.leaderboard:
+            print("\nFitting leaderboard...")
+            leaderboard_path = rank_runs(
+                scores_by_dataset,
+                index_entries,
+                builder,
+                args.leaderboard_resamples,
+                args.confidence,
+            )
+            print(f"  ✓ Leaderboard created: {leaderboard_path}")
 
     # Build index
-    if index_entries:
+    if index_entries and args.shard is None:
         print("\nBuilding index...")
         index_path = builder.build_index(index_entries)
         print(f"  ✓ Index created: {index_path}")
+        if args.catalog:
+            print(f"  ✓ Catalog created: {builder.output_dir / CATALOG_FILENAME}")
+        if args.trends:
+            print(f"  ✓ Trends updated: {builder.output_dir / TRENDS_DIR}")
+        print(f"  ✓ Payload report created: {builder.output_dir / PAYLOAD_REPORT_FILENAME}")
+        for warning in payload_warnings(builder.payload_report):
+            print(f"Warning: {warning}")
 
     # Summary
     print("\n" + "=" * 60)
     print("Summary")
     print("=" * 60)
-    print(f"Total runs:     {len(run_dirs)}")
-    print(f"Successful:     {len(index_entries)}")
-    print(f"Failed:         {len(failed_runs)}")
+    print(f"Run directories: {len(run_dirs)}")
+    print(f"Successful runs: {len(index_entries)}")
+    print(f"Failed:          {len(failed_runs)}")
 
     if failed_runs:
         print("\nFailed runs:")
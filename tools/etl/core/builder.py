@@ -5,12 +5,25 @@ Unified logic for building static JSON files from standard data models.
 This layer is framework-agnostic and works with any adapter.
 """
 
+import copy
+import hashlib
 import json
+import re
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime
 
 from .schema import SCHEMA_VERSION
+from .catalog import CATALOG_FILENAME, CatalogWriter
+from .manifest import DeployManifest
+from .payload import (
+    DEFAULT_PAYLOAD_BUDGET,
+    PAYLOAD_REPORT_FILENAME,
+    RUN_BUNDLE_FILENAME,
+    build_payload_report,
+)
+from .shards import COMPARISON_SCORES_DIR
+from .trends import TrendStore
 from .models import (
     StandardRunMeta,
     StandardBenchmarkResult,
@@ -18,6 +31,52 @@ from .models import (
     StandardIndexEntry,
 )
 
+# Layouts accepted for the run index
+INDEX_LAYOUTS = ("single", "partitioned", "both")
+
+# Directory holding the time-partitioned index pages and their manifest
+INDEX_PARTITION_DIR = "index"
+
+# Sample fields that may be moved to the blob file
+BLOB_FIELDS = ("input", "target", "prediction")
+
+# Default size in characters above which a sample field is moved to the blob file
+DEFAULT_BLOB_THRESHOLD = 1024
+
+# Characters kept inline as preview of a blob field
+BLOB_PREVIEW_CHARS = 200
+
+# Directory holding the pairwise run comparisons
+COMPARISONS_DIR = "comparisons"
+
+# Bradley–Terry leaderboard of all runs
+LEADERBOARD_FILENAME = "leaderboard.json"
+
+# Per-run clusters of failed samples
+FAILURE_CLUSTERS_FILENAME = "failure_clusters.json"
+
+_MONTH_PATTERN = re.compile(r"^(\d{4})-?(\d{2})")
+
+
+def index_partition_key(entry: StandardIndexEntry) -> str:
+    """
+    Get the monthly partition key ("YYYY-MM") of an index entry
+
+    The run timestamp ("20251124_143025" or ISO 8601) is used first and
+    the start time second; entries without a usable date go to "unknown".
+
+    Args:
+        entry: Index entry
+
+    Returns:
+        Partition key
+    """
+    for value in (entry.timestamp, entry.start_time):
+        match = _MONTH_PATTERN.match(value or "")
+        if match and 1 <= int(match.group(2)) <= 12:
+            return f"{match.group(1)}-{match.group(2)}"
+    return "unknown"
+
 
 class DataBuilder:
     """
@@ -25,13 +84,60 @@ class DataBuilder:
     This class is framework-agnostic and works with any adapter output.
     """
 
-    def __init__(self, output_dir: str):
+    def __init__(
+        self,
+        output_dir: str,
+        catalog: bool = False,
+        index_layout: str = "single",
+        blob_threshold: int = DEFAULT_BLOB_THRESHOLD,
+        trends: bool = False,
+        payload_budget: int = DEFAULT_PAYLOAD_BUDGET,
+    ):
         """
         Args:
             output_dir: Output directory for static JSON files
+            catalog: Also write the SQLite run catalog in build_index
+            index_layout: "single" for index.json, "partitioned" for monthly
+                index pages plus a manifest, or "both"
+            blob_threshold: Sample fields longer than this many characters
+                are written to the dataset's blob file with an inline
+                preview (0 keeps all fields inline)
+            trends: Also update the per-model trend files in build_index
+            payload_budget: Bytes a page route may download before its
+                first paint; larger runs are flagged in the payload report
         """
+        if index_layout not in INDEX_LAYOUTS:
+            raise ValueError(
+                f"Unsupported index layout: {index_layout}. "
+                f"Available: {', '.join(INDEX_LAYOUTS)}"
+            )
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.catalog = catalog
+        self.index_layout = index_layout
+        self.blob_threshold = blob_threshold
+        self.trends = trends
+        self.payload_budget = payload_budget
+        self.payload_report: Optional[Dict[str, Any]] = None
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+        self.manifest = DeployManifest(self.output_dir)
+
+    def for_worker(self) -> "DataBuilder":
+        """
+        Copy the builder for processing runs in worker processes
+
+        The copy shares the settings but not the state built up so far:
+        its manifest only records the files the worker writes, so the
+        copy is cheap to send and the worker returns only its own entries.
+
+        Returns:
+            DataBuilder
+        """
+        worker = copy.copy(self)
+        worker.manifest = self.manifest.fork()
+        worker.payload_report = None
+        worker._summaries = {}
+        return worker
 
     def build_meta(self, meta: StandardRunMeta) -> Path:
         """
@@ -50,7 +156,7 @@ class DataBuilder:
         meta_data["schema_version"] = SCHEMA_VERSION
 
         meta_path = run_dir / "meta.json"
-        with open(meta_path, "w", encoding="utf-8") as f:
+        with self.manifest.open(meta_path) as f:
             json.dump(meta_data, f, indent=2, ensure_ascii=False)
 
         return meta_path
@@ -71,6 +177,21 @@ class DataBuilder:
         run_dir = self.output_dir / "runs" / run_id
         run_dir.mkdir(parents=True, exist_ok=True)
 
+        summary_data = self._summary_data(run_id, results)
+
+        summary_path = run_dir / "eval_summary.json"
+        with self.manifest.open(summary_path) as f:
+            json.dump(summary_data, f, indent=2, ensure_ascii=False)
+
+        if self.catalog or self.trends:
+            self._summaries[run_id] = summary_data
+
+        return summary_path
+
+    def _summary_data(
+        self, run_id: str, results: List[StandardBenchmarkResult]
+    ) -> Dict[str, Any]:
+        """Content of eval_summary.json for a run"""
         # Calculate overall statistics
         total_samples = sum(
             list(r.metrics.values())[0].get("num_samples", 0) for r in results
@@ -79,7 +200,7 @@ class DataBuilder:
             sum(r.overall_score for r in results) / len(results) if results else 0.0
         )
 
-        summary_data = {
+        return {
             "schema_version": SCHEMA_VERSION,
             "run_id": run_id,
             "datasets": [r.to_dict() for r in results],
@@ -89,11 +210,86 @@ class DataBuilder:
             },
         }
 
-        summary_path = run_dir / "eval_summary.json"
-        with open(summary_path, "w", encoding="utf-8") as f:
-            json.dump(summary_data, f, indent=2, ensure_ascii=False)
+    def build_run_bundle(
+        self,
+        meta: StandardRunMeta,
+        results: List[StandardBenchmarkResult],
+        sample_counts: Dict[str, int],
+        clusters: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        """
+        Build bundle.json, everything the run page needs in one file
 
-        return summary_path
+        The bundle holds the run's meta and eval summary plus small
+        per-dataset stats (exported samples, sample and blob file sizes,
+        failure cluster counts), written compactly. Build it after the
+        samples so their file sizes are known.
+
+        Args:
+            meta: Standard run metadata
+            results: Benchmark results of the run
+            sample_counts: Number of exported samples keyed by dataset
+            clusters: Failure clusters of the run, if computed
+
+        Returns:
+            Path to the created bundle.json file
+        """
+        run_dir = self.output_dir / "runs" / meta.run_id
+        run_dir.mkdir(parents=True, exist_ok=True)
+
+        meta_data = meta.to_dict()
+        summary_data = self._summary_data(meta.run_id, results)
+        del summary_data["schema_version"], summary_data["run_id"]
+
+        samples_dir = run_dir / "samples"
+        dataset_stats = {}
+        for dataset_name, count in sample_counts.items():
+            stats = {"samples": count}
+            for key, suffix in (("head_bytes", "_head.jsonl"), ("blob_bytes", "_blobs.txt")):
+                path = samples_dir / f"{dataset_name}{suffix}"
+                stats[key] = path.stat().st_size if path.exists() else 0
+            clustered = (clusters or {}).get("datasets", {}).get(dataset_name)
+            if clustered is not None:
+                stats["failures"] = clustered["failures"]
+                stats["failure_clusters"] = clustered["num_clusters"]
+            dataset_stats[dataset_name] = stats
+
+        bundle_data = {
+            "schema_version": SCHEMA_VERSION,
+            "run_id": meta.run_id,
+            "meta": meta_data,
+            "summary": summary_data,
+            "stats": {"datasets": dataset_stats},
+        }
+
+        bundle_path = run_dir / RUN_BUNDLE_FILENAME
+        with self.manifest.open(bundle_path) as f:
+            json.dump(bundle_data, f, separators=(",", ":"), ensure_ascii=False)
+        return bundle_path
+
+    def build_failure_clusters(self, run_id: str, clusters: Dict[str, Any]) -> Path:
+        """
+        Build failure_clusters.json for a run
+
+        Args:
+            run_id: Run identifier
+            clusters: Failure clusters computed by the failure_clusters stage
+
+        Returns:
+            Path to the created failure_clusters.json file
+        """
+        run_dir = self.output_dir / "runs" / run_id
+        run_dir.mkdir(parents=True, exist_ok=True)
+
+        clusters_path = run_dir / FAILURE_CLUSTERS_FILENAME
+        with self.manifest.open(clusters_path) as f:
+            json.dump(
+                {"schema_version": SCHEMA_VERSION, "run_id": run_id, **clusters},
+                f,
+                indent=2,
+                ensure_ascii=False,
+            )
+        return clusters_path
 
     def build_samples(
         self, run_id: str, samples_by_dataset: Dict[str, List[StandardSample]]
@@ -108,38 +304,390 @@ class DataBuilder:
         Returns:
             Dictionary mapping dataset name to JSONL file path
         """
+        return {
+            dataset_name: self.build_dataset_samples(run_id, dataset_name, samples)
+            for dataset_name, samples in samples_by_dataset.items()
+        }
+
+    def build_dataset_samples(
+        self, run_id: str, dataset_name: str, samples: List[StandardSample]
+    ) -> Path:
+        """
+        Build the samples JSONL file (and blob file) of one dataset
+
+        Args:
+            run_id: Run identifier
+            dataset_name: Dataset name
+            samples: Samples of the dataset
+
+        Returns:
+            Path to the created JSONL file
+        """
         samples_dir = self.output_dir / "runs" / run_id / "samples"
         samples_dir.mkdir(parents=True, exist_ok=True)
 
-        created_files = {}
-        for dataset_name, samples in samples_by_dataset.items():
-            sample_path = samples_dir / f"{dataset_name}_head.jsonl"
-            with open(sample_path, "w", encoding="utf-8") as f:
+        sample_path = samples_dir / f"{dataset_name}_head.jsonl"
+        blob_path = samples_dir / f"{dataset_name}_blobs.txt"
+        blob_file = None
+
+        def open_blob_file():
+            # The blob file is only created once a field is moved to it
+            nonlocal blob_file
+            if blob_file is None:
+                blob_file = self.manifest.open(blob_path)
+            return blob_file
+
+        try:
+            with self.manifest.open(sample_path) as f:
                 for sample in samples:
-                    json.dump(sample.to_dict(), f, ensure_ascii=False)
+                    row = sample.to_dict()
+                    if self.blob_threshold > 0:
+                        row = self._split_blobs(row, open_blob_file)
+                    json.dump(row, f, ensure_ascii=False)
                     f.write("\n")
-            created_files[dataset_name] = sample_path
+        finally:
+            if blob_file is not None:
+                blob_file.close()
+
+        # Drop a stale blob file from an earlier build
+        if blob_file is None:
+            blob_path.unlink(missing_ok=True)
+
+        return sample_path
+
+    def _split_blobs(
+        self, row: Dict[str, Any], open_blob_file: Callable[[], Any]
+    ) -> Dict[str, Any]:
+        """
+        Move long text fields of a sample row to the blob file
+
+        Each moved field is replaced by a preview, and row["blobs"] maps the
+        field name to the (offset, length) of its full UTF-8 text in the
+        blob file. Non-string values are stored as JSON text.
+
+        Args:
+            row: Sample dictionary
+            open_blob_file: Returns the blob file (opened for binary
+                writing on first call)
+
+        Returns:
+            The row with long fields replaced by previews
+        """
+        blobs = {}
+        for field_name in BLOB_FIELDS:
+            value = row.get(field_name)
+            if isinstance(value, str):
+                text, text_format = value, "text"
+            elif value is None or isinstance(value, (int, float, bool)):
+                continue
+            else:
+                text = json.dumps(value, ensure_ascii=False)
+                text_format = "json"
+            if len(text) <= self.blob_threshold:
+                continue
+
+            data = text.encode("utf-8")
+            blob_file = open_blob_file()
+            blobs[field_name] = {
+                "offset": blob_file.tell(),
+                "length": len(data),
+                "format": text_format,
+            }
+            blob_file.write(data)
+            row[field_name] = text[:BLOB_PREVIEW_CHARS]
+
+        if blobs:
+            row["blobs"] = blobs
+        return row
+
+    def build_comparisons(
+        self, comparisons: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Path]:
+        """
+        Build comparisons/<dataset>.json for each compared dataset
+
+        Args:
+            comparisons: Run comparisons keyed by dataset name
+
+        Returns:
+            Dictionary mapping dataset name to comparison file path
+        """
+        comparisons_dir = self.output_dir / COMPARISONS_DIR
+        comparisons_dir.mkdir(parents=True, exist_ok=True)
+
+        created_files = {}
+        for dataset_name, comparison in comparisons.items():
+            comparison_path = comparisons_dir / f"{dataset_name}.json"
+            with self.manifest.open(comparison_path) as f:
+                json.dump(
+                    {"schema_version": SCHEMA_VERSION, **comparison},
+                    f,
+                    indent=2,
+                    ensure_ascii=False,
+                )
+            created_files[dataset_name] = comparison_path
+
+        return created_files
+
+    def build_leaderboard(self, leaderboard: Dict[str, Any]) -> Path:
+        """
+        Build leaderboard.json
+
+        Args:
+            leaderboard: Leaderboard computed by the leaderboard stage
+
+        Returns:
+            Path to the created leaderboard file
+        """
+        leaderboard_path = self.output_dir / LEADERBOARD_FILENAME
+        with self.manifest.open(leaderboard_path) as f:
+            json.dump(
+                {"schema_version": SCHEMA_VERSION, **leaderboard},
+                f,
+                indent=2,
+                ensure_ascii=False,
+            )
+        return leaderboard_path
+
+    def build_comparison_scores(
+        self, scores_by_dataset: Dict[str, Dict[str, Dict[str, Any]]]
+    ) -> Dict[str, Path]:
+        """
+        Build comparison_scores/<dataset>.json for a shard build
+
+        Args:
+            scores_by_dataset: {dataset: {run_id: serialized sample scores}}
+
+        Returns:
+            Dictionary mapping dataset name to score file path
+        """
+        scores_dir = self.output_dir / COMPARISON_SCORES_DIR
+        scores_dir.mkdir(parents=True, exist_ok=True)
+
+        created_files = {}
+        for dataset_name, runs in scores_by_dataset.items():
+            scores_path = scores_dir / f"{dataset_name}.json"
+            with self.manifest.open(scores_path) as f:
+                json.dump(
+                    {"schema_version": SCHEMA_VERSION, "dataset": dataset_name, "runs": runs},
+                    f,
+                    separators=(",", ":"),
+                    ensure_ascii=False,
+                )
+            created_files[dataset_name] = scores_path
 
         return created_files
 
     def build_index(self, entries: List[StandardIndexEntry]) -> Path:
         """
-        Build index.json with all runs
+        Build the run index (and the run catalog if enabled)
+
+        Depending on the index layout this writes index.json, the
+        time-partitioned index pages, or both. As the last steps of a build
+        it also writes the payload report and the deployment manifest.
+
+        Args:
+            entries: List of index entries
+
+        Returns:
+            Path to index.json, or to the partition manifest when the
+            layout is "partitioned"
+        """
+        index_path = None
+        if self.index_layout in ("single", "both"):
+            index_data = {
+                "runs": [entry.to_dict() for entry in entries],
+                "total": len(entries),
+                "last_updated": datetime.utcnow().isoformat() + "Z",
+            }
+
+            index_path = self.output_dir / "index.json"
+            with self.manifest.open(index_path) as f:
+                json.dump(index_data, f, indent=2, ensure_ascii=False)
+
+        if self.index_layout in ("partitioned", "both"):
+            manifest_path = self.build_partitioned_index(entries)
+            index_path = index_path or manifest_path
+
+        if self.catalog:
+            self.build_catalog(entries)
+
+        if self.trends:
+            self.build_trends(entries)
+
+        self.build_payload_report(entries)
+        self.write_manifest()
+        return index_path
+
+    def build_payload_report(self, entries: List[StandardIndexEntry]) -> Path:
+        """
+        Build payload_report.json, the first-paint bytes of each page route
 
         Args:
             entries: List of index entries
 
         Returns:
-            Path to the created index.json file
+            Path to the created payload report
+        """
+        self.payload_report = build_payload_report(
+            self.output_dir,
+            {entry.run_id: list(entry.datasets) for entry in entries},
+            self.payload_budget,
+        )
+        report_path = self.output_dir / PAYLOAD_REPORT_FILENAME
+        with self.manifest.open(report_path) as f:
+            json.dump(self.payload_report, f, indent=2, ensure_ascii=False)
+        return report_path
+
+    def write_manifest(self) -> Path:
         """
-        index_data = {
-            "runs": [entry.to_dict() for entry in entries],
+        Write deploy_manifest.json, the content hashes of the output tree
+
+        Returns:
+            Path to deploy_manifest.json
+        """
+        return self.manifest.write()
+
+    def build_partitioned_index(self, entries: List[StandardIndexEntry]) -> Path:
+        """
+        Build monthly index pages and the root manifest
+
+        Pages are written compactly as index/<YYYY-MM>.json with runs sorted
+        newest first. A page is only rewritten when its content hash differs
+        from the one recorded in the previous manifest, so adding a run
+        touches a single page plus the manifest. Pages whose partition no
+        longer has any run are removed.
+
+        Args:
+            entries: List of index entries
+
+        Returns:
+            Path to the created index/manifest.json file
+        """
+        partition_dir = self.output_dir / INDEX_PARTITION_DIR
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = partition_dir / "manifest.json"
+
+        previous = self._load_index_manifest(manifest_path)
+        previous_hashes = {
+            p["key"]: p.get("sha256") for p in previous.get("partitions", [])
+        }
+
+        partitions: Dict[str, List[StandardIndexEntry]] = {}
+        for entry in entries:
+            partitions.setdefault(index_partition_key(entry), []).append(entry)
+
+        # Newest partitions first so the viewer's first fetch is the latest page
+        keys = sorted(
+            partitions, key=lambda k: (k != "unknown", k), reverse=True
+        )
+
+        manifest_partitions = []
+        for key in keys:
+            page_entries = sorted(
+                partitions[key],
+                key=lambda e: (e.timestamp, e.run_id),
+                reverse=True,
+            )
+            page_data = {
+                "schema_version": SCHEMA_VERSION,
+                "partition": key,
+                "runs": [entry.to_dict() for entry in page_entries],
+                "total": len(page_entries),
+            }
+            content = json.dumps(
+                page_data, ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+            digest = hashlib.sha256(content).hexdigest()
+
+            page_path = partition_dir / f"{key}.json"
+            if previous_hashes.get(key) != digest or not page_path.exists():
+                self.manifest.write_bytes(page_path, content)
+
+            manifest_partitions.append(
+                {
+                    "key": key,
+                    "path": f"{INDEX_PARTITION_DIR}/{key}.json",
+                    "total": len(page_entries),
+                    "first_timestamp": page_entries[-1].timestamp,
+                    "last_timestamp": page_entries[0].timestamp,
+                    "sha256": digest,
+                }
+            )
+
+        for key in set(previous_hashes) - set(partitions):
+            stale_path = partition_dir / f"{key}.json"
+            if stale_path.exists():
+                stale_path.unlink()
+
+        manifest_data = {
+            "schema_version": SCHEMA_VERSION,
+            # Tells gc whether index.json was written by the same build
+            "layout": self.index_layout,
             "total": len(entries),
             "last_updated": datetime.utcnow().isoformat() + "Z",
+            "partitions": manifest_partitions,
         }
+        with self.manifest.open(manifest_path) as f:
+            json.dump(manifest_data, f, indent=2, ensure_ascii=False)
 
-        index_path = self.output_dir / "index.json"
-        with open(index_path, "w", encoding="utf-8") as f:
-            json.dump(index_data, f, indent=2, ensure_ascii=False)
+        return manifest_path
 
-        return index_path
+    def _load_index_manifest(self, manifest_path: Path) -> Dict[str, Any]:
+        """Load the previous partition manifest, or an empty one"""
+        if not manifest_path.exists():
+            return {}
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def build_catalog(self, entries: List[StandardIndexEntry]) -> Path:
+        """
+        Build the SQLite run catalog
+
+        Args:
+            entries: List of index entries
+
+        Returns:
+            Path to the created catalog database
+        """
+        writer = CatalogWriter(self.output_dir / CATALOG_FILENAME)
+        return writer.write(entries, self._collect_summaries(entries))
+
+    def build_trends(self, entries: List[StandardIndexEntry]) -> List[Path]:
+        """
+        Merge runs into the per-model trend files
+
+        Args:
+            entries: List of index entries
+
+        Returns:
+            Paths of the rewritten trend files
+        """
+        store = TrendStore(self.output_dir, self.manifest)
+        return store.update(entries, self._collect_summaries(entries))
+
+    def _collect_summaries(
+        self, entries: List[StandardIndexEntry]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the eval summaries of index entries
+
+        Summaries built by this builder are taken from memory; summaries of
+        runs built elsewhere are read back from their eval_summary.json.
+        """
+        summaries = {}
+        for entry in entries:
+            summary = self._summaries.get(entry.run_id)
+            if summary is None:
+                summary_path = (
+                    self.output_dir / "runs" / entry.run_id / "eval_summary.json"
+                )
+                if summary_path.exists():
+                    with open(summary_path, "r", encoding="utf-8") as f:
+                        summary = json.load(f)
+            if summary is not None:
+                summaries[entry.run_id] = summary
+        return summaries
@@ -0,0 +1,325 @@
+"""
+Run Catalog
+
+Indexed SQLite representation of the run index. The catalog holds runs,
+their datasets, metric scores and category/subset breakdowns so the viewer
+can filter by model, dataset, date range and score threshold without
+downloading the whole index.json.
+
+The database is written with a fixed page size and without a rollback
+journal, so it can also be hosted statically and queried page by page
+through HTTP range requests (e.g. with sql.js-httpvfs).
+"""
+
+import json
+import os
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import StandardIndexEntry
+
+CATALOG_FILENAME = "catalog.sqlite"
+
+# Page size used for static hosting: one HTTP range request per page
+CATALOG_PAGE_SIZE = 4096
+
+CATALOG_SCHEMA = """
+CREATE TABLE runs (
+    run_id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    framework TEXT NOT NULL,
+    model_name TEXT NOT NULL,
+    model_type TEXT,
+    overall_score REAL,
+    num_samples INTEGER,
+    start_time TEXT,
+    end_time TEXT,
+    duration_seconds REAL,
+    status TEXT,
+    tags TEXT
+);
+CREATE TABLE run_datasets (
+    run_id TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    dataset_pretty_name TEXT,
+    overall_score REAL,
+    PRIMARY KEY (run_id, dataset)
+);
+CREATE TABLE metric_scores (
+    run_id TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    score REAL,
+    macro_score REAL,
+    num_samples INTEGER,
+    PRIMARY KEY (run_id, dataset, metric)
+);
+CREATE TABLE category_scores (
+    run_id TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    category TEXT NOT NULL,
+    score REAL,
+    macro_score REAL,
+    num_samples INTEGER
+);
+CREATE TABLE subset_scores (
+    run_id TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    category TEXT NOT NULL,
+    subset TEXT NOT NULL,
+    score REAL,
+    num INTEGER
+);
+CREATE INDEX idx_runs_model ON runs (model_name, start_time);
+CREATE INDEX idx_runs_start_time ON runs (start_time);
+CREATE INDEX idx_runs_score ON runs (overall_score);
+CREATE INDEX idx_run_datasets_dataset ON run_datasets (dataset, overall_score);
+CREATE INDEX idx_metric_scores_lookup ON metric_scores (dataset, metric, score);
+CREATE INDEX idx_category_scores_lookup ON category_scores (dataset, category, score);
+CREATE INDEX idx_subset_scores_lookup ON subset_scores (dataset, subset, score);
+"""
+
+
+class CatalogWriter:
+    """
+    Writes index entries and evaluation summaries into the SQLite catalog.
+
+    The catalog is always rebuilt into a temporary file and atomically
+    moved into place, so readers never observe a half-written database.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: Path of the catalog database file
+        """
+        self.db_path = Path(db_path)
+
+    def write(
+        self,
+        entries: List[StandardIndexEntry],
+        summaries: Dict[str, Dict[str, Any]],
+    ) -> Path:
+        """
+        Write the catalog
+
+        Args:
+            entries: Index entries for all runs
+            summaries: Mapping of run_id to eval_summary.json data
+
+        Returns:
+            Path to the catalog database
+        """
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.db_path.with_name(self.db_path.name + ".tmp")
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+        conn = sqlite3.connect(str(tmp_path))
+        try:
+            conn.execute(f"PRAGMA page_size = {CATALOG_PAGE_SIZE}")
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.executescript(CATALOG_SCHEMA)
+            with conn:
+                for entry in entries:
+                    self._insert_run(conn, entry)
+                    summary = summaries.get(entry.run_id)
+                    if summary:
+                        self._insert_summary(conn, entry.run_id, summary)
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+        os.replace(tmp_path, self.db_path)
+        return self.db_path
+
+    def _insert_run(self, conn: sqlite3.Connection, entry: StandardIndexEntry):
+        """Insert a single run row"""
+        conn.execute(
+            "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                entry.run_id,
+                entry.timestamp,
+                entry.framework,
+                entry.model.get("name", "unknown"),
+                entry.model.get("type"),
+                entry.overall_score,
+                entry.num_samples,
+                entry.start_time,
+                entry.end_time,
+                entry.duration_seconds,
+                entry.status,
+                json.dumps(entry.tags, ensure_ascii=False),
+            ),
+        )
+
+    def _insert_summary(
+        self, conn: sqlite3.Connection, run_id: str, summary: Dict[str, Any]
+    ):
+        """Insert dataset, metric, category and subset rows for a run"""
+        for result in summary.get("datasets", []):
+            dataset = result.get("dataset", "unknown")
+            conn.execute(
+                "INSERT OR REPLACE INTO run_datasets VALUES (?, ?, ?, ?)",
+                (
+                    run_id,
+                    dataset,
+                    result.get("dataset_pretty_name", dataset),
+                    result.get("overall_score"),
+                ),
+            )
+
+            for metric_name, metric in result.get("metrics", {}).items():
+                conn.execute(
+                    "INSERT OR REPLACE INTO metric_scores VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        run_id,
+                        dataset,
+                        metric_name,
+                        metric.get("score"),
+                        metric.get("macro_score"),
+                        metric.get("num_samples"),
+                    ),
+                )
+
+            for cat in result.get("categories", []):
+                category = "/".join(str(n) for n in cat.get("name", []))
+                conn.execute(
+                    "INSERT INTO category_scores VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        run_id,
+                        dataset,
+                        category,
+                        cat.get("score"),
+                        cat.get("macro_score"),
+                        cat.get("num_samples"),
+                    ),
+                )
+                conn.executemany(
+                    "INSERT INTO subset_scores VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            run_id,
+                            dataset,
+                            category,
+                            subset.get("name", "unknown"),
+                            subset.get("score"),
+                            subset.get("num"),
+                        )
+                        for subset in cat.get("subsets", [])
+                    ],
+                )
+
+
+def _end_bound(end: str) -> Tuple[str, str]:
+    """
+    SQL comparison and value of an inclusive end bound
+
+    start_time holds full timestamps, so a date-only bound such as
+    "2025-11-24" compares below every run of that day; it is turned
+    into "before the next day" instead.
+
+    Args:
+        end: Latest start_time, a date or timestamp (ISO 8601)
+
+    Returns:
+        (operator, value)
+    """
+    try:
+        day = date.fromisoformat(end)
+    except ValueError:
+        return "<=", end
+    return "<", (day + timedelta(days=1)).isoformat()
+
+
+def query_runs(
+    db_path: Path,
+    model: Optional[str] = None,
+    dataset: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    min_score: Optional[float] = None,
+    metric: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Query runs from the catalog
+
+    Args:
+        db_path: Path to the catalog database
+        model: Model name filter (SQL LIKE pattern, e.g. "Qwen/%")
+        dataset: Only runs that evaluated this dataset
+        start: Earliest start_time (ISO 8601, inclusive)
+        end: Latest start_time (ISO 8601, inclusive; a date includes
+            the whole day)
+        min_score: Score threshold; applied to the dataset score when
+            `dataset` is given, to the run's overall score otherwise
+        metric: Apply `min_score` to this metric of `dataset` instead
+            (requires `dataset`)
+        limit: Maximum number of rows to return
+
+    Returns:
+        List of run rows, most recent first
+
+    Raises:
+        ValueError: If `metric` is given without `dataset`
+    """
+    if metric is not None and dataset is None:
+        raise ValueError("metric requires dataset: metric scores are per dataset")
+
+    sql = ["SELECT r.* FROM runs r"]
+    where = []
+    params: List[Any] = []
+
+    if dataset is not None:
+        if metric is not None:
+            sql.append(
+                "JOIN metric_scores s ON s.run_id = r.run_id "
+                "AND s.dataset = ? AND s.metric = ?"
+            )
+            params.extend([dataset, metric])
+        else:
+            sql.append(
+                "JOIN run_datasets s ON s.run_id = r.run_id AND s.dataset = ?"
+            )
+            params.append(dataset)
+        score_column = "s.score" if metric is not None else "s.overall_score"
+    else:
+        score_column = "r.overall_score"
+
+    if model is not None:
+        where.append("r.model_name LIKE ?")
+        params.append(model)
+    if start is not None:
+        where.append("r.start_time >= ?")
+        params.append(start)
+    if end is not None:
+        operator, value = _end_bound(end)
+        where.append(f"r.start_time {operator} ?")
+        params.append(value)
+    if min_score is not None:
+        where.append(f"{score_column} >= ?")
+        params.append(min_score)
+
+    if where:
+        sql.append("WHERE " + " AND ".join(where))
+    sql.append("ORDER BY r.start_time DESC")
+    if limit is not None:
+        sql.append("LIMIT ?")
+        params.append(limit)
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(" ".join(sql), params).fetchall()
+    finally:
+        conn.close()
+
+    runs = []
+    for row in rows:
+        run = dict(row)
+        run["tags"] = json.loads(run["tags"]) if run["tags"] else []
+        runs.append(run)
+    return runs
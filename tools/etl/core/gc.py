@@ -0,0 +1,399 @@
+"""
+Output Garbage Collection
+
+DataBuilder only ever adds files, so runs that were re-IDed or deleted
+upstream, datasets dropped from a run, removed trend models and leftover
+temporary files stay in the output tree. collect_garbage finds them with
+one scan of the tree and deletes them.
+
+Reachability is decided by the current index (index.json, the partition
+manifest and its pages, or a shard's shard_index.json). When both
+index.json and a partition manifest exist, only the layout the last build
+wrote counts: index.json is stale when the newer partition manifest says
+it was written without one, and the partition manifest is stale when
+index.json is newer (a build writing both writes index.json first).
+Stale index files are collected along with the runs only they listed:
+
+- runs/<run_id>/ of runs not in the index
+- runs/<run_id>/samples/<dataset>_head.jsonl and _blobs.txt of datasets
+  the run no longer has
+- index.json or index/manifest.json of a layout the last build did not write
+- index/<partition>.json pages not in index/manifest.json
+- trends/<model>.json files not in trends/manifest.json
+- comparisons/<dataset>.json of datasets no indexed run has
+- *.tmp files
+- precompressed .br/.gz variants of any of these
+
+Only these namespaces are touched; other files are never deleted. It is
+safe to run while the tree is being served or built:
+
+- Nothing newer than the index is deleted, so the files of a build in
+  progress (written before its index) survive.
+- By default nothing is deleted until the index is older than a grace
+  period, so readers that fetched the previous index can finish.
+- Run directories are renamed into .gc-trash/ before they are removed, so
+  readers see a run either complete or gone; files that readers already
+  have open stay readable until they close them.
+
+The deployment manifest is updated and the build journal is compacted to
+the latest record of every indexed run.
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from .builder import COMPARISONS_DIR, INDEX_PARTITION_DIR
+from .journal import BuildJournal
+from .manifest import DEPLOY_MANIFEST_FILENAME, load_manifest
+from .shards import SHARD_INDEX_FILENAME
+from .trends import TRENDS_DIR
+
+GC_TRASH_DIR = ".gc-trash"
+
+# Seconds an index must have been published before garbage is deleted
+DEFAULT_GRACE_SECONDS = 3600
+
+# Suffixes of precompressed variants served next to a file
+VARIANT_SUFFIXES = (".br", ".gz")
+
+# Garbage categories in report order
+CATEGORIES = (
+    "orphaned_runs",
+    "stale_samples",
+    "stale_indexes",
+    "stale_index_pages",
+    "stale_trends",
+    "stale_comparisons",
+    "temporary_files",
+)
+
+
+def _load_json(path: Path) -> Optional[Dict[str, Any]]:
+    """Load a JSON object, or None if it is missing or unreadable"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def load_live_runs(output_dir: Path) -> Dict[str, Any]:
+    """
+    Read the runs reachable from the current index of an output tree
+
+    Args:
+        output_dir: Output directory of the static data
+
+    Returns:
+        {"runs": {run_id: [datasets]}, "index_mtime_ns": newest index file
+        mtime, "sources": index files read, "stale": index files of a
+        layout the last build did not write}
+
+    Raises:
+        FileNotFoundError: If the tree has no index
+    """
+    output_dir = Path(output_dir)
+    runs: Dict[str, List[str]] = {}
+    sources = []
+    newest = 0
+
+    def add(path: Path, entries: List[Dict[str, Any]]):
+        nonlocal newest
+        sources.append(path.relative_to(output_dir).as_posix())
+        newest = max(newest, path.stat().st_mtime_ns)
+        for entry in entries:
+            runs[entry["run_id"]] = list(entry.get("datasets", []))
+
+    index_path = output_dir / "index.json"
+    index = _load_json(index_path)
+    partition_manifest_path = output_dir / INDEX_PARTITION_DIR / "manifest.json"
+    partition_manifest = _load_json(partition_manifest_path)
+
+    # Keep only the layout written by the last build
+    stale = []
+    if index is not None and partition_manifest is not None:
+        index_mtime = index_path.stat().st_mtime_ns
+        partition_mtime = partition_manifest_path.stat().st_mtime_ns
+        if partition_mtime > index_mtime and partition_manifest.get("layout") == "partitioned":
+            stale.append(index_path.relative_to(output_dir).as_posix())
+            index = None
+        elif index_mtime > partition_mtime:
+            stale.append(partition_manifest_path.relative_to(output_dir).as_posix())
+            partition_manifest = None
+
+    if index is not None:
+        add(index_path, index.get("runs", []))
+
+    if partition_manifest is not None:
+        add(partition_manifest_path, [])
+        for partition in partition_manifest.get("partitions", []):
+            page_path = output_dir / partition["path"]
+            page = _load_json(page_path)
+            if page is None:
+                raise FileNotFoundError(f"Missing index page {page_path}")
+            add(page_path, page.get("runs", []))
+
+    shard_index = _load_json(output_dir / SHARD_INDEX_FILENAME)
+    if shard_index is not None:
+        add(
+            output_dir / SHARD_INDEX_FILENAME,
+            [entry for run in shard_index.get("runs", []) for entry in run["entries"]],
+        )
+
+    if not sources:
+        raise FileNotFoundError(
+            f"No index in {output_dir} (index.json, "
+            f"{INDEX_PARTITION_DIR}/manifest.json or {SHARD_INDEX_FILENAME})"
+        )
+    return {"runs": runs, "index_mtime_ns": newest, "sources": sources, "stale": stale}
+
+
+def _base_name(name: str) -> str:
+    """File name without a precompressed variant suffix"""
+    for suffix in VARIANT_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def _tree_size(path: Path) -> Dict[str, int]:
+    """Files, bytes and newest mtime of a directory tree"""
+    files = size = newest = 0
+    for root, _, names in os.walk(path):
+        newest = max(newest, os.stat(root).st_mtime_ns)
+        for name in names:
+            stat = os.stat(os.path.join(root, name))
+            files += 1
+            size += stat.st_size
+            newest = max(newest, stat.st_mtime_ns)
+    return {"files": files, "bytes": size, "mtime_ns": newest}
+
+
+def _listed_paths(manifest: Optional[Dict[str, Any]], key: str) -> Optional[Set[str]]:
+    """Paths listed in a partition or trend manifest"""
+    if manifest is None:
+        return None
+    listed = manifest.get(key, [])
+    values = listed.values() if isinstance(listed, dict) else listed
+    return {item["path"] for item in values if "path" in item}
+
+
+def scan_garbage(
+    output_dir: Path,
+    live_runs: Dict[str, List[str]],
+    stale_indexes: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """
+    Find the unreachable artifacts of an output tree in one scan
+
+    Args:
+        output_dir: Output directory of the static data
+        live_runs: Datasets of every indexed run
+        stale_indexes: Index files that are no longer read (see
+            load_live_runs); a stale partition manifest lists no live page
+
+    Returns:
+        {"garbage": [{"category", "path", "files", "bytes", "mtime_ns",
+        "directory"}], "live_bytes": size of everything else}
+    """
+    output_dir = Path(output_dir)
+    live_datasets = {d for datasets in live_runs.values() for d in datasets}
+    partition_manifest = f"{INDEX_PARTITION_DIR}/manifest.json"
+    pages = None
+    if partition_manifest not in stale_indexes:
+        pages = _listed_paths(_load_json(output_dir / partition_manifest), "partitions")
+    trends = _listed_paths(
+        _load_json(output_dir / TRENDS_DIR / "manifest.json"), "models"
+    )
+
+    garbage: List[Dict[str, Any]] = []
+    live_bytes = 0
+
+    def add(category: str, path: Path, stats: Dict[str, int], directory: bool = False):
+        garbage.append(
+            {
+                "category": category,
+                "path": path.relative_to(output_dir).as_posix(),
+                "directory": directory,
+                **stats,
+            }
+        )
+
+    for root, dirs, names in os.walk(output_dir):
+        root_path = Path(root)
+        relative_root = root_path.relative_to(output_dir).as_posix()
+        # Hidden directories (the gc trash) are not part of the tree
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+
+        if relative_root == "runs":
+            for run_id in list(dirs):
+                if run_id not in live_runs:
+                    run_path = root_path / run_id
+                    add("orphaned_runs", run_path, _tree_size(run_path), directory=True)
+                    dirs.remove(run_id)
+
+        run_parts = relative_root.split("/")
+        for name in sorted(names):
+            path = root_path / name
+            stat = path.stat()
+            stats = {"files": 1, "bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            base = _base_name(name)
+            relative = path.relative_to(output_dir).as_posix()
+            relative_base = relative[: len(relative) - len(name)] + base
+
+            category = None
+            if name.endswith(".tmp"):
+                category = "temporary_files"
+            elif relative_base in stale_indexes:
+                category = "stale_indexes"
+            elif len(run_parts) == 3 and run_parts[::2] == ["runs", "samples"]:
+                datasets = live_runs.get(run_parts[1], [])
+                owned = {f"{d}_head.jsonl" for d in datasets}
+                owned |= {f"{d}_blobs.txt" for d in datasets}
+                if base not in owned:
+                    category = "stale_samples"
+            elif relative_root == INDEX_PARTITION_DIR and base != "manifest.json":
+                if pages is None or relative_base not in pages:
+                    category = "stale_index_pages"
+            elif relative_root == TRENDS_DIR and base != "manifest.json":
+                if trends is not None and relative_base not in trends:
+                    category = "stale_trends"
+            elif relative_root == COMPARISONS_DIR:
+                if base.endswith(".json") and base[: -len(".json")] not in live_datasets:
+                    category = "stale_comparisons"
+
+            if category is None:
+                live_bytes += stat.st_size
+            else:
+                add(category, path, stats)
+
+    return {"garbage": garbage, "live_bytes": live_bytes}
+
+
+def _remove(output_dir: Path, item: Dict[str, Any]):
+    """Delete one garbage item; directories are moved to the trash first"""
+    path = output_dir / item["path"]
+    if not item["directory"]:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        return
+
+    trash = output_dir / GC_TRASH_DIR
+    trash.mkdir(exist_ok=True)
+    target = trash / f"{path.name}-{uuid.uuid4().hex[:8]}"
+    try:
+        os.rename(path, target)
+    except FileNotFoundError:
+        return
+    shutil.rmtree(target, ignore_errors=True)
+
+
+def _update_deploy_manifest(output_dir: Path, removed: List[Dict[str, Any]]) -> bool:
+    """Drop deleted files from deploy_manifest.json"""
+    manifest_path = output_dir / DEPLOY_MANIFEST_FILENAME
+    manifest = load_manifest(manifest_path)
+    if manifest is None:
+        return False
+
+    files = manifest.get("files", {})
+    for item in removed:
+        prefix = item["path"] + "/"
+        for path in [p for p in files if p == item["path"] or p.startswith(prefix)]:
+            del files[path]
+    manifest["total_files"] = len(files)
+    manifest["total_bytes"] = sum(entry["size"] for entry in files.values())
+
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+    return True
+
+
+def collect_garbage(
+    output_dir: Path,
+    dry_run: bool = False,
+    grace_seconds: float = DEFAULT_GRACE_SECONDS,
+    state_dir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """
+    Delete the unreachable artifacts of an output tree
+
+    Args:
+        output_dir: Output directory of the static data
+        dry_run: Only report what would be deleted
+        grace_seconds: Delete nothing until the index has been published
+            this long (0 to delete immediately)
+        state_dir: State directory of the builds into the tree, holding
+            the build journal (default: the tree's state directory)
+
+    Returns:
+        Report with per-category totals, the garbage items, the items
+        deleted and the items kept because they are newer than the index
+
+    Raises:
+        FileNotFoundError: If the tree has no index
+    """
+    output_dir = Path(output_dir)
+    live = load_live_runs(output_dir)
+
+    # Leftovers of an interrupted collection
+    shutil.rmtree(output_dir / GC_TRASH_DIR, ignore_errors=True)
+
+    scan = scan_garbage(output_dir, live["runs"], live["stale"])
+    index_age = time.time() - live["index_mtime_ns"] / 1e9
+    waiting = not dry_run and index_age < grace_seconds
+
+    garbage, too_new = [], []
+    for item in scan["garbage"]:
+        # Written after the index: part of a build in progress
+        (too_new if item["mtime_ns"] >= live["index_mtime_ns"] else garbage).append(item)
+
+    deleted = []
+    if not dry_run and not waiting:
+        for item in garbage:
+            _remove(output_dir, item)
+            deleted.append(item)
+        shutil.rmtree(output_dir / GC_TRASH_DIR, ignore_errors=True)
+        if deleted:
+            _update_deploy_manifest(output_dir, deleted)
+
+    # A journal written after the index belongs to a build in progress
+    journal = BuildJournal(output_dir, state_dir)
+    journal_dropped = 0
+    if (
+        journal.path.exists()
+        and journal.path.stat().st_mtime_ns < live["index_mtime_ns"]
+    ):
+        journal_dropped = journal.compact(set(live["runs"]), dry_run=dry_run or waiting)
+
+    totals = {
+        category: {
+            "files": sum(i["files"] for i in garbage if i["category"] == category),
+            "bytes": sum(i["bytes"] for i in garbage if i["category"] == category),
+        }
+        for category in CATEGORIES
+    }
+    return {
+        "index": live["sources"],
+        "live_runs": len(live["runs"]),
+        "live_bytes": scan["live_bytes"],
+        "index_age_seconds": round(index_age, 1),
+        "dry_run": dry_run,
+        "waiting_for_grace": waiting,
+        "categories": totals,
+        "garbage_files": sum(i["files"] for i in garbage),
+        "garbage_bytes": sum(i["bytes"] for i in garbage),
+        "garbage": garbage,
+        "deleted": len(deleted),
+        "kept_newer_than_index": too_new,
+        "journal_records_dropped": journal_dropped,
+    }
@@ -0,0 +1,250 @@
+"""
+Build Journal
+
+Makes long builds resumable. Every run that finishes is appended to a
+journal as one JSON line holding its index entries and the SHA-256 of
+every file written for it:
+
+    {"run": "/data/outputs/20251124_143025",
+     "entries": [{...StandardIndexEntry...}],
+     "files": {"runs/<run_id>/meta.json": "<sha256>", ...}}
+
+Each line is flushed and fsynced before the next run is recorded, so after
+a crash the journal holds every finished run; a line cut off by the crash
+is ignored when the journal is read. A resumed build skips journaled runs
+whose files are all still intact and rebuilds the index from the journal.
+
+The journal records raw run locations, so it is kept in the output
+directory's state directory (see core/state.py), not in the published
+tree. A journal left in the output directory by older builds is moved
+there when the journal is next loaded or reset.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from .models import StandardIndexEntry
+from .state import build_state_dir
+
+JOURNAL_FILENAME = "build_journal.jsonl"
+
+# Journal file of builds that kept it in the output directory
+LEGACY_JOURNAL_FILENAME = ".build_journal.jsonl"
+
+# Read size used when hashing output files
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def run_key(run_dir: Any) -> str:
+    """
+    Journal key of a run
+
+    Local directories and archives are keyed by their resolved path, so a
+    run is found again whether --raw-dir was given relative, absolute or
+    through a symlink. Runs on storage are keyed by their URI.
+
+    Args:
+        run_dir: Run directory, archive, RunSource or a key read from the
+            journal
+    """
+    uri = getattr(run_dir, "uri", None)
+    if uri is not None:
+        return uri
+    location = str(getattr(run_dir, "location", run_dir))
+    if "://" in location:
+        return location
+    return str(Path(location).resolve())
+
+
+class BuildJournal:
+    """Append-only, fsynced record of the runs finished by a build"""
+
+    def __init__(self, output_dir: Path, state_dir: Optional[Path] = None):
+        """
+        Args:
+            output_dir: Output directory of the static data
+            state_dir: Directory holding the journal (default: the output
+                directory's state directory under the cache home)
+        """
+        self.output_dir = Path(output_dir)
+        self.path = build_state_dir(self.output_dir, state_dir) / JOURNAL_FILENAME
+        self.records: Dict[str, Dict[str, Any]] = {}
+
+    def _move_legacy_journal(self):
+        """Move a journal out of the output directory (or drop it if stale)"""
+        legacy_path = self.output_dir / LEGACY_JOURNAL_FILENAME
+        if not legacy_path.exists():
+            return
+        if self.path.exists():
+            legacy_path.unlink()
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(legacy_path), str(self.path))
+
+    def reset(self):
+        """Start an empty journal (for a build that does not resume)"""
+        self._move_legacy_journal()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _records(self) -> Iterator[Dict[str, Any]]:
+        """Read the complete records of the journal"""
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut off by a crash while it was being written
+                    continue
+                if isinstance(record, dict) and "run" in record:
+                    yield record
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the journal into self.records
+
+        A record cut off by a crash is dropped from the file, so records
+        appended after it start on a line of their own.
+
+        Returns:
+            Latest record of every journaled run, keyed by run key
+        """
+        self._move_legacy_journal()
+        self._truncate_partial_line()
+        # Older builds keyed runs by the path as given
+        self.records = {run_key(record["run"]): record for record in self._records()}
+        return self.records
+
+    def _truncate_partial_line(self):
+        """Cut the journal after its last complete line"""
+        try:
+            with open(self.path, "r+b") as f:
+                data = f.read()
+                end = data.rfind(b"\n") + 1
+                if end != len(data):
+                    f.truncate(end)
+                    f.flush()
+                    os.fsync(f.fileno())
+        except FileNotFoundError:
+            pass
+
+    def record(
+        self,
+        run_dir: Any,
+        entries: List[StandardIndexEntry],
+        digests: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Append a finished run, with checksums of its output files
+
+        Args:
+            run_dir: Run directory or source the entries were built from
+            entries: Index entries of the run (one per model)
+            digests: SHA-256 of output files already hashed while they were
+                written, keyed by path relative to the output directory;
+                other files are read to be hashed
+
+        Returns:
+            The appended record
+        """
+        digests = digests or {}
+        files = {}
+        for entry in entries:
+            run_output = self.output_dir / "runs" / entry.run_id
+            for path in sorted(run_output.rglob("*")):
+                if path.is_file():
+                    relative = path.relative_to(self.output_dir).as_posix()
+                    files[relative] = digests.get(relative) or file_sha256(path)
+
+        record = {
+            "run": run_key(run_dir),
+            "entries": [entry.to_dict() for entry in entries],
+            "files": files,
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        return record
+
+    def compact(self, run_ids: Set[str], dry_run: bool = False) -> int:
+        """
+        Rewrite the journal with the latest record of every kept run
+
+        Records superseded by a later one, or with an entry whose run_id
+        is not in run_ids, are dropped. The journal is replaced
+        atomically.
+
+        Args:
+            run_ids: Run ids to keep records for
+            dry_run: Only count the records that would be dropped
+
+        Returns:
+            Number of records dropped
+        """
+        records = list(self._records())
+        latest = {run_key(record["run"]): record for record in records}
+        kept = [
+            record
+            for record in latest.values()
+            if all(entry["run_id"] in run_ids for entry in record.get("entries", []))
+        ]
+        dropped = len(records) - len(kept)
+        if dry_run or dropped == 0:
+            return dropped
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in kept:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.records = {run_key(record["run"]): record for record in kept}
+        return dropped
+
+    def is_intact(self, record: Dict[str, Any]) -> bool:
+        """Whether every output file of a journaled run is unchanged"""
+        for relative, digest in record.get("files", {}).items():
+            path = self.output_dir / relative
+            if not path.is_file() or file_sha256(path) != digest:
+                return False
+        return bool(record.get("files"))
+
+    def resume_entries(self, run_dir: Any) -> Optional[List[StandardIndexEntry]]:
+        """
+        Get the journaled entries of a run whose outputs are intact
+
+        Requires load().
+
+        Args:
+            run_dir: Run directory or source
+
+        Returns:
+            The run's index entries, or None if the run must be rebuilt
+        """
+        record = self.records.get(run_key(run_dir))
+        if record is None or not self.is_intact(record):
+            return None
+        return [StandardIndexEntry(**entry) for entry in record["entries"]]
@@ -0,0 +1,185 @@
+"""
+JSONL Reader
+
+Shared memory-mapped reader for JSONL files. Records are located with
+bytes.find on the mapped file and handed out as memoryview slices, so
+lines can be skipped or counted without being copied or decoded, and
+decoded only when needed.
+
+orjson is used as the decoder when installed (it accepts memoryviews
+directly); otherwise the standard json module decodes the record bytes.
+"""
+
+import json
+import mmap
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Bytes treated as blank-line padding
+_WHITESPACE = b" \t\r\n"
+
+
+def decode_record(view: memoryview) -> Any:
+    """
+    Decode one JSONL record
+
+    Args:
+        view: Record bytes (as yielded by JsonlReader)
+
+    Returns:
+        Decoded JSON value
+    """
+    if orjson is not None:
+        return orjson.loads(view)
+    return json.loads(bytes(view))
+
+
+class JsonlReader:
+    """
+    Memory-mapped JSONL file reader.
+
+    Use as a context manager. Views yielded by iter_lines point into the
+    mapping and must not be used after the reader is closed.
+    """
+
+    def __init__(self, file_path: Path):
+        """
+        Args:
+            file_path: JSONL file
+        """
+        self.file_path = Path(file_path)
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+
+    def __enter__(self) -> "JsonlReader":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def size(self) -> int:
+        """Size of the mapped file in bytes"""
+        return len(self._map) if self._map is not None else 0
+
+    def open(self):
+        """Map the file (empty files are not mapped)"""
+        self._file = open(self.file_path, "rb")
+        if self.file_path.stat().st_size > 0:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._map)
+
+    def close(self):
+        """Unmap and close the file"""
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Slices are still referenced; the mapping is released
+                # when they are garbage collected
+                pass
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def iter_lines(
+        self, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[Tuple[int, memoryview]]:
+        """
+        Iterate over the non-blank lines of a byte range
+
+        Args:
+            start: Range start (beginning of a line)
+            end: Range end, exclusive (default: end of file)
+
+        Yields:
+            Tuples of (line start offset, line bytes without the newline)
+        """
+        if self._map is None:
+            return
+        data = self._map
+        view = self._view
+        end = len(data) if end is None else min(end, len(data))
+        position = start
+
+        while position < end:
+            newline = data.find(b"\n", position, end)
+            line_end = end if newline == -1 else newline
+            if line_end > position:
+                # Records start with a non-blank byte; only lines that don't
+                # are copied to check whether they are blank
+                if data[position] not in _WHITESPACE or data[position:line_end].strip():
+                    yield position, view[position:line_end]
+            position = line_end + 1
+
+    def iter_records(
+        self, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[Any]:
+        """
+        Iterate over the decoded records of a byte range
+
+        Args:
+            start: Range start (beginning of a line)
+            end: Range end, exclusive (default: end of file)
+
+        Yields:
+            Decoded JSON records
+        """
+        for _, line in self.iter_lines(start, end):
+            yield decode_record(line)
+
+    def count(self) -> int:
+        """Count the records without decoding them"""
+        return sum(1 for _ in self.iter_lines())
+
+
+def iter_jsonl(file_path: Path) -> Iterator[Any]:
+    """
+    Iterate over the records of a JSONL file, decoding lazily
+
+    Args:
+        file_path: JSONL file
+
+    Yields:
+        Decoded JSON records
+    """
+    with JsonlReader(file_path) as reader:
+        yield from reader.iter_records()
+
+
+def load_jsonl(file_path: Path) -> List[Any]:
+    """
+    Load all records of a JSONL file
+
+    Args:
+        file_path: JSONL file
+
+    Returns:
+        List of decoded JSON records
+    """
+    return list(iter_jsonl(file_path))
+
+
+def count_jsonl(file_path: Path) -> int:
+    """
+    Count the records of a JSONL file without decoding them
+
+    Args:
+        file_path: JSONL file
+
+    Returns:
+        Number of non-blank lines
+    """
+    with JsonlReader(file_path) as reader:
+        return reader.count()
@@ -0,0 +1,302 @@
+"""
+Deployment Manifest
+
+Records the path, size and SHA-256 of every file in the output tree in
+deploy_manifest.json, so a sync step can upload only what changed since
+the last published build (see diff_manifest.py):
+
+    {
+      "schema_version": "1.0",
+      "total_files": 2,
+      "total_bytes": 5120,
+      "files": {
+        "index.json": {"size": 1024, "sha256": "..."},
+        "runs/<run_id>/meta.json": {"size": 4096, "sha256": "..."}
+      }
+    }
+
+DataBuilder writes its files through DeployManifest.open, which hashes the
+bytes as they are written, so building the manifest needs no second read
+pass. Files the build did not write (unchanged index pages, runs resumed
+from the journal or copied from shards) keep the entry of the manifest
+they were recorded in, as long as their size matches and they have not
+been modified since that manifest was written. Only the remaining files,
+such as catalog.sqlite (written by SQLite), are read to be hashed.
+
+Hidden files (the build journal) and *.tmp files are not part of the
+manifest.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .journal import file_sha256
+from .schema import SCHEMA_VERSION
+
+DEPLOY_MANIFEST_FILENAME = "deploy_manifest.json"
+
+# Text written through HashingWriter is encoded and hashed in chunks of
+# about this many characters
+WRITE_BUFFER_CHARS = 64 * 1024
+
+
+class HashingWriter:
+    """
+    Binary output file that hashes its content while it is written
+
+    Accepts str (encoded as UTF-8) and bytes, so it can stand in for text
+    files passed to json.dump as well as for binary files. On close the
+    file's size and SHA-256 are recorded in the manifest.
+    """
+
+    def __init__(self, manifest: "DeployManifest", path: Path):
+        self._manifest = manifest
+        self._path = Path(path)
+        self._file = open(self._path, "wb")
+        self._hasher = hashlib.sha256()
+        self._size = 0
+        self._pending: List[str] = []
+        self._pending_chars = 0
+
+    def write(self, data: Union[str, bytes]) -> int:
+        """Write text or bytes"""
+        if isinstance(data, str):
+            # json.dump writes many small chunks: encode them in batches
+            self._pending.append(data)
+            self._pending_chars += len(data)
+            if self._pending_chars >= WRITE_BUFFER_CHARS:
+                self._flush_text()
+            return len(data)
+        self._flush_text()
+        self._write_bytes(data)
+        return len(data)
+
+    def tell(self) -> int:
+        """Number of bytes written so far"""
+        self._flush_text()
+        return self._size
+
+    def _flush_text(self):
+        if self._pending:
+            text = "".join(self._pending)
+            self._pending.clear()
+            self._pending_chars = 0
+            self._write_bytes(text.encode("utf-8"))
+
+    def _write_bytes(self, data: bytes):
+        self._hasher.update(data)
+        self._size += len(data)
+        self._file.write(data)
+
+    def close(self):
+        """Close the file and record it in the manifest"""
+        if self._file.closed:
+            return
+        self._flush_text()
+        self._file.close()
+        self._manifest.record(self._path, self._size, self._hasher.hexdigest())
+
+    def __enter__(self) -> "HashingWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class DeployManifest:
+    """Content hashes of the files in an output tree"""
+
+    def __init__(self, output_dir: Path):
+        """
+        Args:
+            output_dir: Output directory of the static data; entries of
+                its previous manifest are reused for unmodified files
+        """
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / DEPLOY_MANIFEST_FILENAME
+        # Files written by this build, keyed by POSIX path relative to the
+        # output directory
+        self.files: Dict[str, Dict[str, Any]] = {}
+        # Manifests whose entries are reused, with their path prefixes; read
+        # in write() so the builder stays cheap to send to worker processes
+        self._adopted: List[Tuple[Path, str]] = [(self.path, "")]
+
+    def fork(self) -> "DeployManifest":
+        """
+        Copy the manifest without the files recorded so far
+
+        Worker processes record the files of their run into a fork, which
+        stays small to send to them however much the build has written.
+        """
+        fork = DeployManifest(self.output_dir)
+        fork._adopted = list(self._adopted)
+        return fork
+
+    def relative(self, path: Path) -> str:
+        """POSIX path of a file relative to the output directory"""
+        return Path(path).relative_to(self.output_dir).as_posix()
+
+    def open(self, path: Path) -> HashingWriter:
+        """Open an output file for writing, hashing it as it is written"""
+        return HashingWriter(self, path)
+
+    def write_bytes(self, path: Path, data: bytes):
+        """Write an output file at once"""
+        with self.open(path) as f:
+            f.write(data)
+
+    def record(self, path: Path, size: int, sha256: str):
+        """Record a file written by this build"""
+        self.files[self.relative(path)] = {"size": size, "sha256": sha256}
+
+    def record_digests(self, digests: Dict[str, str]):
+        """
+        Record files with known hashes (e.g. verified journal checksums)
+
+        Args:
+            digests: SHA-256 keyed by path relative to the output directory
+        """
+        for relative, digest in digests.items():
+            try:
+                size = (self.output_dir / relative).stat().st_size
+            except OSError:
+                continue
+            self.files[relative] = {"size": size, "sha256": digest}
+
+    def digests(self, prefix: str = "") -> Dict[str, str]:
+        """SHA-256 of the files written by this build under a path prefix"""
+        return {
+            relative: entry["sha256"]
+            for relative, entry in self.files.items()
+            if relative.startswith(prefix)
+        }
+
+    def adopt(self, manifest_path: Path, prefix: str = ""):
+        """
+        Reuse the entries of another manifest for unmodified files
+
+        Args:
+            manifest_path: deploy_manifest.json of a tree files were copied
+                from (with their modification times); the tree's own
+                previous manifest is always adopted
+            prefix: Only adopt entries under this path prefix
+        """
+        self._adopted.append((Path(manifest_path), prefix))
+
+    def _load_adopted(self) -> Dict[str, Tuple[Dict[str, Any], int]]:
+        """Entries of the adopted manifests with the mtime of their manifest"""
+        known = {}
+        for manifest_path, prefix in self._adopted:
+            manifest = load_manifest(manifest_path)
+            if manifest is None:
+                continue
+            stamp = manifest_path.stat().st_mtime_ns
+            for relative, entry in manifest.get("files", {}).items():
+                if relative.startswith(prefix):
+                    known[relative] = (entry, stamp)
+        return known
+
+    def _entry(
+        self,
+        relative: str,
+        stat: os.stat_result,
+        known: Dict[str, Tuple[Dict[str, Any], int]],
+    ) -> Dict[str, Any]:
+        """
+        Get the manifest entry of a file in the tree
+
+        Args:
+            relative: Path relative to the output directory
+            stat: Result of os.stat on the file
+            known: Entries of the adopted manifests
+
+        Returns:
+            {"size", "sha256"}; the file is only read if neither this build
+            nor an adopted manifest recorded it unchanged
+        """
+        written = self.files.get(relative)
+        if written is not None and written["size"] == stat.st_size:
+            return written
+        if relative in known:
+            entry, stamp = known[relative]
+            if entry.get("size") == stat.st_size and stat.st_mtime_ns < stamp:
+                return {"size": entry["size"], "sha256": entry["sha256"]}
+        return {
+            "size": stat.st_size,
+            "sha256": file_sha256(self.output_dir / relative),
+        }
+
+    def write(self) -> Path:
+        """
+        Write deploy_manifest.json for the current content of the tree
+
+        The manifest is replaced atomically, so readers never see a
+        partial file.
+
+        Returns:
+            Path to deploy_manifest.json
+        """
+        known = self._load_adopted()
+        files = {}
+        for root, dirs, names in os.walk(self.output_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(names):
+                if name.startswith(".") or name.endswith(".tmp"):
+                    continue
+                path = Path(root) / name
+                relative = self.relative(path)
+                if relative == DEPLOY_MANIFEST_FILENAME:
+                    continue
+                files[relative] = self._entry(relative, path.stat(), known)
+
+        data = {
+            "schema_version": SCHEMA_VERSION,
+            "total_files": len(files),
+            "total_bytes": sum(entry["size"] for entry in files.values()),
+            "files": dict(sorted(files.items())),
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        return self.path
+
+
+def load_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    """Load a deploy manifest, or None if it is missing or unreadable"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def diff_manifests(
+    old: Dict[str, Any], new: Dict[str, Any]
+) -> Dict[str, List[str]]:
+    """
+    Compare two deploy manifests
+
+    Args:
+        old: Previously published manifest
+        new: Manifest of the new build
+
+    Returns:
+        Sorted paths that were "added", "changed" (different content) and
+        "removed"
+    """
+    old_files = old.get("files", {})
+    new_files = new.get("files", {})
+    return {
+        "added": sorted(set(new_files) - set(old_files)),
+        "changed": sorted(
+            path
+            for path in set(new_files) & set(old_files)
+            if new_files[path].get("sha256") != old_files[path].get("sha256")
+        ),
+        "removed": sorted(set(old_files) - set(new_files)),
+    }
@@ -36,6 +36,7 @@ class StandardSubset:
     score: float
     num: int
     metadata: Dict[str, Any] = field(default_factory=dict)
+    confidence_interval: Optional[Dict[str, float]] = None
 
 
 @dataclass
@@ -46,6 +47,7 @@ class StandardCategory:
     macro_score: float
     num_samples: int
     subsets: List[StandardSubset] = field(default_factory=list)
+    confidence_interval: Optional[Dict[str, float]] = None
 
 
 @dataclass
@@ -57,26 +59,45 @@ class StandardBenchmarkResult:
     overall_score: float
     categories: List[StandardCategory] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Bootstrap confidence intervals keyed by metric name
+    confidence_intervals: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    # Sample-level aggregates keyed by metadata field (e.g. "difficulty")
+    groupings: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
         result = asdict(self)
+        if not self.confidence_intervals:
+            del result["confidence_intervals"]
+        if not self.groupings:
+            del result["groupings"]
         # Convert categories to dict format
         result["categories"] = [
-            {
-                "name": cat.name,
-                "score": cat.score,
-                "macro_score": cat.macro_score,
-                "num_samples": cat.num_samples,
-                "subsets": [
-                    {"name": s.name, "score": s.score, "num": s.num}
-                    for s in cat.subsets
-                ],
-            }
-            for cat in self.categories
+            self._category_to_dict(cat) for cat in self.categories
         ]
         return result
 
+    @staticmethod
+    def _category_to_dict(cat: StandardCategory) -> Dict[str, Any]:
+        """Convert a category to dict format, with intervals when present"""
+        subsets = []
+        for s in cat.subsets:
+            subset = {"name": s.name, "score": s.score, "num": s.num}
+            if s.confidence_interval is not None:
+                subset["confidence_interval"] = s.confidence_interval
+            subsets.append(subset)
+
+        category = {
+            "name": cat.name,
+            "score": cat.score,
+            "macro_score": cat.macro_score,
+            "num_samples": cat.num_samples,
+            "subsets": subsets,
+        }
+        if cat.confidence_interval is not None:
+            category["confidence_interval"] = cat.confidence_interval
+        return category
+
 
 @dataclass
 class StandardRunMeta:
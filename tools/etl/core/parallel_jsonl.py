@@ -0,0 +1,243 @@
+"""
+Parallel JSONL Reader
+
+Splits one large JSONL file into newline-aligned byte ranges and decodes
+the ranges in a process pool. Results are either reassembled in file
+order (map), combined into an aggregate (reduce) or collected into a
+key -> byte offset index (index), so a single huge predictions file is
+no longer bound to one core.
+
+Transforms and reducers run in worker processes and must be picklable,
+i.e. module-level functions.
+"""
+
+import os
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .jsonl import JsonlReader, decode_record
+
+# Default size of one byte range handed to a worker
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def split_jsonl_ranges(
+    file_path: Path, chunk_bytes: int = DEFAULT_CHUNK_BYTES
+) -> List[Tuple[int, int]]:
+    """
+    Split a JSONL file into newline-aligned byte ranges
+
+    Every range starts at the beginning of a line and ends right after a
+    newline (or at end of file), so each record falls in exactly one range.
+
+    Args:
+        file_path: JSONL file
+        chunk_bytes: Approximate size of each range
+
+    Returns:
+        List of (start, end) byte offsets, end exclusive
+    """
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return []
+
+    boundaries = [0]
+    with open(file_path, "rb") as f:
+        position = chunk_bytes
+        while position < size:
+            f.seek(position)
+            f.readline()
+            boundary = f.tell()
+            if boundary >= size:
+                break
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+            position = boundary + chunk_bytes
+    boundaries.append(size)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def read_jsonl_range(file_path: Path, start: int, end: int) -> Iterator[Any]:
+    """
+    Decode the records of one byte range
+
+    Args:
+        file_path: JSONL file
+        start: Range start (beginning of a line)
+        end: Range end (exclusive)
+
+    Yields:
+        Decoded JSON records
+    """
+    with JsonlReader(file_path) as reader:
+        yield from reader.iter_records(start, end)
+
+
+def _map_range(
+    file_path: str, start: int, end: int, transform: Optional[Callable]
+) -> List[Any]:
+    """Worker: decode a range and transform its records"""
+    results = []
+    for record in read_jsonl_range(Path(file_path), start, end):
+        if transform is not None:
+            record = transform(record)
+            if record is None:
+                continue
+        results.append(record)
+    return results
+
+
+def _reduce_range(
+    file_path: str, start: int, end: int, mapper: Callable, initial: Any
+) -> Any:
+    """Worker: fold the records of a range into a partial aggregate"""
+    accumulator = initial
+    for record in read_jsonl_range(Path(file_path), start, end):
+        accumulator = mapper(accumulator, record)
+    return accumulator
+
+
+def _index_range(file_path: str, start: int, end: int, key: str) -> Dict[Any, int]:
+    """Worker: map the key field of each record of a range to its offset"""
+    index = {}
+    with JsonlReader(Path(file_path)) as reader:
+        for offset, line in reader.iter_lines(start, end):
+            index[decode_record(line).get(key)] = offset
+    return index
+
+
+def parallel_map_jsonl(
+    file_path: Path,
+    transform: Optional[Callable[[dict], Any]] = None,
+    workers: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    initializer: Optional[Callable] = None,
+    initargs: Tuple = (),
+) -> Iterator[Any]:
+    """
+    Decode and transform a JSONL file in parallel, yielding in file order
+
+    At most two ranges per worker are in flight, so memory stays bounded
+    by the chunk size rather than the file size.
+
+    Args:
+        file_path: JSONL file
+        transform: Per-record function; records mapped to None are dropped
+        workers: Number of worker processes (default: CPU count)
+        chunk_bytes: Approximate size of each byte range
+        initializer: Called once in each worker (e.g. to load join tables)
+        initargs: Arguments for initializer
+
+    Yields:
+        Transformed records in file order
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    ranges = split_jsonl_ranges(file_path, chunk_bytes)
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=initializer, initargs=initargs
+    ) as executor:
+        pending = deque()
+        next_range = iter(ranges)
+
+        def submit_next() -> bool:
+            byte_range = next(next_range, None)
+            if byte_range is None:
+                return False
+            pending.append(
+                executor.submit(_map_range, str(file_path), *byte_range, transform)
+            )
+            return True
+
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+
+        while pending:
+            results = pending.popleft().result()
+            submit_next()
+            yield from results
+
+
+def parallel_reduce_jsonl(
+    file_path: Path,
+    mapper: Callable[[Any, dict], Any],
+    reducer: Callable[[Any, Any], Any],
+    initial: Any,
+    workers: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> Any:
+    """
+    Aggregate a JSONL file in parallel
+
+    Each worker folds its range with mapper(accumulator, record), starting
+    from a copy of initial; the partial aggregates are then combined in
+    file order with reducer(left, right).
+
+    Args:
+        file_path: JSONL file
+        mapper: Fold function applied to each record within a range
+        reducer: Combines two partial aggregates
+        initial: Initial (identity) aggregate
+        workers: Number of worker processes (default: CPU count)
+        chunk_bytes: Approximate size of each byte range
+
+    Returns:
+        The combined aggregate
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    ranges = split_jsonl_ranges(file_path, chunk_bytes)
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_reduce_range, str(file_path), start, end, mapper, initial)
+            for start, end in ranges
+        ]
+        result = initial
+        for future in futures:
+            result = reducer(result, future.result())
+    return result
+
+
+def parallel_index_jsonl(
+    file_path: Path,
+    key: str = "id",
+    workers: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> Dict[Any, int]:
+    """
+    Build a key -> byte offset index of a JSONL file in parallel
+
+    Only the index crosses process boundaries, not the records, so a
+    join table of a large file costs a few dozen bytes per record. Later
+    records win over earlier ones with the same key.
+
+    Args:
+        file_path: JSONL file of JSON objects
+        key: Field indexed
+        workers: Number of worker processes (default: CPU count)
+        chunk_bytes: Approximate size of each byte range
+
+    Returns:
+        Dictionary mapping key values to line start offsets
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    ranges = split_jsonl_ranges(file_path, chunk_bytes)
+    workers = workers or os.cpu_count() or 1
+
+    index: Dict[Any, int] = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_index_range, str(file_path), start, end, key)
+            for start, end in ranges
+        ]
+        for future in futures:
+            index.update(future.result())
+    return index
@@ -0,0 +1,193 @@
+"""
+Payload Report
+
+Measures the bytes each page route of the viewer downloads before its
+first paint, per run, and flags runs whose routes exceed a budget. The
+report is written to payload_report.json with the index:
+
+    {
+      "schema_version": "1.0",
+      "budget": 1048576,
+      "index": {"bytes": 20480, "files": ["index.json"], "over_budget": false},
+      "total_runs": 2,
+      "over_budget": ["<run_id>"],
+      "runs": [
+        {
+          "run_id": "<run_id>",
+          "routes": {"/runs/[runId]": 3072, "/runs/[runId]/samples": 1220000},
+          "bundle_bytes": 2900,
+          "largest_dataset": "gsm8k",
+          "over_budget": true
+        }
+      ]
+    }
+
+Runs are sorted by their largest route, largest first. Routes are
+measured by the files their pages fetch (web/app/runs/[runId]): the run
+page loads meta.json and eval_summary.json; the samples page loads the
+run list, meta.json and the head file of one dataset, and is reported
+for the dataset with the largest one. Blob files are fetched on demand
+when a sample is expanded and do not count. bundle_bytes is the size of
+the run bundle, which no page loads yet: the run route's payload if its
+page switched to it (null for runs built before bundles). Sizes are the
+bytes on disk, before any compression by the server.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .scheduler import format_memory_size
+from .schema import SCHEMA_VERSION
+
+PAYLOAD_REPORT_FILENAME = "payload_report.json"
+
+# Compact per-run file with meta, summary and small stats for the run page
+RUN_BUNDLE_FILENAME = "bundle.json"
+
+# Default first-paint budget of a page route
+DEFAULT_PAYLOAD_BUDGET = 1024 * 1024
+
+ROUTE_RUN = "/runs/[runId]"
+ROUTE_SAMPLES = "/runs/[runId]/samples"
+
+# Directory holding the time-partitioned index pages (see builder)
+_INDEX_PARTITION_DIR = "index"
+
+
+def _size(path: Path) -> Optional[int]:
+    """Size of a file, or None if it does not exist"""
+    try:
+        return path.stat().st_size
+    except OSError:
+        return None
+
+
+def measure_index(output_dir: Path) -> Dict[str, Any]:
+    """
+    Measure the payload of the run list
+
+    The viewer loads index.json when it exists, and otherwise the
+    partition manifest and the newest index page.
+
+    Args:
+        output_dir: Output directory of the static data
+
+    Returns:
+        {"bytes", "files"}
+    """
+    output_dir = Path(output_dir)
+    size = _size(output_dir / "index.json")
+    if size is not None:
+        return {"bytes": size, "files": ["index.json"]}
+
+    files = [f"{_INDEX_PARTITION_DIR}/manifest.json"]
+    pages = sorted((output_dir / _INDEX_PARTITION_DIR).glob("????-??.json"))
+    if pages:
+        files.append(f"{_INDEX_PARTITION_DIR}/{pages[-1].name}")
+    elif (output_dir / _INDEX_PARTITION_DIR / "unknown.json").exists():
+        files.append(f"{_INDEX_PARTITION_DIR}/unknown.json")
+    return {
+        "bytes": sum(_size(output_dir / f) or 0 for f in files),
+        "files": files,
+    }
+
+
+def measure_run(
+    run_dir: Path, datasets: Iterable[str], index_bytes: int = 0
+) -> Dict[str, Any]:
+    """
+    Measure the route payloads of one run
+
+    Args:
+        run_dir: runs/<run_id> directory
+        datasets: Datasets of the run
+        index_bytes: Payload of the run list, which the samples page loads
+
+    Returns:
+        {"routes": {route: bytes}, "bundle_bytes", "largest_dataset"}
+    """
+    run_dir = Path(run_dir)
+    meta_bytes = _size(run_dir / "meta.json") or 0
+    run_bytes = meta_bytes + (_size(run_dir / "eval_summary.json") or 0)
+
+    largest: Tuple[int, Optional[str]] = (0, None)
+    for dataset in datasets:
+        head_size = _size(run_dir / "samples" / f"{dataset}_head.jsonl")
+        if head_size is not None and head_size >= largest[0]:
+            largest = (head_size, dataset)
+
+    return {
+        "routes": {
+            ROUTE_RUN: run_bytes,
+            ROUTE_SAMPLES: index_bytes + meta_bytes + largest[0],
+        },
+        "bundle_bytes": _size(run_dir / RUN_BUNDLE_FILENAME),
+        "largest_dataset": largest[1],
+    }
+
+
+def build_payload_report(
+    output_dir: Path,
+    runs: Dict[str, List[str]],
+    budget: int = DEFAULT_PAYLOAD_BUDGET,
+) -> Dict[str, Any]:
+    """
+    Measure the route payloads of all runs of an output tree
+
+    Args:
+        output_dir: Output directory of the static data
+        runs: Datasets keyed by run ID
+        budget: Bytes a route may download before its first paint
+
+    Returns:
+        Payload report (see the module docstring)
+    """
+    output_dir = Path(output_dir)
+    index = measure_index(output_dir)
+    index["over_budget"] = index["bytes"] > budget
+
+    run_reports = []
+    for run_id, datasets in runs.items():
+        report = {
+            "run_id": run_id,
+            **measure_run(output_dir / "runs" / run_id, datasets, index["bytes"]),
+        }
+        report["over_budget"] = max(report["routes"].values()) > budget
+        run_reports.append(report)
+    run_reports.sort(key=lambda r: (-max(r["routes"].values()), r["run_id"]))
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "budget": budget,
+        "index": index,
+        "total_runs": len(run_reports),
+        "over_budget": [r["run_id"] for r in run_reports if r["over_budget"]],
+        "runs": run_reports,
+    }
+
+
+def payload_warnings(report: Dict[str, Any]) -> List[str]:
+    """
+    Describe the routes of a payload report that exceed its budget
+
+    Args:
+        report: Payload report
+
+    Returns:
+        One message per problem, empty if everything fits
+    """
+    budget = format_memory_size(report["budget"])
+    warnings = []
+    if report["index"]["over_budget"]:
+        warnings.append(
+            f"The run list downloads {format_memory_size(report['index']['bytes'])}, "
+            f"over the {budget} budget"
+        )
+    if report["over_budget"]:
+        largest = report["runs"][0]
+        warnings.append(
+            f"{len(report['over_budget'])} run(s) have a page route over the "
+            f"{budget} budget (largest: {largest['run_id']}, "
+            f"{format_memory_size(max(largest['routes'].values()))})"
+        )
+    return warnings
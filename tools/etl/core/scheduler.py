@@ -0,0 +1,224 @@
+"""
+Memory-Budgeted Scheduling
+
+Keeps the memory held by in-flight work under a budget. Every task has a
+memory estimate derived from raw file sizes; a task is only started once
+its estimate fits next to the reservations of the tasks already running,
+and its reservation is released after the consumer has handled its result
+(e.g. after DataBuilder has written a dataset), which gives backpressure
+between extraction and writing.
+
+Tasks are started largest-first (first-fit decreasing): whenever memory
+frees up, the largest pending task that fits is started, and smaller ones
+fill the remaining room. A task larger than the whole budget still runs,
+but only when nothing else holds a reservation.
+
+The same scheduler admits runs into the run process pool and datasets
+into the per-run extraction thread pool.
+"""
+
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Callable, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+# In-memory size of decoded samples relative to their raw JSONL bytes
+SAMPLE_MEMORY_FACTOR = 4
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*$", re.IGNORECASE)
+
+
+def parse_memory_size(text: str) -> int:
+    """
+    Parse a memory size such as "512M", "8G" or "1.5GiB" into bytes
+
+    Args:
+        text: Number of bytes with an optional K/M/G/T (binary) suffix
+
+    Returns:
+        Size in bytes
+
+    Raises:
+        ValueError: If the text is not a valid size
+    """
+    match = _SIZE_PATTERN.match(text)
+    if match is None:
+        raise ValueError(f"Invalid memory size: {text}")
+    number, unit = match.groups()
+    return int(float(number) * _SIZE_UNITS[unit.upper()])
+
+
+def format_memory_size(size: int) -> str:
+    """Format a size in bytes for display ("1.5 GB")"""
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+class MemoryBudget:
+    """Byte reservations against a limit, shared by threads"""
+
+    def __init__(self, limit: Optional[int] = None):
+        """
+        Args:
+            limit: Budget in bytes, or None for no limit
+        """
+        self.limit = limit
+        self.in_use = 0
+        self.peak = 0
+        self._condition = threading.Condition()
+
+    def _fits(self, amount: int) -> bool:
+        return self.limit is None or self.in_use == 0 or self.in_use + amount <= self.limit
+
+    def _reserve(self, amount: int):
+        self.in_use += amount
+        self.peak = max(self.peak, self.in_use)
+
+    def try_acquire(self, amount: int) -> bool:
+        """
+        Reserve memory if it fits in the budget
+
+        A reservation larger than the budget fits when nothing else is
+        reserved.
+
+        Args:
+            amount: Bytes to reserve
+
+        Returns:
+            Whether the memory was reserved
+        """
+        with self._condition:
+            if not self._fits(amount):
+                return False
+            self._reserve(amount)
+            return True
+
+    def acquire(self, amount: int):
+        """Reserve memory, waiting until it fits in the budget"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._fits(amount))
+            self._reserve(amount)
+
+    def release(self, amount: int):
+        """Return reserved memory to the budget"""
+        with self._condition:
+            self.in_use -= amount
+            self._condition.notify_all()
+
+
+def run_budgeted(
+    executor: Executor,
+    tasks: Sequence[Tuple[Hashable, int, Callable[..., Any], Tuple[Any, ...]]],
+    budget: MemoryBudget,
+    max_in_flight: int,
+    stop: Optional[threading.Event] = None,
+) -> Iterator[Tuple[Hashable, Future]]:
+    """
+    Run tasks in an executor without exceeding a memory budget
+
+    Tasks are started largest estimate first, at most max_in_flight at a
+    time and only while their estimates fit in the budget. Each task's
+    reservation is held until the consumer resumes the iterator after
+    receiving it, so results waiting to be handled count as well.
+
+    Args:
+        executor: Executor to submit to
+        tasks: (key, memory estimate in bytes, function, args) tuples
+        budget: Memory budget, possibly shared with other schedulers
+        max_in_flight: Maximum number of tasks submitted at once
+        stop: Once set, no further tasks are started; tasks already
+            running are still waited for and yielded
+
+    Yields:
+        (key, future) pairs in completion order
+    """
+    pending: List[Tuple[Hashable, int, Callable[..., Any], Tuple[Any, ...]]] = sorted(
+        tasks, key=lambda task: task[1], reverse=True
+    )
+    running = {}
+
+    def submit(index: int):
+        key, estimate, fn, args = pending.pop(index)
+        running[executor.submit(fn, *args)] = (key, estimate)
+
+    try:
+        while pending or running:
+            if stop is not None and stop.is_set():
+                pending.clear()
+                if not running:
+                    break
+
+            index = 0
+            while index < len(pending) and len(running) < max_in_flight:
+                if budget.try_acquire(pending[index][1]):
+                    submit(index)
+                else:
+                    index += 1
+
+            if not running:
+                # Everything left is held back by reservations of other
+                # schedulers sharing the budget: wait for the largest
+                budget.acquire(pending[0][1])
+                submit(0)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, estimate = running.pop(future)
+                try:
+                    yield key, future
+                finally:
+                    budget.release(estimate)
+    finally:
+        for future, (_, estimate) in running.items():
+            future.cancel()
+            budget.release(estimate)
+
+
+def estimate_dataset_memory(adapter: Any, dataset: str) -> int:
+    """
+    Estimate the peak memory of extracting one dataset's samples
+
+    Args:
+        adapter: Adapter of the run (see BaseAdapter.sample_file_bytes)
+        dataset: Dataset name
+
+    Returns:
+        Estimated bytes
+    """
+    return adapter.sample_file_bytes(dataset) * SAMPLE_MEMORY_FACTOR
+
+
+def estimate_run_memory(adapter: Any, dataset_workers: int = 1) -> int:
+    """
+    Estimate the peak memory of processing one run
+
+    Every model of the run is processed at once, each with up to
+    dataset_workers datasets in flight, so the estimate is the sum over
+    models of their largest dataset_workers dataset estimates plus the
+    result files.
+
+    Args:
+        adapter: Adapter of the run
+        dataset_workers: Datasets extracted concurrently per model
+
+    Returns:
+        Estimated bytes
+    """
+    total = 0
+    for model_adapter in adapter.split_models():
+        estimates = sorted(
+            (
+                estimate_dataset_memory(model_adapter, dataset)
+                for dataset in model_adapter.extract_meta().datasets
+            ),
+            reverse=True,
+        )
+        total += sum(estimates[: max(1, dataset_workers)])
+        total += model_adapter.result_file_bytes() * SAMPLE_MEMORY_FACTOR
+    return total
@@ -43,6 +43,44 @@ INDEX_SCHEMA = {
     "required": ["runs", "total", "last_updated"],
 }
 
+# Schema for index/manifest.json (time-partitioned index root)
+INDEX_MANIFEST_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "schema_version": {"type": "string"},
+        "total": {"type": "integer"},
+        "last_updated": {"type": "string"},
+        "partitions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "key": {"type": "string"},
+                    "path": {"type": "string"},
+                    "total": {"type": "integer"},
+                    "first_timestamp": {"type": "string"},
+                    "last_timestamp": {"type": "string"},
+                    "sha256": {"type": "string"},
+                },
+                "required": ["key", "path", "total"],
+            },
+        },
+    },
+    "required": ["schema_version", "total", "last_updated", "partitions"],
+}
+
+# Schema for index/<YYYY-MM>.json (one page of the partitioned index)
+INDEX_PAGE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "schema_version": {"type": "string"},
+        "partition": {"type": "string"},
+        "runs": INDEX_SCHEMA["properties"]["runs"],
+        "total": {"type": "integer"},
+    },
+    "required": ["schema_version", "partition", "runs", "total"],
+}
+
 # Schema for meta.json
 META_SCHEMA = {
     "type": "object",
@@ -86,6 +124,32 @@ EVAL_SUMMARY_SCHEMA = {
                     "metrics": {"type": "object"},
                     "overall_score": {"type": "number"},
                     "categories": {"type": "array"},
+                    "confidence_intervals": {
+                        "type": "object",
+                        "additionalProperties": {
+                            "type": "object",
+                            "properties": {
+                                "low": {"type": "number"},
+                                "high": {"type": "number"},
+                                "confidence": {"type": "number"},
+                                "resamples": {"type": "integer"},
+                            },
+                        },
+                    },
+                    "groupings": {
+                        "type": "object",
+                        "additionalProperties": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "name": {"type": "string"},
+                                    "score": {"type": "number"},
+                                    "num": {"type": "integer"},
+                                },
+                            },
+                        },
+                    },
                 },
                 "required": ["dataset", "metrics", "overall_score"],
             },
@@ -100,3 +164,224 @@ EVAL_SUMMARY_SCHEMA = {
     },
     "required": ["schema_version", "run_id", "datasets", "overall"],
 }
+
+# Schema for one row of samples/<dataset>_head.jsonl
+SAMPLE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {},
+        "input": {},
+        "target": {},
+        "prediction": {},
+        "scores": {"type": "object"},
+        "metadata": {"type": "object"},
+        "choices": {"type": ["array", "null"]},
+        # Fields whose full text is in samples/<dataset>_blobs.txt; the
+        # inline value is then a preview
+        "blobs": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "properties": {
+                    "offset": {"type": "integer"},
+                    "length": {"type": "integer"},
+                    "format": {"type": "string", "enum": ["text", "json"]},
+                },
+                "required": ["offset", "length", "format"],
+            },
+        },
+    },
+    "required": ["id", "input", "target", "prediction"],
+}
+
+# Schema for trends/manifest.json
+TRENDS_MANIFEST_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "schema_version": {"type": "string"},
+        "models": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "properties": {
+                    "path": {"type": "string"},
+                    "runs": {"type": "integer"},
+                    "first_time": {"type": "integer"},
+                    "last_time": {"type": "integer"},
+                },
+                "required": ["path", "runs"],
+            },
+        },
+    },
+    "required": ["schema_version", "models"],
+}
+
+# Schema for trends/<model>.json (dt: base64 uint32, scores: base64 float32)
+MODEL_TRENDS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "schema_version": {"type": "string"},
+        "model": {"type": "string"},
+        "runs": {"type": "array", "items": {"type": "string"}},
+        "t0": {"type": "integer"},
+        "dt": {"type": "string"},
+        "series": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "additionalProperties": {"type": "string"},
+            },
+        },
+    },
+    "required": ["schema_version", "model", "runs", "t0", "dt", "series"],
+}
+
+# Schema for leaderboard.json
+LEADERBOARD_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "schema_version": {"type": "string"},
+        "method": {"type": "string"},
+        "comparisons": {"type": "integer"},
+        "datasets": {"type": "array"},
+        "runs": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "rank": {"type": "integer"},
+                    "run_id": {"type": "string"},
+                    "model": {"type": "string"},
+                    "rating": {"type": "number"},
+                    "interval": {
+                        "type": "object",
+                        "properties": {
+                            "low": {"type": "number"},
+                            "high": {"type": "number"},
+                        },
+                    },
+                    "wins": {"type": "integer"},
+                    "losses": {"type": "integer"},
+                    "ties": {"type": "integer"},
+                },
+                "required": ["rank", "run_id", "model", "rating"],
+            },
+        },
+    },
+    "required": ["schema_version", "method", "runs"],
+}
+
+# Schema for runs/<run_id>/failure_clusters.json
+FAILURE_CLUSTERS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "schema_version": {"type": "string"},
+        "run_id": {"type": "string"},
+        "threshold": {"type": "number"},
+        "fields": {"type": "array", "items": {"type": "string"}},
+        "similarity": {"type": "number"},
+        "datasets": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "properties": {
+                    "metric": {"type": ["string", "null"]},
+                    "failures": {"type": "integer"},
+                    "clustered": {"type": "integer"},
+                    "num_clusters": {"type": "integer"},
+                    "clusters": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "size": {"type": "integer"},
+                                "share": {"type": "number"},
+                                "mean_score": {"type": "number"},
+                                "representative": {},
+                                "sample_ids": {"type": "array"},
+                                "preview": {"type": "string"},
+                            },
+                            "required": ["size", "representative", "sample_ids"],
+                        },
+                    },
+                },
+                "required": ["failures", "clusters"],
+            },
+        },
+    },
+    "required": ["schema_version", "run_id", "datasets"],
+}
+
+# Schema for runs/<run_id>/bundle.json
+RUN_BUNDLE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "schema_version": {"type": "string"},
+        "run_id": {"type": "string"},
+        "meta": {"type": "object"},
+        "summary": {
+            "type": "object",
+            "properties": {
+                "datasets": EVAL_SUMMARY_SCHEMA["properties"]["datasets"],
+                "overall": EVAL_SUMMARY_SCHEMA["properties"]["overall"],
+            },
+        },
+        "stats": {
+            "type": "object",
+            "properties": {
+                "datasets": {
+                    "type": "object",
+                    "additionalProperties": {
+                        "type": "object",
+                        "properties": {
+                            "samples": {"type": "integer"},
+                            "head_bytes": {"type": "integer"},
+                            "blob_bytes": {"type": "integer"},
+                            "failures": {"type": "integer"},
+                            "failure_clusters": {"type": "integer"},
+                        },
+                        "required": ["samples", "head_bytes", "blob_bytes"],
+                    },
+                },
+            },
+        },
+    },
+    "required": ["schema_version", "run_id", "meta", "summary", "stats"],
+}
+
+# Schema for payload_report.json
+PAYLOAD_REPORT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "schema_version": {"type": "string"},
+        "budget": {"type": "integer"},
+        "index": {
+            "type": "object",
+            "properties": {
+                "bytes": {"type": "integer"},
+                "files": {"type": "array", "items": {"type": "string"}},
+                "over_budget": {"type": "boolean"},
+            },
+        },
+        "total_runs": {"type": "integer"},
+        "over_budget": {"type": "array", "items": {"type": "string"}},
+        "runs": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "run_id": {"type": "string"},
+                    "routes": {
+                        "type": "object",
+                        "additionalProperties": {"type": "integer"},
+                    },
+                    "bundle_bytes": {"type": ["integer", "null"]},
+                    "largest_dataset": {"type": ["string", "null"]},
+                    "over_budget": {"type": "boolean"},
+                },
+                "required": ["run_id", "routes", "over_budget"],
+            },
+        },
+    },
+    "required": ["schema_version", "budget", "index", "runs"],
+}
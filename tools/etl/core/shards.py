@@ -0,0 +1,168 @@
+"""
+Sharded Builds
+
+Splits a build across machines. With --shard i/N, build_static_data.py
+only processes the runs whose name hashes to shard i, and instead of the
+index it writes a partial index, shard_index.json:
+
+    {
+      "schema_version": "1.0",
+      "shard": {"index": 0, "count": 4},
+      "runs": [{"run": "20251124_143025", "entries": [{...}]}],
+      "total": 2
+    }
+
+With --compare or --leaderboard a shard also writes the per-sample scores
+of its runs to comparison_scores/<dataset>.json, since pairs of runs from
+different shards can only be compared once all shards are done.
+
+merge_shards.py combines the shard outputs into one tree: it copies the
+run directories, orders runs by run name (the order of an unsharded
+build) and writes the index, manifests, catalog, trends, comparisons and
+leaderboard from the merged runs. Merging never reads raw output, and its result
+does not depend on the order the shards are given in.
+"""
+
+import hashlib
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .models import StandardIndexEntry
+from .schema import SCHEMA_VERSION
+
+SHARD_INDEX_FILENAME = "shard_index.json"
+COMPARISON_SCORES_DIR = "comparison_scores"
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """
+    Parse a shard specification "i/N" (0 <= i < N)
+
+    Raises:
+        ValueError: If the specification is invalid
+    """
+    index, sep, count = text.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Invalid shard: {text} (expected i/N, e.g. 0/4)") from None
+    if not sep or count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard: {text} (expected 0 <= i < N)")
+    return index, count
+
+
+def shard_of(run_name: str, count: int) -> int:
+    """
+    Shard of a run
+
+    The hash only depends on the run name, so every node assigns runs the
+    same way, wherever the raw archive is mounted.
+    """
+    digest = hashlib.sha256(run_name.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def select_shard(run_dirs: List[Any], index: int, count: int) -> List[Any]:
+    """Keep the run directories (or sources) that belong to shard index"""
+    return [run_dir for run_dir in run_dirs if shard_of(run_dir.name, count) == index]
+
+
+def write_shard_index(
+    output_dir: Path,
+    shard: Tuple[int, int],
+    runs: List[Tuple[str, List[StandardIndexEntry]]],
+) -> Path:
+    """
+    Write the partial index of a shard
+
+    Args:
+        output_dir: Output directory of the shard
+        shard: (index, count)
+        runs: (run name, index entries) of the shard's finished runs
+
+    Returns:
+        Path to shard_index.json
+    """
+    runs = sorted(runs, key=lambda run: run[0])
+    data = {
+        "schema_version": SCHEMA_VERSION,
+        "shard": {"index": shard[0], "count": shard[1]},
+        "runs": [
+            {"run": name, "entries": [entry.to_dict() for entry in entries]}
+            for name, entries in runs
+        ],
+        "total": sum(len(entries) for _, entries in runs),
+    }
+    path = Path(output_dir) / SHARD_INDEX_FILENAME
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_shard_index(shard_dir: Path) -> Dict[str, Any]:
+    """
+    Load the partial index of a shard output directory
+
+    Raises:
+        FileNotFoundError: If the directory has no shard_index.json
+    """
+    path = Path(shard_dir) / SHARD_INDEX_FILENAME
+    if not path.exists():
+        raise FileNotFoundError(f"No {SHARD_INDEX_FILENAME} in {shard_dir}")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def merge_shard_indexes(
+    shard_dirs: List[Path],
+) -> List[Tuple[Path, str, List[StandardIndexEntry]]]:
+    """
+    Merge the partial indexes of a complete set of shards
+
+    Args:
+        shard_dirs: Output directories of the shards, in any order
+
+    Returns:
+        (shard directory, run name, index entries) per run, sorted by run name
+
+    Raises:
+        ValueError: If the shards do not form one complete set, or a run
+            or run_id appears in more than one shard
+    """
+    count = None
+    seen = {}
+    runs = []
+    for shard_dir in shard_dirs:
+        data = load_shard_index(shard_dir)
+        index, shard_count = data["shard"]["index"], data["shard"]["count"]
+        if count is None:
+            count = shard_count
+        elif shard_count != count:
+            raise ValueError(
+                f"{shard_dir} is shard {index}/{shard_count}, expected N = {count}"
+            )
+        if index in seen:
+            raise ValueError(f"Shard {index}/{count} given twice: {seen[index]}, {shard_dir}")
+        seen[index] = shard_dir
+
+        for run in data.get("runs", []):
+            entries = [StandardIndexEntry(**entry) for entry in run["entries"]]
+            runs.append((Path(shard_dir), run["run"], entries))
+
+    missing = sorted(set(range(count or 0)) - set(seen))
+    if missing:
+        raise ValueError(
+            f"Missing shard(s) {', '.join(f'{i}/{count}' for i in missing)}"
+        )
+
+    runs.sort(key=lambda run: run[1])
+    names = [name for _, name, _ in runs]
+    run_ids = [entry.run_id for _, _, entries in runs for entry in entries]
+    for label, values in (("Run", names), ("Run id", run_ids)):
+        duplicates = sorted(v for v, n in Counter(values).items() if n > 1)
+        if duplicates:
+            raise ValueError(f"{label} in more than one shard: {', '.join(duplicates)}")
+
+    return runs
@@ -0,0 +1,63 @@
+"""
+Build State
+
+The output directory is published as is (web/public/data, or served by
+serve_data.py), so state that only builds need is kept outside it: the
+build journal, which records raw run locations, the parsed config
+cache, which holds raw task configs, and the sample scores spilled for
+run comparisons. They live under a cache home:
+
+    $EVALSCOPE_VIEWER_CACHE_DIR, or
+    $XDG_CACHE_HOME/evalscope-viewer, or
+    ~/.cache/evalscope-viewer
+
+    <cache home>/
+    ├── configs/                      # Parsed run configs
+    └── builds/<out-dir name>-<hash>/ # State of one output directory
+        ├── build_journal.jsonl
+        └── spilled_scores/<run_id>.json
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
+CACHE_HOME_ENV = "EVALSCOPE_VIEWER_CACHE_DIR"
+
+# Directory of the sample scores spilled by runs of a compared build
+SPILLED_SCORES_DIR = "spilled_scores"
+
+
+def cache_home() -> Path:
+    """Root directory of the ETL's caches and build state"""
+    configured = os.environ.get(CACHE_HOME_ENV)
+    if configured:
+        return Path(configured).expanduser()
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg_cache).expanduser() if xdg_cache else Path.home() / ".cache"
+    return base / "evalscope-viewer"
+
+
+def config_cache_dir() -> Path:
+    """Default directory of the parsed config cache"""
+    return cache_home() / "configs"
+
+
+def build_state_dir(output_dir: Path, state_dir: Optional[Path] = None) -> Path:
+    """
+    Get the state directory of an output directory
+
+    Args:
+        output_dir: Output directory of the static data
+        state_dir: Explicit state directory (returned as is)
+
+    Returns:
+        A directory under the cache home keyed by the output directory's
+        absolute path, unless state_dir is given
+    """
+    if state_dir is not None:
+        return Path(state_dir)
+    resolved = Path(output_dir).resolve()
+    key = hashlib.sha256(str(resolved).encode("utf-8")).hexdigest()[:16]
+    return cache_home() / "builds" / f"{resolved.name}-{key}"
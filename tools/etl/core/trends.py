@@ -0,0 +1,269 @@
+"""
+Trend Store
+
+Maintains per-model time series of dataset metric scores across runs, so
+the trend chart of one model is a single small fetch instead of one
+eval_summary.json per run.
+
+Each model gets one file, trends/<model>.json, with its runs ordered by
+run timestamp and one column of scores per (dataset, metric):
+
+    {
+      "schema_version": "1.0",
+      "model": "Qwen/Qwen2-7B-Instruct",
+      "runs": ["run_...", "run_..."],
+      "t0": 1732458625,
+      "dt": "<base64 uint32>",
+      "series": {"mmlu": {"accuracy": "<base64 float32>"}}
+    }
+
+Timestamps are delta-encoded: run i happened at t0 + sum(dt[:i + 1])
+seconds (dt[0] is 0). Scores are little-endian float32, NaN where a run
+has no score for that series. trends/manifest.json lists every model
+file. Updates are incremental: new runs are merged into the existing
+files and only files whose content changes are rewritten.
+"""
+
+import base64
+import hashlib
+import json
+import re
+import sys
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .manifest import DeployManifest
+from .models import StandardIndexEntry
+from .schema import SCHEMA_VERSION
+
+TRENDS_DIR = "trends"
+
+_TIME_FORMATS = ("%Y%m%d_%H%M%S", "%Y%m%d%H%M%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S")
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def parse_run_time(entry: StandardIndexEntry) -> Optional[int]:
+    """
+    Get the time of a run in seconds since the epoch (UTC)
+
+    The run timestamp is used first and the start time second.
+
+    Args:
+        entry: Index entry
+
+    Returns:
+        Epoch seconds, or None if neither value can be parsed
+    """
+    for value in (entry.timestamp, entry.start_time):
+        if not value:
+            continue
+        value = value.rstrip("Z").split(".")[0]
+        for time_format in _TIME_FORMATS:
+            try:
+                parsed = datetime.strptime(value, time_format)
+            except ValueError:
+                continue
+            return int(parsed.replace(tzinfo=timezone.utc).timestamp())
+    return None
+
+
+def model_file_name(model_name: str) -> str:
+    """
+    Get the trend file name of a model
+
+    Unsafe characters are replaced and a short hash keeps names that only
+    differ in those characters apart.
+    """
+    slug = _UNSAFE_CHARS.sub("_", model_name).strip("_") or "model"
+    digest = hashlib.md5(model_name.encode("utf-8")).hexdigest()[:8]
+    return f"{slug}-{digest}.json"
+
+
+def _encode(values: array) -> str:
+    """Encode a typed array as little-endian base64"""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def _decode(typecode: str, data: str) -> array:
+    """Decode little-endian base64 into a typed array"""
+    values = array(typecode)
+    values.frombytes(base64.b64decode(data))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+# Run points: run_id -> (epoch seconds, {(dataset, metric): score})
+_Points = Dict[str, Tuple[int, Dict[Tuple[str, str], float]]]
+
+
+def decode_model_trends(data: Dict[str, Any]) -> _Points:
+    """
+    Decode a model trend file into run points
+
+    Args:
+        data: Parsed trends/<model>.json
+
+    Returns:
+        Dictionary mapping run_id to (epoch seconds, scores by (dataset, metric))
+    """
+    run_ids = data.get("runs", [])
+    times = []
+    current = data.get("t0", 0)
+    for delta in _decode("I", data.get("dt", "")):
+        current += delta
+        times.append(current)
+
+    points: _Points = {run_id: (time, {}) for run_id, time in zip(run_ids, times)}
+    for dataset, metrics in data.get("series", {}).items():
+        for metric, encoded in metrics.items():
+            for run_id, score in zip(run_ids, _decode("f", encoded)):
+                if score == score:  # skip NaN
+                    points[run_id][1][(dataset, metric)] = score
+    return points
+
+
+def encode_model_trends(model_name: str, points: _Points) -> Dict[str, Any]:
+    """
+    Encode run points into a model trend file
+
+    Args:
+        model_name: Model name
+        points: Run points (see decode_model_trends)
+
+    Returns:
+        JSON-serializable trend file content
+    """
+    ordered = sorted(points.items(), key=lambda item: (item[1][0], item[0]))
+    times = [time for _, (time, _) in ordered]
+    t0 = times[0] if times else 0
+
+    deltas = array("I")
+    previous = t0
+    for time in times:
+        deltas.append(time - previous)
+        previous = time
+
+    keys = sorted({key for _, (_, scores) in ordered for key in scores})
+    series: Dict[str, Dict[str, str]] = {}
+    for dataset, metric in keys:
+        column = array(
+            "f",
+            (scores.get((dataset, metric), float("nan")) for _, (_, scores) in ordered),
+        )
+        series.setdefault(dataset, {})[metric] = _encode(column)
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "model": model_name,
+        "runs": [run_id for run_id, _ in ordered],
+        "t0": t0,
+        "dt": _encode(deltas),
+        "series": series,
+    }
+
+
+class TrendStore:
+    """Incrementally updated per-model trend files"""
+
+    def __init__(
+        self, output_dir: Path, deploy_manifest: Optional[DeployManifest] = None
+    ):
+        """
+        Args:
+            output_dir: Output directory of the static data
+            deploy_manifest: Deployment manifest recording written files
+        """
+        self.trends_dir = Path(output_dir) / TRENDS_DIR
+        self.manifest_path = self.trends_dir / "manifest.json"
+        self.deploy_manifest = deploy_manifest
+
+    def _open(self, path: Path):
+        """Open a trend file for writing"""
+        if self.deploy_manifest is not None:
+            return self.deploy_manifest.open(path)
+        return open(path, "w", encoding="utf-8")
+
+    def update(
+        self,
+        entries: List[StandardIndexEntry],
+        summaries: Dict[str, Dict[str, Any]],
+    ) -> List[Path]:
+        """
+        Merge runs into the trend files of their models
+
+        Runs already in a file are replaced by their new scores. Only model
+        files whose content changes are rewritten.
+
+        Args:
+            entries: Index entries of the runs to add
+            summaries: eval_summary.json content keyed by run_id
+
+        Returns:
+            Paths of the rewritten model files
+        """
+        self.trends_dir.mkdir(parents=True, exist_ok=True)
+        previous = self._load_json(self.manifest_path) or {}
+        manifest = {
+            "schema_version": SCHEMA_VERSION,
+            "models": previous.get("models", {}),
+        }
+
+        new_points: Dict[str, _Points] = {}
+        for entry in entries:
+            time = parse_run_time(entry)
+            summary = summaries.get(entry.run_id)
+            if time is None or summary is None:
+                print(f"Warning: Run {entry.run_id} has no time or summary, not in trends")
+                continue
+
+            scores = {}
+            for result in summary.get("datasets", []):
+                for metric, values in result.get("metrics", {}).items():
+                    score = values.get("score")
+                    if isinstance(score, (int, float)):
+                        scores[(result["dataset"], metric)] = float(score)
+
+            model_name = entry.model.get("name", "unknown")
+            new_points.setdefault(model_name, {})[entry.run_id] = (time, scores)
+
+        written = []
+        for model_name, points in new_points.items():
+            path = self.trends_dir / model_file_name(model_name)
+            existing = self._load_json(path)
+            merged = decode_model_trends(existing) if existing else {}
+            merged.update(points)
+
+            data = encode_model_trends(model_name, merged)
+            if data != existing:
+                with self._open(path) as f:
+                    json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+                written.append(path)
+
+            times = [time for time, _ in merged.values()]
+            manifest["models"][model_name] = {
+                "path": f"{TRENDS_DIR}/{path.name}",
+                "runs": len(merged),
+                "first_time": min(times),
+                "last_time": max(times),
+            }
+
+        with self._open(self.manifest_path) as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+        return written
+
+    @staticmethod
+    def _load_json(path: Path) -> Optional[Dict[str, Any]]:
+        """Load a JSON file, or None if it is missing or unreadable"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Diff Script: Compare Deployment Manifests
+
+Lists the files added, changed and removed between the previously
+published deploy_manifest.json and the one of a new build, so a sync step
+only uploads what changed (and deletes what is gone).
+
+Usage:
+    python diff_manifest.py published/deploy_manifest.json ./web/public/data
+    python diff_manifest.py old.json new.json --format paths --only upload | \\
+        xargs -I{} aws s3 cp ./web/public/data/{} s3://bucket/data/{}
+
+A missing old manifest (first publish) counts as empty.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Import the ETL as the tools.etl package so that relative imports resolve
+# when this file is run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from tools.etl.core.manifest import DEPLOY_MANIFEST_FILENAME, diff_manifests, load_manifest
+from tools.etl.core.scheduler import format_memory_size
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Compare two deployment manifests",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    parser.add_argument(
+        "old",
+        help="Previously published deploy_manifest.json (or its output directory)",
+    )
+
+    parser.add_argument(
+        "new",
+        help="deploy_manifest.json of the new build (or its output directory)",
+    )
+
+    parser.add_argument(
+        "--format",
+        choices=["text", "json", "paths"],
+        default="text",
+        help=(
+            "text: status letter (A/M/D) and path per line with a summary; "
+            "json: {added, changed, removed}; paths: bare paths (default: text)"
+        ),
+    )
+
+    parser.add_argument(
+        "--only",
+        choices=["all", "upload", "delete"],
+        default="all",
+        help="upload: added and changed files; delete: removed files (default: all)",
+    )
+
+    return parser.parse_args()
+
+
+def manifest_path(path: str) -> Path:
+    """Path of a manifest given as a file or as an output directory"""
+    path = Path(path)
+    return path / DEPLOY_MANIFEST_FILENAME if path.is_dir() else path
+
+
+def main():
+    """Print the difference between two manifests"""
+    args = parse_args()
+
+    old_path, new_path = manifest_path(args.old), manifest_path(args.new)
+    new = load_manifest(new_path)
+    if new is None:
+        print(f"Error: Cannot read manifest {new_path}", file=sys.stderr)
+        sys.exit(1)
+    old = load_manifest(old_path)
+    if old is None:
+        if old_path.exists():
+            print(f"Error: Cannot read manifest {old_path}", file=sys.stderr)
+            sys.exit(1)
+        old = {}
+
+    diff = diff_manifests(old, new)
+    if args.only == "upload":
+        diff["removed"] = []
+    elif args.only == "delete":
+        diff["added"], diff["changed"] = [], []
+
+    if args.format == "json":
+        json.dump(diff, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return
+
+    if args.format == "paths":
+        for path in sorted(diff["added"] + diff["changed"] + diff["removed"]):
+            print(path)
+        return
+
+    for status, key in (("A", "added"), ("M", "changed"), ("D", "removed")):
+        for path in diff[key]:
+            print(f"{status} {path}")
+
+    files = new.get("files", {})
+    upload_bytes = sum(files[path]["size"] for path in diff["added"] + diff["changed"])
+    print(
+        f"\n{len(diff['added'])} added, {len(diff['changed'])} changed, "
+        f"{len(diff['removed'])} removed; "
+        f"{format_memory_size(upload_bytes)} to upload of "
+        f"{format_memory_size(new.get('total_bytes', 0))}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
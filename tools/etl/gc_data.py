@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+GC Script: Delete Unreachable Files from the Output Tree
+
+Finds the artifacts of an output tree that the current index no longer
+reaches (orphaned runs, stale sample files, index files and pages, trend and
+comparison files, temporary files) and deletes them. Safe to run while
+the tree is served or a build is writing to it.
+
+Usage:
+    python gc_data.py --out-dir ./web/public/data --dry-run
+    python gc_data.py --out-dir ./web/public/data
+    python gc_data.py --out-dir ./web/public/data --grace 0 --json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Import the ETL as the tools.etl package so that relative imports resolve
+# when this file is run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from tools.etl.core.gc import CATEGORIES, DEFAULT_GRACE_SECONDS, collect_garbage
+from tools.etl.core.scheduler import format_memory_size
+
+# Garbage paths listed in the text report
+MAX_LISTED_PATHS = 50
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Delete files the index no longer reaches from an ETL output tree",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    parser.add_argument(
+        "--out-dir",
+        type=str,
+        required=True,
+        help="Output directory of the static data (e.g., ./web/public/data)",
+    )
+
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report what would be deleted",
+    )
+
+    parser.add_argument(
+        "--grace",
+        type=float,
+        default=DEFAULT_GRACE_SECONDS,
+        help=(
+            "Delete nothing until the index has been published this many "
+            f"seconds, so readers of the previous index can finish "
+            f"(default: {DEFAULT_GRACE_SECONDS})"
+        ),
+    )
+
+    parser.add_argument(
+        "--state-dir",
+        type=str,
+        default=None,
+        help="Build state directory given to build_static_data.py, if any",
+    )
+
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the report as JSON",
+    )
+
+    return parser.parse_args()
+
+
+def print_report(report: dict):
+    """Print a garbage collection report as text"""
+    print("=" * 60)
+    print("EvalScope Viewer - Garbage Collection")
+    print("=" * 60)
+    print(f"Index:           {', '.join(report['index'])}")
+    print(f"Live runs:       {report['live_runs']}")
+    print(f"Live data:       {format_memory_size(report['live_bytes'])}")
+    print("=" * 60)
+
+    for category in CATEGORIES:
+        totals = report["categories"][category]
+        if totals["files"]:
+            print(
+                f"  {category:<20} {totals['files']:>7} file(s)  "
+                f"{format_memory_size(totals['bytes']):>10}"
+            )
+
+    for item in report["garbage"][:MAX_LISTED_PATHS]:
+        suffix = "/" if item["directory"] else ""
+        print(f"    {item['path']}{suffix}")
+    if len(report["garbage"]) > MAX_LISTED_PATHS:
+        print(f"    ... {len(report['garbage']) - MAX_LISTED_PATHS} more")
+
+    if report["kept_newer_than_index"]:
+        print(
+            f"  Kept {len(report['kept_newer_than_index'])} unreachable item(s) "
+            "newer than the index (build in progress?)"
+        )
+
+    reclaimable = format_memory_size(report["garbage_bytes"])
+    print("\n" + "=" * 60)
+    if report["dry_run"]:
+        print(f"Dry run: {report['garbage_files']} file(s), {reclaimable} reclaimable")
+    elif report["waiting_for_grace"]:
+        print(
+            f"Index published {report['index_age_seconds']:.0f}s ago, within the "
+            f"grace period: nothing deleted ({reclaimable} reclaimable)"
+        )
+    else:
+        print(f"Deleted {report['deleted']} item(s), {reclaimable} reclaimed")
+    if report["journal_records_dropped"]:
+        applied = not (report["dry_run"] or report["waiting_for_grace"])
+        action = "dropped" if applied else "to drop"
+        print(f"Journal:         {report['journal_records_dropped']} record(s) {action}")
+    print("=" * 60)
+
+
+def main():
+    """Collect garbage in an output tree"""
+    args = parse_args()
+
+    try:
+        report = collect_garbage(
+            Path(args.out_dir),
+            dry_run=args.dry_run,
+            grace_seconds=args.grace,
+            state_dir=Path(args.state_dir) if args.state_dir else None,
+        )
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Merge Script: Combine Sharded Builds into One Data Tree
+
+Each shard of a build (build_static_data.py --shard i/N) writes its runs
+and a partial index. This script combines a complete set of shard output
+directories into one published tree: it copies the run directories and
+writes the index (and, if enabled, the partitioned index, catalog and
+trends) from the merged partial indexes. Comparisons (--compare) and the
+leaderboard (--leaderboard) are computed from the sample scores the shards
+exported with --compare or --leaderboard. No raw output is read, and the
+result does not depend on the order of the shards.
+
+Usage:
+    python build_static_data.py --raw-dir /archive --out-dir /tmp/shard0 --shard 0/2
+    python build_static_data.py --raw-dir /archive --out-dir /tmp/shard1 --shard 1/2
+    python merge_shards.py --out-dir ./web/public/data /tmp/shard0 /tmp/shard1 --compare
+"""
+
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Import the ETL as the tools.etl package so that relative imports resolve
+# when this file is run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from tools.etl.core import DataBuilder
+from tools.etl.core.builder import INDEX_LAYOUTS
+from tools.etl.core.manifest import DEPLOY_MANIFEST_FILENAME
+from tools.etl.core.models import StandardIndexEntry
+from tools.etl.core.payload import (
+    DEFAULT_PAYLOAD_BUDGET,
+    PAYLOAD_REPORT_FILENAME,
+    payload_warnings,
+)
+from tools.etl.core.scheduler import format_memory_size, parse_memory_size
+from tools.etl.core.shards import COMPARISON_SCORES_DIR, merge_shard_indexes
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Merge sharded ETL outputs into one data tree",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    parser.add_argument(
+        "shard_dirs",
+        nargs="+",
+        help="Output directories of all shards",
+    )
+
+    parser.add_argument(
+        "--out-dir",
+        type=str,
+        required=True,
+        help="Output directory of the merged tree (e.g., ./web/public/data)",
+    )
+
+    parser.add_argument(
+        "--index-layout",
+        choices=INDEX_LAYOUTS,
+        default="single",
+        help="Index layout, as in build_static_data.py (default: single)",
+    )
+
+    parser.add_argument(
+        "--catalog",
+        action="store_true",
+        help="Also write catalog.sqlite",
+    )
+
+    parser.add_argument(
+        "--trends",
+        action="store_true",
+        help="Also update the per-model score trend files",
+    )
+
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Test all pairs of runs on the exported sample scores",
+    )
+
+    parser.add_argument(
+        "--leaderboard",
+        action="store_true",
+        help="Fit the Bradley–Terry leaderboard on the exported sample scores",
+    )
+
+    parser.add_argument(
+        "--leaderboard-resamples",
+        type=int,
+        default=200,
+        help="Bootstrap resamples of the leaderboard rating intervals (default: 200)",
+    )
+
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Confidence level of the leaderboard rating intervals (default: 0.95)",
+    )
+
+    parser.add_argument(
+        "--permutations",
+        type=int,
+        default=10000,
+        help="Sign flips of the paired permutation test (default: 10000)",
+    )
+
+    parser.add_argument(
+        "--payload-budget",
+        type=parse_memory_size,
+        default=DEFAULT_PAYLOAD_BUDGET,
+        help=(
+            "First-paint bytes a page route may download (default: "
+            f"{format_memory_size(DEFAULT_PAYLOAD_BUDGET)})"
+        ),
+    )
+
+    return parser.parse_args()
+
+
+def copy_run_outputs(shard_dir: Path, out_dir: Path, run_id: str):
+    """Replace out_dir/runs/<run_id> with the shard's copy"""
+    source = shard_dir / "runs" / run_id
+    target = out_dir / "runs" / run_id
+    if source.resolve() == target.resolve():
+        return
+    if target.exists():
+        shutil.rmtree(target)
+    shutil.copytree(source, target)
+
+
+def load_exported_scores(
+    shard_dirs: List[Path], entries: List[StandardIndexEntry]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the sample scores exported by the shards
+
+    Args:
+        shard_dirs: Output directories of the shards
+        entries: Merged index entries
+
+    Returns:
+        {dataset: {run_id: SampleScores}}, runs in index order as in an
+        unsharded build
+    """
+    from tools.etl.stages.sample_scores import scores_from_dict
+
+    exported: Dict[str, Dict[str, dict]] = {}
+    for shard_dir in shard_dirs:
+        for path in sorted((shard_dir / COMPARISON_SCORES_DIR).glob("*.json")):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            exported.setdefault(data["dataset"], {}).update(data["runs"])
+
+    order = [entry.run_id for entry in entries]
+    return {
+        dataset: {
+            run_id: scores_from_dict(dataset, runs[run_id])
+            for run_id in order
+            if run_id in runs
+        }
+        for dataset, runs in exported.items()
+    }
+
+
+def main():
+    """Merge shard outputs"""
+    args = parse_args()
+    shard_dirs = [Path(shard_dir) for shard_dir in args.shard_dirs]
+
+    print("=" * 60)
+    print("EvalScope Viewer - Merge Shards")
+    print("=" * 60)
+    print(f"Shards:         {len(shard_dirs)}")
+    print(f"Output directory: {args.out_dir}")
+    print("=" * 60)
+
+    try:
+        runs = merge_shard_indexes(shard_dirs)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    builder = DataBuilder(
+        args.out_dir,
+        catalog=args.catalog,
+        index_layout=args.index_layout,
+        trends=args.trends,
+        payload_budget=args.payload_budget,
+    )
+
+    # Copies keep their modification times, so the shards' content hashes
+    # stay valid for the merged deployment manifest
+    for shard_dir in shard_dirs:
+        builder.manifest.adopt(shard_dir / DEPLOY_MANIFEST_FILENAME, prefix="runs/")
+
+    print(f"\nCopying {len(runs)} run(s)...")
+    entries: List[StandardIndexEntry] = []
+    for shard_dir, _, run_entries in runs:
+        for entry in run_entries:
+            copy_run_outputs(shard_dir, builder.output_dir, entry.run_id)
+        entries.extend(run_entries)
+
+    has_scores = any(
+        (shard_dir / COMPARISON_SCORES_DIR).is_dir() for shard_dir in shard_dirs
+    )
+    if (args.compare or args.leaderboard) and not has_scores:
+        print("Warning: The shards exported no sample scores (build them with --compare)")
+    elif args.compare or args.leaderboard:
+        scores_by_dataset = load_exported_scores(shard_dirs, entries)
+
+        if args.compare:
+            from tools.etl.stages.significance import compare_dataset_scores
+
+            print("\nComparing runs...")
+            comparisons = compare_dataset_scores(scores_by_dataset, args.permutations)
+            comparison_paths = builder.build_comparisons(comparisons)
+            print(f"  ✓ Comparisons created: {len(comparison_paths)} datasets")
+
+        if args.leaderboard:
+            from tools.etl.stages.leaderboard import compute_leaderboard
+
+            print("\nFitting leaderboard...")
+            models = {e.run_id: e.model.get("name", "unknown") for e in entries}
+            leaderboard = compute_leaderboard(
+                scores_by_dataset,
+                models,
+                n_resamples=args.leaderboard_resamples,
+                confidence=args.confidence,
+            )
+            print(f"  ✓ Leaderboard created: {builder.build_leaderboard(leaderboard)}")
+
+    print("\nBuilding index...")
+    index_path = builder.build_index(entries)
+    print(f"  ✓ Index created: {index_path}")
+    print(f"  ✓ Payload report created: {builder.output_dir / PAYLOAD_REPORT_FILENAME}")
+    for warning in payload_warnings(builder.payload_report):
+        print(f"Warning: {warning}")
+
+    print("\n" + "=" * 60)
+    print(f"Merged runs:     {len(entries)}")
+    print(f"Output directory: {args.out_dir}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Report Script: First-Paint Payload of the Viewer's Page Routes
+
+Measures the bytes the run list, run page and samples page of every
+indexed run download before their first paint, and flags runs over a
+budget. Builds write the same report to payload_report.json; this script
+re-measures any output tree (e.g. a merged or garbage-collected one) and,
+with --strict, fails when a route exceeds the budget so CI can enforce it.
+
+Usage:
+    python payload_report.py --out-dir ./web/public/data
+    python payload_report.py --out-dir ./web/public/data --budget 512K --strict
+    python payload_report.py --out-dir ./web/public/data --json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Import the ETL as the tools.etl package so that relative imports resolve
+# when this file is run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from tools.etl.core.gc import load_live_runs
+from tools.etl.core.payload import (
+    DEFAULT_PAYLOAD_BUDGET,
+    ROUTE_RUN,
+    ROUTE_SAMPLES,
+    build_payload_report,
+    payload_warnings,
+)
+from tools.etl.core.scheduler import format_memory_size, parse_memory_size
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Measure the first-paint payload of the viewer's page routes",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    parser.add_argument(
+        "--out-dir",
+        type=str,
+        required=True,
+        help="Output directory of the static data (e.g., ./web/public/data)",
+    )
+
+    parser.add_argument(
+        "--budget",
+        type=parse_memory_size,
+        default=DEFAULT_PAYLOAD_BUDGET,
+        help=(
+            "First-paint bytes a page route may download, e.g. 512K "
+            f"(default: {format_memory_size(DEFAULT_PAYLOAD_BUDGET)})"
+        ),
+    )
+
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Largest runs listed in the text report (default: 10)",
+    )
+
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Exit with status 1 if any route is over the budget",
+    )
+
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the report as JSON",
+    )
+
+    return parser.parse_args()
+
+
+def print_report(report: dict, top: int):
+    """Print a payload report as text"""
+    print("=" * 60)
+    print("EvalScope Viewer - Payload Report")
+    print("=" * 60)
+    print(f"Budget:          {format_memory_size(report['budget'])}")
+    print(
+        f"Run list:        {format_memory_size(report['index']['bytes'])} "
+        f"({', '.join(report['index']['files'])})"
+    )
+    print(f"Runs:            {report['total_runs']}")
+    print("=" * 60)
+
+    print(
+        f"  {'Run':<32} {'Run page':>10} {'Samples':>10} {'Bundle':>10}  Largest dataset"
+    )
+    for run in report["runs"][:top]:
+        marker = "!" if run["over_budget"] else " "
+        bundle = run["bundle_bytes"]
+        print(
+            f"{marker} {run['run_id']:<32} "
+            f"{format_memory_size(run['routes'][ROUTE_RUN]):>10} "
+            f"{format_memory_size(run['routes'][ROUTE_SAMPLES]):>10} "
+            f"{format_memory_size(bundle) if bundle is not None else '-':>10}  "
+            f"{run['largest_dataset'] or '-'}"
+        )
+    if len(report["runs"]) > top:
+        print(f"  ... {len(report['runs']) - top} more")
+
+    print("\n" + "=" * 60)
+    warnings = payload_warnings(report)
+    for warning in warnings:
+        print(f"Over budget: {warning}")
+    if not warnings:
+        print("All routes are within the budget")
+    print("=" * 60)
+
+
+def main():
+    """Measure the page route payloads of an output tree"""
+    args = parse_args()
+
+    output_dir = Path(args.out_dir)
+    try:
+        live = load_live_runs(output_dir)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    report = build_payload_report(output_dir, live["runs"], args.budget)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print_report(report, args.top)
+
+    if args.strict and (report["index"]["over_budget"] or report["over_budget"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
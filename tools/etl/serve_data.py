@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Data Server: Serve ETL Output for EvalScope Viewer
+
+Serves the static data tree written by build_static_data.py over HTTP with
+strong ETags, range requests, precompressed variants and sendfile, for
+archives too large to copy into web/public/data. With --raw-dir it also
+answers /api/samples queries straight from raw evalscope output.
+
+Usage:
+    python serve_data.py --data-dir ./web/public/data --port 8000
+    python serve_data.py --data-dir ./web/public/data --raw-dir ./outputs
+
+Sample queries:
+    /api/samples?run=<run_id>&dataset=mmlu&offset=0&limit=50
+    /api/samples?run=<run_id>&dataset=mmlu&max_score=0.5&category=STEM
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Import the ETL as the tools.etl package so that relative imports resolve
+# when this file is run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from tools.etl.server import DataServer, SampleQueryService
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Serve ETL output data over HTTP",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    parser.add_argument(
+        "--data-dir",
+        type=str,
+        required=True,
+        help="ETL output directory (e.g., ./web/public/data)",
+    )
+
+    parser.add_argument(
+        "--raw-dir",
+        type=str,
+        default=None,
+        help="Raw evalscope output directory; enables /api/samples",
+    )
+
+    parser.add_argument(
+        "--run-pattern",
+        type=str,
+        default="*",
+        help="Glob pattern to match run directories (default: *)",
+    )
+
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Interface to bind (default: 127.0.0.1)",
+    )
+
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="Port to listen on (default: 8000)",
+    )
+
+    return parser.parse_args()
+
+
+async def serve(server: DataServer):
+    """Start the server and serve until interrupted"""
+    await server.start()
+    print(f"Serving {server.root} on http://{server.host}:{server.port}")
+    await server.serve_forever()
+
+
+def main():
+    """Run the data server"""
+    args = parse_args()
+
+    try:
+        sample_service = None
+        if args.raw_dir:
+            sample_service = SampleQueryService(args.raw_dir, args.run_pattern)
+        server = DataServer(
+            args.data_dir,
+            host=args.host,
+            port=args.port,
+            sample_service=sample_service,
+        )
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    try:
+        asyncio.run(serve(server))
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""
+Data Server Module
+
+Local HTTP server for the static data tree written by DataBuilder, for
+archives too large to copy into web/public/data, and a lazy sample query
+service over raw evaluation output.
+"""
+
+from .samples import SampleFilter, SampleQueryService
+from .static import DataServer
+
+__all__ = ["DataServer", "SampleFilter", "SampleQueryService"]
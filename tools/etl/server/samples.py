@@ -0,0 +1,405 @@
+"""
+Sample Query Service
+
+Answers sample queries ("samples of run X, dataset Y, offset/limit,
+filtered by score or category") directly from raw evalscope output,
+without exporting samples through the ETL.
+
+Prediction files are never loaded whole: each file gets a cached line
+offset index, pages of records are decoded on demand and kept in an LRU
+cache, and reviews are joined through a cached id -> offset index. All
+caches are bounded LRUs. Run directories are scanned for run ids on the
+first query and, for unknown run ids, at most once per rescan interval,
+so queries for missing runs cannot trigger a scan each.
+"""
+
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..adapters.evalscope import EvalScopeAdapter
+from ..core.jsonl import JsonlReader, decode_record
+from ..utils import scan_directories
+
+# Records decoded together and cached as one unit
+DEFAULT_PAGE_SIZE = 256
+
+# Number of decoded pages kept in memory
+DEFAULT_CACHE_PAGES = 256
+
+# Number of files whose line or id offset index is kept in memory
+DEFAULT_CACHE_FILES = 64
+
+# Minimum seconds between two scans of the raw directory for new runs
+DEFAULT_RESCAN_SECONDS = 30.0
+
+# Maximum number of samples returned by one query
+MAX_QUERY_LIMIT = 1000
+
+
+@dataclass(frozen=True)
+class SampleFilter:
+    """Filter applied to merged samples"""
+    metric: Optional[str] = None
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    category: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        """Whether the filter lets every sample through"""
+        return (
+            self.min_score is None
+            and self.max_score is None
+            and self.category is None
+        )
+
+    def matches(self, sample: Dict[str, Any]) -> bool:
+        """Whether a sample dict passes the filter"""
+        if self.category is not None:
+            metadata = sample.get("metadata", {})
+            if self.category not in (metadata.get("category"), metadata.get("subset")):
+                return False
+
+        if self.min_score is not None or self.max_score is not None:
+            scores = sample.get("scores", {})
+            metric = self.metric or next(iter(scores), None)
+            score = scores.get(metric) if metric is not None else None
+            if not isinstance(score, (int, float)):
+                return False
+            if self.min_score is not None and score < self.min_score:
+                return False
+            if self.max_score is not None and score > self.max_score:
+                return False
+
+        return True
+
+
+class LRUCache:
+    """Small thread-safe LRU cache"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key: Any, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+def _fingerprint(path: Path) -> Tuple[str, int, int]:
+    """Identify a file version by path, size and mtime"""
+    stat = path.stat()
+    return (str(path), stat.st_size, stat.st_mtime_ns)
+
+
+def build_line_offsets(path: Path) -> array:
+    """
+    Build the byte offsets of all non-empty lines of a JSONL file
+
+    Lines are located in the memory-mapped file without being decoded.
+
+    Args:
+        path: JSONL file
+
+    Returns:
+        array of line start offsets
+    """
+    with JsonlReader(path) as reader:
+        return array("q", (offset for offset, _ in reader.iter_lines()))
+
+
+def build_id_offsets(path: Path) -> Dict[Any, int]:
+    """
+    Build a record id -> byte offset index of a JSONL file
+
+    Args:
+        path: JSONL file whose records carry an "id" field
+
+    Returns:
+        Dictionary mapping record id to line start offset
+    """
+    with JsonlReader(path) as reader:
+        return {
+            decode_record(line).get("id"): offset
+            for offset, line in reader.iter_lines()
+        }
+
+
+class SampleQueryService:
+    """
+    Lazily queries samples of raw evalscope runs.
+
+    All methods are thread-safe, so queries can be answered concurrently
+    from a thread pool.
+    """
+
+    def __init__(
+        self,
+        raw_dir: str,
+        run_pattern: str = "*",
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cache_pages: int = DEFAULT_CACHE_PAGES,
+        cache_files: int = DEFAULT_CACHE_FILES,
+        rescan_seconds: float = DEFAULT_RESCAN_SECONDS,
+    ):
+        """
+        Args:
+            raw_dir: Directory containing evalscope run directories
+            run_pattern: Glob pattern to match run directories
+            page_size: Number of records decoded per page
+            cache_pages: Number of decoded pages kept in the LRU cache
+            cache_files: Number of files whose offset indexes are kept in
+                the LRU caches
+            rescan_seconds: Minimum interval between scans for new runs
+                triggered by unknown run ids
+        """
+        self.raw_dir = Path(raw_dir)
+        if not self.raw_dir.exists():
+            raise FileNotFoundError(f"Raw directory not found: {raw_dir}")
+        self.run_pattern = run_pattern
+        self.page_size = page_size
+        self.rescan_seconds = rescan_seconds
+
+        self._lock = threading.Lock()
+        self._adapters: Dict[str, EvalScopeAdapter] = {}
+        # Serializes scans; run directories already mapped are skipped
+        self._scan_lock = threading.Lock()
+        self._scanned_dirs: Set[Path] = set()
+        self._last_scan: Optional[float] = None
+        self.scans = 0
+        self._line_offsets = LRUCache(cache_files)
+        self._id_offsets = LRUCache(cache_files)
+        self._pages = LRUCache(cache_pages)
+        self._filtered = LRUCache(cache_pages)
+
+    def get_adapter(self, run_id: str) -> EvalScopeAdapter:
+        """
+        Get the adapter of a run
+
+        An unknown run_id triggers a scan for new run directories, unless
+        the last scan is less than rescan_seconds old. Concurrent lookups
+        wait for a scan in progress instead of starting their own.
+
+        Raises:
+            KeyError: If no run directory has this run_id
+        """
+        with self._lock:
+            adapter = self._adapters.get(run_id)
+        if adapter is not None:
+            return adapter
+
+        with self._scan_lock:
+            with self._lock:
+                adapter = self._adapters.get(run_id)
+            if adapter is None and self._scan_due():
+                self._scan_runs()
+                with self._lock:
+                    adapter = self._adapters.get(run_id)
+        if adapter is None:
+            raise KeyError(f"Run not found: {run_id}")
+        return adapter
+
+    def _scan_due(self) -> bool:
+        """Whether the raw directory may be scanned again"""
+        return (
+            self._last_scan is None
+            or time.monotonic() - self._last_scan >= self.rescan_seconds
+        )
+
+    def _scan_runs(self):
+        """Map the run ids of new run directories (call with the scan lock held)"""
+        self._last_scan = time.monotonic()
+        self.scans += 1
+        for run_dir in scan_directories(self.raw_dir, self.run_pattern):
+            if run_dir in self._scanned_dirs:
+                continue
+            try:
+                adapters = EvalScopeAdapter(str(run_dir)).split_models()
+                run_ids = [adapter.extract_meta().run_id for adapter in adapters]
+            except Exception as e:
+                # Retried by the next scan, e.g. once the run is complete
+                print(f"Warning: Skipping {run_dir}: {e}")
+                continue
+            self._scanned_dirs.add(run_dir)
+            with self._lock:
+                for run_id, adapter in zip(run_ids, adapters):
+                    self._adapters.setdefault(run_id, adapter)
+
+    def query(
+        self,
+        run_id: str,
+        dataset: str,
+        offset: int = 0,
+        limit: int = 50,
+        sample_filter: Optional[SampleFilter] = None,
+    ) -> Dict[str, Any]:
+        """
+        Query samples of a run's dataset
+
+        Args:
+            run_id: Run identifier
+            dataset: Dataset name
+            offset: Number of matching samples to skip
+            limit: Maximum number of samples to return
+            sample_filter: Optional score/category filter
+
+        Returns:
+            Dictionary with the matching total and the requested samples
+        """
+        adapter = self.get_adapter(run_id)
+        pred_file, review_file = self._local_sample_files(adapter, dataset)
+        offset = max(offset, 0)
+        limit = max(min(limit, MAX_QUERY_LIMIT), 0)
+
+        line_offsets = self._get_line_offsets(pred_file)
+        if sample_filter is None or sample_filter.is_empty():
+            positions = range(len(line_offsets))
+        else:
+            positions = self._get_filtered_positions(
+                pred_file, review_file, line_offsets, sample_filter
+            )
+
+        selected = positions[offset:offset + limit]
+        samples = [
+            self._get_sample(pred_file, review_file, line_offsets, position)
+            for position in selected
+        ]
+
+        return {
+            "run_id": run_id,
+            "dataset": dataset,
+            "total": len(positions),
+            "offset": offset,
+            "limit": limit,
+            "samples": samples,
+        }
+
+    @staticmethod
+    def _local_sample_files(
+        adapter: EvalScopeAdapter, dataset: str
+    ) -> Tuple[Path, Optional[Path]]:
+        """
+        Get the sample files of a dataset on the local filesystem
+
+        Raises:
+            FileNotFoundError: If there are no predictions for the dataset
+            ValueError: If the run is an archive (files cannot be indexed)
+        """
+        pred_file, review_file = adapter.find_sample_files(dataset)
+        local_pred = adapter.source.local_path(pred_file)
+        if local_pred is None:
+            raise ValueError(
+                f"Sample queries are not supported for archived runs: {adapter.raw_dir}"
+            )
+        local_review = adapter.source.local_path(review_file) if review_file else None
+        return local_pred, local_review
+
+    def _get_line_offsets(self, path: Path) -> array:
+        """Get the cached line offset index of a file"""
+        key = _fingerprint(path)
+        offsets = self._line_offsets.get(key)
+        if offsets is None:
+            offsets = build_line_offsets(path)
+            self._line_offsets.put(key, offsets)
+        return offsets
+
+    def _get_id_offsets(self, path: Path) -> Dict[Any, int]:
+        """Get the cached id offset index of a review file"""
+        key = _fingerprint(path)
+        offsets = self._id_offsets.get(key)
+        if offsets is None:
+            offsets = build_id_offsets(path)
+            self._id_offsets.put(key, offsets)
+        return offsets
+
+    def _get_sample(
+        self,
+        pred_file: Path,
+        review_file: Optional[Path],
+        line_offsets: array,
+        position: int,
+    ) -> Dict[str, Any]:
+        """Get one merged sample by line position"""
+        page = self._get_page(pred_file, review_file, line_offsets, position // self.page_size)
+        return page[position % self.page_size]
+
+    def _get_page(
+        self,
+        pred_file: Path,
+        review_file: Optional[Path],
+        line_offsets: array,
+        page_number: int,
+    ) -> List[Dict[str, Any]]:
+        """Decode one page of merged samples, through the LRU cache"""
+        review_key = _fingerprint(review_file) if review_file else None
+        key = (_fingerprint(pred_file), review_key, self.page_size, page_number)
+        page = self._pages.get(key)
+        if page is not None:
+            return page
+
+        start = page_number * self.page_size
+        end = min(start + self.page_size, len(line_offsets))
+        review_offsets = self._get_id_offsets(review_file) if review_file else {}
+
+        page = []
+        review_handle = open(review_file, "rb") if review_file else None
+        try:
+            with open(pred_file, "rb") as f:
+                for position in range(start, end):
+                    f.seek(line_offsets[position])
+                    pred = decode_record(f.readline())
+
+                    review = {}
+                    review_offset = review_offsets.get(pred.get("id", 0))
+                    if review_handle is not None and review_offset is not None:
+                        review_handle.seek(review_offset)
+                        review = decode_record(review_handle.readline())
+
+                    page.append(EvalScopeAdapter.merge_sample(pred, review).to_dict())
+        finally:
+            if review_handle is not None:
+                review_handle.close()
+
+        self._pages.put(key, page)
+        return page
+
+    def _get_filtered_positions(
+        self,
+        pred_file: Path,
+        review_file: Optional[Path],
+        line_offsets: array,
+        sample_filter: SampleFilter,
+    ) -> array:
+        """Get the cached line positions of samples matching a filter"""
+        review_key = _fingerprint(review_file) if review_file else None
+        key = (_fingerprint(pred_file), review_key, sample_filter)
+        positions = self._filtered.get(key)
+        if positions is not None:
+            return positions
+
+        positions = array("q")
+        num_pages = (len(line_offsets) + self.page_size - 1) // self.page_size
+        for page_number in range(num_pages):
+            page = self._get_page(pred_file, review_file, line_offsets, page_number)
+            base = page_number * self.page_size
+            for i, sample in enumerate(page):
+                if sample_filter.matches(sample):
+                    positions.append(base + i)
+
+        self._filtered.put(key, positions)
+        return positions
@@ -0,0 +1,559 @@
+"""
+Static Data Server
+
+Asynchronous HTTP/1.1 server for the ETL output tree. It serves the files
+DataBuilder writes with:
+- Strong ETags taken from build manifests (content hashes)
+- Single-range requests (206/416) for sample shards
+- Precompressed .br/.gz variants selected by Accept-Encoding
+- Zero-copy sendfile for large bodies
+
+With a SampleQueryService attached, /api/samples answers sample queries
+from raw evaluation output.
+"""
+
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from ..core.builder import INDEX_PARTITION_DIR
+from ..core.manifest import DEPLOY_MANIFEST_FILENAME
+from .samples import SampleFilter, SampleQueryService
+
+# Route of the sample query API
+SAMPLES_API_PATH = "/api/samples"
+
+# Bodies at least this large are sent with loop.sendfile
+SENDFILE_THRESHOLD = 64 * 1024
+
+# Precompressed variants in order of preference
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+MAX_HEADER_BYTES = 64 * 1024
+
+CONTENT_TYPES = {
+    ".json": "application/json; charset=utf-8",
+    ".jsonl": "application/x-ndjson; charset=utf-8",
+    ".sqlite": "application/vnd.sqlite3",
+}
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+_REASONS = {
+    200: "OK",
+    206: "Partial Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    416: "Range Not Satisfiable",
+    500: "Internal Server Error",
+    501: "Not Implemented",
+}
+
+
+class ETagResolver:
+    """
+    Resolves strong ETags for files of the data tree.
+
+    Hashes recorded by the build are used directly: index partition pages
+    from index/manifest.json, and every other file from
+    deploy_manifest.json as long as its size matches and it has not been
+    modified since the manifest was written. Other files are hashed once
+    and cached by (size, mtime), so a file is only re-read after it has
+    been rewritten.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Tuple[int, int, str]] = {}
+        # Parsed build manifests keyed by path, with the (size, mtime) they
+        # were read at
+        self._manifests: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+    def etag(self, rel_path: str, stat: os.stat_result) -> str:
+        """
+        Get the ETag of a file
+
+        Args:
+            rel_path: POSIX path relative to the data root
+            stat: Result of os.stat on the file
+
+        Returns:
+            Quoted strong ETag
+        """
+        digest = self._manifest_hash(rel_path, stat)
+        if digest is None:
+            digest = self._content_hash(rel_path, stat)
+        return f'"{digest[:32]}"'
+
+    def _manifest_hash(self, rel_path: str, stat: os.stat_result) -> Optional[str]:
+        """Look up the hash recorded for a file in the build manifests"""
+        pages, _ = self._load_manifest(
+            f"{INDEX_PARTITION_DIR}/manifest.json",
+            lambda manifest: {
+                p["path"]: {"sha256": p["sha256"]}
+                for p in manifest.get("partitions", [])
+                if p.get("sha256")
+            },
+        )
+        if rel_path in pages:
+            return pages[rel_path]["sha256"]
+
+        files, written_ns = self._load_manifest(
+            DEPLOY_MANIFEST_FILENAME, lambda manifest: manifest.get("files", {})
+        )
+        entry = files.get(rel_path)
+        if (
+            entry is not None
+            and entry.get("size") == stat.st_size
+            and stat.st_mtime_ns < written_ns
+        ):
+            return entry.get("sha256")
+        return None
+
+    def _load_manifest(
+        self,
+        manifest_rel_path: str,
+        extract: Callable[[Dict[str, Any]], Dict[str, Dict[str, Any]]],
+    ) -> Tuple[Dict[str, Dict[str, Any]], int]:
+        """
+        Get the file entries of a build manifest, re-read when it changes
+
+        Returns:
+            (entries keyed by relative path, manifest mtime in ns)
+        """
+        try:
+            stat = (self.root / manifest_rel_path).stat()
+        except OSError:
+            return {}, 0
+
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._manifests.get(manifest_rel_path)
+            if cached is None or cached[0] != stamp:
+                manifest_path = self.root / manifest_rel_path
+                try:
+                    with open(manifest_path, "r", encoding="utf-8") as f:
+                        manifest = json.load(f)
+                except (OSError, ValueError):
+                    manifest = {}
+                cached = (stamp, extract(manifest) if isinstance(manifest, dict) else {})
+                self._manifests[manifest_rel_path] = cached
+            return cached[1], stamp[1]
+
+    def _content_hash(self, rel_path: str, stat: os.stat_result) -> str:
+        """Hash a file's content, cached by size and mtime"""
+        with self._lock:
+            cached = self._cache.get(rel_path)
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+
+        hasher = hashlib.sha256()
+        with open(self.root / rel_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(block)
+        digest = hasher.hexdigest()
+
+        with self._lock:
+            self._cache[rel_path] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+
+class DataServer:
+    """
+    Serves an ETL output directory over HTTP.
+
+    Each connection is handled by an asyncio task; blocking work (hashing)
+    runs in the default executor, so many clients are served concurrently.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        sendfile_threshold: int = SENDFILE_THRESHOLD,
+        sample_service: Optional[SampleQueryService] = None,
+    ):
+        """
+        Args:
+            data_dir: ETL output directory (as written by DataBuilder)
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            sendfile_threshold: Minimum body size sent with sendfile
+            sample_service: Serve /api/samples from this service
+        """
+        self.root = Path(data_dir).resolve()
+        if not self.root.is_dir():
+            raise FileNotFoundError(f"Data directory not found: {data_dir}")
+        self.host = host
+        self.port = port
+        self.sendfile_threshold = sendfile_threshold
+        self.etags = ETagResolver(self.root)
+        self.sample_service = sample_service
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> asyncio.AbstractServer:
+        """
+        Start listening
+
+        Returns:
+            The asyncio server; self.port is updated with the bound port
+        """
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    async def serve_forever(self):
+        """Start the server and serve until cancelled"""
+        server = self._server or await self.start()
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """Serve requests on one connection until it is closed"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                if len(head) > MAX_HEADER_BYTES:
+                    break
+
+                request = self._parse_request(head)
+                if request is None:
+                    await self._send_error(writer, 400, keep_alive=False)
+                    break
+
+                method, target, version, headers = request
+                keep_alive = self._keep_alive(version, headers)
+                try:
+                    await self.handle_request(method, target, headers, writer, keep_alive)
+                except Exception as e:
+                    print(f"Warning: Failed to serve {target}: {e}")
+                    await self._send_error(writer, 500, keep_alive=False)
+                    break
+
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def _parse_request(self, head: bytes):
+        """Parse the request line and headers of a request"""
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            return None
+
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, sep, value = line.partition(":")
+            if not sep:
+                return None
+            headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, version, headers
+
+    def _keep_alive(self, version: str, headers: Dict[str, str]) -> bool:
+        """Whether the connection should stay open after this request"""
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    async def handle_request(
+        self,
+        method: str,
+        target: str,
+        headers: Dict[str, str],
+        writer: asyncio.StreamWriter,
+        keep_alive: bool,
+    ):
+        """
+        Handle a single request
+
+        Args:
+            method: Request method
+            target: Request target (path and query)
+            headers: Request headers (lower-case names)
+            writer: Stream to write the response to
+            keep_alive: Whether the connection stays open
+        """
+        if method not in ("GET", "HEAD"):
+            await self._send_error(writer, 405, keep_alive, {"Allow": "GET, HEAD"})
+            return
+
+        url = urlsplit(target)
+        if url.path == SAMPLES_API_PATH and self.sample_service is not None:
+            await self._serve_samples(method, url.query, writer, keep_alive)
+            return
+
+        rel_path = self._resolve_path(url.path)
+        if rel_path is None:
+            await self._send_error(writer, 404, keep_alive)
+            return
+        await self._serve_file(method, rel_path, headers, writer, keep_alive)
+
+    async def _serve_samples(
+        self,
+        method: str,
+        query_string: str,
+        writer: asyncio.StreamWriter,
+        keep_alive: bool,
+    ):
+        """
+        Answer a sample query
+
+        Query parameters: run, dataset, offset, limit, metric, min_score,
+        max_score, category. The query runs in the default executor so
+        concurrent queries do not block each other.
+        """
+        params = {k: v[-1] for k, v in parse_qs(query_string).items()}
+        try:
+            run_id = params["run"]
+            dataset = params["dataset"]
+            offset = int(params.get("offset", 0))
+            limit = int(params.get("limit", 50))
+            sample_filter = SampleFilter(
+                metric=params.get("metric"),
+                min_score=float(params["min_score"]) if "min_score" in params else None,
+                max_score=float(params["max_score"]) if "max_score" in params else None,
+                category=params.get("category"),
+            )
+        except (KeyError, ValueError):
+            await self._send_error(writer, 400, keep_alive)
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                None,
+                self.sample_service.query,
+                run_id,
+                dataset,
+                offset,
+                limit,
+                sample_filter,
+            )
+        except (KeyError, FileNotFoundError):
+            await self._send_error(writer, 404, keep_alive)
+            return
+        except ValueError:
+            # Archived runs cannot be queried lazily
+            await self._send_error(writer, 501, keep_alive)
+            return
+
+        body = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        headers = {
+            "Content-Type": CONTENT_TYPES[".json"],
+            "Content-Length": str(len(body)),
+            "Cache-Control": "no-cache",
+        }
+        await self._send_head(writer, 200, headers, keep_alive)
+        if method != "HEAD":
+            writer.write(body)
+            await writer.drain()
+
+    def _resolve_path(self, url_path: str) -> Optional[str]:
+        """
+        Map a URL path to a file under the data root
+
+        Hidden files and directories (any segment starting with ".", such
+        as build state or the garbage collector's trash) are never served.
+        """
+        rel_path = unquote(url_path).lstrip("/")
+        if not rel_path:
+            rel_path = "index.json"
+        if any(segment.startswith(".") for segment in rel_path.replace("\\", "/").split("/")):
+            return None
+        full_path = (self.root / rel_path).resolve()
+        if self.root not in full_path.parents or not full_path.is_file():
+            return None
+        return full_path.relative_to(self.root).as_posix()
+
+    async def _serve_file(
+        self,
+        method: str,
+        rel_path: str,
+        headers: Dict[str, str],
+        writer: asyncio.StreamWriter,
+        keep_alive: bool,
+    ):
+        """Serve a file, honouring conditional, range and encoding headers"""
+        loop = asyncio.get_running_loop()
+        full_path = self.root / rel_path
+        stat = full_path.stat()
+        etag = await loop.run_in_executor(None, self.etags.etag, rel_path, stat)
+
+        response_headers = {
+            "Content-Type": self._content_type(rel_path),
+            "ETag": etag,
+            "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+
+        range_header = headers.get("range")
+        if range_header and headers.get("if-range", etag) != etag:
+            range_header = None
+
+        # Byte offsets refer to the identity encoding, so only whole-file
+        # responses use the precompressed variants. The variant is picked
+        # first: If-None-Match is compared with the ETag that is sent.
+        body_path, size = full_path, stat.st_size
+        variant = None
+        if not range_header:
+            variant = self._select_variant(full_path, headers.get("accept-encoding", ""))
+        if variant is not None:
+            encoding, body_path = variant
+            response_headers["Content-Encoding"] = encoding
+            response_headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+
+        if self._etag_matches(headers.get("if-none-match"), response_headers["ETag"]):
+            response_headers.pop("Content-Encoding", None)
+            await self._send_head(writer, 304, response_headers, keep_alive)
+            return
+
+        offset, length, status = 0, size, 200
+        if variant is not None:
+            length = body_path.stat().st_size
+        elif range_header:
+            byte_range = self._parse_range(range_header, size)
+            if byte_range is None:
+                response_headers["Content-Range"] = f"bytes */{size}"
+                await self._send_error(writer, 416, keep_alive, response_headers)
+                return
+            offset, length = byte_range
+            status = 206
+            response_headers["Content-Range"] = (
+                f"bytes {offset}-{offset + length - 1}/{size}"
+            )
+
+        response_headers["Content-Length"] = str(length)
+        await self._send_head(writer, status, response_headers, keep_alive)
+        if method == "HEAD" or length == 0:
+            return
+
+        with open(body_path, "rb") as f:
+            if length >= self.sendfile_threshold:
+                await writer.drain()
+                await loop.sendfile(writer.transport, f, offset, length)
+            else:
+                f.seek(offset)
+                writer.write(f.read(length))
+                await writer.drain()
+
+    def _content_type(self, rel_path: str) -> str:
+        """Get the Content-Type of a file"""
+        suffix = Path(rel_path).suffix.lower()
+        if suffix in CONTENT_TYPES:
+            return CONTENT_TYPES[suffix]
+        return mimetypes.guess_type(rel_path)[0] or "application/octet-stream"
+
+    def _etag_matches(self, header: Optional[str], etag: str) -> bool:
+        """Whether an If-None-Match header matches the ETag"""
+        if not header:
+            return False
+        if header.strip() == "*":
+            return True
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        candidates = [c.strip().removeprefix("W/") for c in header.split(",")]
+        return etag in candidates
+
+    def _parse_range(self, header: str, size: int) -> Optional[Tuple[int, int]]:
+        """
+        Parse a single byte range
+
+        Returns:
+            (offset, length), or None if the range is not satisfiable
+        """
+        match = _RANGE_PATTERN.match(header.strip())
+        if not match or size == 0:
+            return None
+        start, end = match.groups()
+        if start:
+            offset = int(start)
+            last = min(int(end), size - 1) if end else size - 1
+        elif end:
+            # Suffix range: the last N bytes
+            offset = max(size - int(end), 0)
+            last = size - 1
+        else:
+            return None
+        if offset >= size or last < offset:
+            return None
+        return offset, last - offset + 1
+
+    def _select_variant(
+        self, full_path: Path, accept_encoding: str
+    ) -> Optional[Tuple[str, Path]]:
+        """Pick a precompressed variant accepted by the client"""
+        accepted = set()
+        for item in accept_encoding.split(","):
+            coding, _, params = item.strip().partition(";")
+            if coding and params.replace(" ", "") not in ("q=0", "q=0.0"):
+                accepted.add(coding.lower())
+
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding in accepted:
+                variant_path = full_path.with_name(full_path.name + suffix)
+                if variant_path.is_file():
+                    return encoding, variant_path
+        return None
+
+    async def _send_head(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        headers: Dict[str, str],
+        keep_alive: bool,
+    ):
+        """Write the status line and headers"""
+        lines = [f"HTTP/1.1 {status} {_REASONS[status]}"]
+        lines.append(f"Date: {formatdate(usegmt=True)}")
+        lines.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+    async def _send_error(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        keep_alive: bool,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        """Write an error response with a JSON body"""
+        body = json.dumps({"error": _REASONS[status]}).encode("utf-8")
+        error_headers = dict(headers or {})
+        error_headers.pop("Content-Encoding", None)
+        error_headers["Content-Type"] = CONTENT_TYPES[".json"]
+        error_headers["Content-Length"] = str(len(body))
+        await self._send_head(writer, status, error_headers, keep_alive)
+        writer.write(body)
+        await writer.drain()
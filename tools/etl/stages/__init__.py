@@ -0,0 +1,7 @@
+"""
+ETL Stages Module
+
+Optional analysis stages that run on top of adapter output, e.g.
+statistics computed from per-sample scores. Stages depend on NumPy and
+are only imported when enabled.
+"""
@@ -0,0 +1,239 @@
+"""
+Sample-Level Aggregates
+
+Recomputes dataset, category and subset scores from per-sample scores and
+checks them against the values in the framework's report. Reports that
+disagree with their review files are flagged with the drifting values
+instead of being trusted silently.
+
+The same group-by also produces aggregates for groupings the report does
+not have (any metadata field, e.g. "difficulty"), without re-evaluation.
+
+Grouping is vectorized: labels are factorized with np.unique and group
+sums and counts come from np.bincount.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from ..core.models import StandardBenchmarkResult
+from .sample_scores import SampleScores
+
+# Absolute score difference tolerated between report and samples
+DEFAULT_TOLERANCE = 1e-4
+
+
+def group_means(
+    values: np.ndarray, *labels: np.ndarray
+) -> Dict[Tuple[str, ...], Tuple[float, int]]:
+    """
+    Mean and count of values per group
+
+    Args:
+        values: Per-sample values (NaN values are ignored)
+        *labels: One label array per grouping key
+
+    Returns:
+        Dictionary mapping label tuples to (mean, count)
+    """
+    scored = ~np.isnan(values)
+    values = values[scored]
+    labels = [np.asarray(column)[scored].astype(str) for column in labels]
+    if len(values) == 0:
+        return {}
+
+    # Factorize every key, then combine the codes into one group code
+    uniques = []
+    codes = np.zeros(len(values), dtype=np.int64)
+    for column in labels:
+        unique, inverse = np.unique(column, return_inverse=True)
+        uniques.append(unique)
+        codes = codes * len(unique) + inverse
+
+    groups, group_codes = np.unique(codes, return_inverse=True)
+    sums = np.bincount(group_codes, weights=values)
+    counts = np.bincount(group_codes)
+
+    result = {}
+    for group, total, count in zip(groups, sums, counts):
+        key = []
+        for unique in reversed(uniques):
+            group, index = divmod(int(group), len(unique))
+            key.append(str(unique[index]))
+        result[tuple(reversed(key))] = (float(total / count), int(count))
+    return result
+
+
+def _primary_values(
+    scores: SampleScores, result: StandardBenchmarkResult
+) -> Tuple[str, np.ndarray]:
+    """Primary (first) metric of a result and its per-sample values"""
+    metric = next(iter(result.metrics), None)
+    if metric not in scores.metrics:
+        metric = next(iter(scores.metrics), None)
+    values = scores.metrics.get(metric) if metric is not None else None
+    return metric, values
+
+
+def _drift(
+    level: str, name: str, field: str, reported: float, recomputed: float
+) -> Dict[str, Any]:
+    """Describe one reported value that disagrees with the samples"""
+    return {
+        "level": level,
+        "name": name,
+        "field": field,
+        "reported": reported,
+        "recomputed": round(recomputed, 6),
+    }
+
+
+def check_aggregates(
+    scores: SampleScores,
+    result: StandardBenchmarkResult,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> Dict[str, Any]:
+    """
+    Check the reported scores of a dataset against its samples
+
+    The overall score, each category's micro and macro score and sample
+    count, and each subset's score and count are recomputed from the
+    primary metric, grouping samples by metadata.category and
+    metadata.subset.
+
+    Args:
+        scores: Per-sample scores of the dataset
+        result: Reported benchmark result
+        tolerance: Absolute score difference tolerated
+
+    Returns:
+        {"status": "ok" | "drift", "metric", "tolerance", "drift": [...]}
+    """
+    metric, values = _primary_values(scores, result)
+    check = {"status": "ok", "metric": metric, "tolerance": tolerance, "drift": []}
+    if values is None:
+        check["status"] = "unverified"
+        return check
+
+    drift = check["drift"]
+    scored = values[~np.isnan(values)]
+    if len(scored):
+        overall = float(scored.mean())
+        if abs(overall - result.overall_score) > tolerance:
+            drift.append(
+                _drift("dataset", result.dataset, "score", result.overall_score, overall)
+            )
+
+    by_category = group_means(values, scores.groups["category"])
+    by_subset = group_means(values, scores.groups["category"], scores.groups["subset"])
+
+    for category in result.categories:
+        label = "/".join(str(n) for n in category.name)
+        recomputed = by_category.get((label,))
+        if recomputed is None:
+            drift.append(_drift("category", label, "num_samples", category.num_samples, 0))
+            continue
+
+        score, count = recomputed
+        if abs(score - category.score) > tolerance:
+            drift.append(_drift("category", label, "score", category.score, score))
+        if count != category.num_samples:
+            drift.append(
+                _drift("category", label, "num_samples", category.num_samples, count)
+            )
+
+        subset_scores = []
+        for subset in category.subsets:
+            name = f"{label}/{subset.name}"
+            score, count = by_subset.get((label, subset.name), (None, 0))
+            if score is not None:
+                subset_scores.append(score)
+                if abs(score - subset.score) > tolerance:
+                    drift.append(_drift("subset", name, "score", subset.score, score))
+            if count != subset.num:
+                drift.append(_drift("subset", name, "num", subset.num, count))
+
+        if subset_scores:
+            macro = float(np.mean(subset_scores))
+            if abs(macro - category.macro_score) > tolerance:
+                drift.append(
+                    _drift("category", label, "macro_score", category.macro_score, macro)
+                )
+
+    if drift:
+        check["status"] = "drift"
+    return check
+
+
+def compute_groupings(
+    scores: SampleScores,
+    result: StandardBenchmarkResult,
+    fields: Sequence[str],
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Aggregate the primary metric by arbitrary metadata fields
+
+    Args:
+        scores: Per-sample scores, loaded with the fields as group fields
+        result: Benchmark result (selects the primary metric)
+        fields: Metadata fields to group by
+
+    Returns:
+        Dictionary mapping field name to [{"name", "score", "num"}], with
+        samples lacking the field grouped under ""
+    """
+    _, values = _primary_values(scores, result)
+    groupings = {}
+    if values is None:
+        return groupings
+
+    for field_name in fields:
+        labels = scores.groups.get(field_name)
+        if labels is None:
+            continue
+        groupings[field_name] = [
+            {"name": name, "score": round(score, 6), "num": count}
+            for (name,), (score, count) in sorted(group_means(values, labels).items())
+        ]
+    return groupings
+
+
+def verify_aggregates(
+    scores_by_dataset: Dict[str, SampleScores],
+    results: List[StandardBenchmarkResult],
+    tolerance: float = DEFAULT_TOLERANCE,
+    group_by: Sequence[str] = (),
+) -> List[StandardBenchmarkResult]:
+    """
+    Verify reported aggregates and add sample-level groupings
+
+    The check is stored in result.metadata["aggregate_check"] and the
+    groupings in result.groupings.
+
+    Args:
+        scores_by_dataset: Per-sample scores of the run's datasets
+        results: Benchmark results of the run, updated in place
+        tolerance: Absolute score difference tolerated
+        group_by: Extra metadata fields to aggregate by
+
+    Returns:
+        The updated results
+    """
+    for result in results:
+        scores = scores_by_dataset.get(result.dataset)
+        if scores is None:
+            continue
+
+        check = check_aggregates(scores, result, tolerance)
+        result.metadata["aggregate_check"] = check
+        if check["status"] == "drift":
+            print(
+                f"Warning: {result.dataset} report disagrees with its samples "
+                f"({len(check['drift'])} values)"
+            )
+
+        if group_by:
+            result.groupings.update(compute_groupings(scores, result, group_by))
+
+    return results
@@ -0,0 +1,154 @@
+"""
+Bootstrap Confidence Intervals
+
+Computes percentile bootstrap confidence intervals of dataset, category
+and subset scores from per-sample scores.
+
+Resampling is vectorized. Scores usually take few distinct values (0/1
+accuracy, graded judges), and then the resampled counts of each value
+are drawn from a multinomial distribution, one row per resample. This is
+exactly the nonparametric bootstrap of the mean, and its cost does not
+depend on the number of samples. Continuous scores fall back to index
+resampling in blocks of resamples × samples matrices.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..core.models import StandardBenchmarkResult
+from .sample_scores import SampleScores
+
+DEFAULT_RESAMPLES = 1000
+DEFAULT_CONFIDENCE = 0.95
+
+# Up to this many distinct score values the multinomial path is used
+MAX_DISCRETE_LEVELS = 256
+
+# Elements per resampling block for continuous scores (~64 MB of indices)
+BLOCK_ELEMENTS = 8 * 1024 * 1024
+
+
+def bootstrap_means(
+    values: np.ndarray, n_resamples: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Draw bootstrap resamples of the mean
+
+    Args:
+        values: Per-sample values (NaN values are ignored)
+        n_resamples: Number of resamples
+        rng: Random generator
+
+    Returns:
+        Array of n_resamples resampled means (empty if there are no values)
+    """
+    values = values[~np.isnan(values)]
+    n = len(values)
+    if n == 0:
+        return np.empty(0)
+
+    levels, counts = np.unique(values, return_counts=True)
+    if len(levels) <= MAX_DISCRETE_LEVELS:
+        draws = rng.multinomial(n, counts / n, size=n_resamples)
+        return draws @ levels / n
+
+    means = np.empty(n_resamples)
+    block = max(1, BLOCK_ELEMENTS // n)
+    for start in range(0, n_resamples, block):
+        stop = min(start + block, n_resamples)
+        indices = rng.integers(0, n, size=(stop - start, n))
+        means[start:stop] = values[indices].mean(axis=1)
+    return means
+
+
+def confidence_interval(
+    values: np.ndarray,
+    n_resamples: int = DEFAULT_RESAMPLES,
+    confidence: float = DEFAULT_CONFIDENCE,
+    rng: Optional[np.random.Generator] = None,
+) -> Optional[Dict[str, float]]:
+    """
+    Percentile bootstrap confidence interval of the mean
+
+    Args:
+        values: Per-sample values (NaN values are ignored)
+        n_resamples: Number of resamples
+        confidence: Confidence level (e.g. 0.95)
+        rng: Random generator (default: seeded with 0)
+
+    Returns:
+        {"low", "high", "confidence", "resamples"}, or None without values
+    """
+    rng = rng if rng is not None else np.random.default_rng(0)
+    means = bootstrap_means(values, n_resamples, rng)
+    if means.size == 0:
+        return None
+
+    alpha = (1.0 - confidence) / 2.0
+    low, high = np.quantile(means, [alpha, 1.0 - alpha])
+    return {
+        "low": round(float(low), 6),
+        "high": round(float(high), 6),
+        "confidence": confidence,
+        "resamples": n_resamples,
+    }
+
+
+def attach_confidence_intervals(
+    scores_by_dataset: Dict[str, SampleScores],
+    results: List[StandardBenchmarkResult],
+    n_resamples: int = DEFAULT_RESAMPLES,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int = 0,
+) -> List[StandardBenchmarkResult]:
+    """
+    Attach bootstrap confidence intervals to benchmark results
+
+    Every metric of a dataset gets an interval in
+    result.confidence_intervals. Categories and subsets get an interval of
+    the primary (first) metric, grouping samples by their
+    metadata.category and metadata.subset.
+
+    Args:
+        scores_by_dataset: Per-sample scores of the run's datasets
+        results: Benchmark results of the run, updated in place
+        n_resamples: Number of bootstrap resamples
+        confidence: Confidence level
+        seed: Seed of the random generator (fixed for reproducible output)
+
+    Returns:
+        The updated results
+    """
+    for result in results:
+        scores = scores_by_dataset.get(result.dataset)
+        if scores is None:
+            continue
+
+        rng = np.random.default_rng(seed)
+        for metric_name, values in scores.metrics.items():
+            interval = confidence_interval(values, n_resamples, confidence, rng)
+            if interval is not None:
+                result.confidence_intervals[metric_name] = interval
+
+        primary_metric = next(iter(result.metrics), None)
+        values = scores.metrics.get(primary_metric)
+        if values is None or not result.categories:
+            continue
+
+        categories = scores.groups["category"]
+        subsets = scores.groups["subset"]
+        for category in result.categories:
+            in_category = categories == "/".join(str(n) for n in category.name)
+            category.confidence_interval = confidence_interval(
+                values[in_category], n_resamples, confidence, rng
+            )
+            for subset in category.subsets:
+                subset.confidence_interval = confidence_interval(
+                    values[in_category & (subsets == subset.name)],
+                    n_resamples,
+                    confidence,
+                    rng,
+                )
+
+    return results
@@ -0,0 +1,352 @@
+"""
+Failure Clusters
+
+Groups the failed samples of a dataset (primary-metric score below a
+threshold) into near-duplicate failure patterns, so reviewers can triage
+failures by cluster instead of one by one.
+
+- Shingling: the prediction text (optionally with the input) is split
+  into overlapping byte 5-grams. The texts of all failures are
+  concatenated into one byte array and every 5-gram is hashed at once
+  with a polynomial hash; 5-grams that cross a text boundary are dropped.
+- MinHash: one-permutation hashing with densification (Li et al. 2012,
+  Shrivastava 2017). Every shingle is hashed once; the hash picks one of
+  SIGNATURE_LENGTH bins and a text's signature is the minimum per bin,
+  scattered with np.minimum.at. Empty bins borrow the next non-empty
+  bin. This costs O(shingles) instead of O(shingles × permutations) and
+  estimates Jaccard similarity like classic MinHash. Identical texts are
+  signed once.
+- LSH: signatures are cut into bands; texts whose band hashes agree on
+  any band become candidate pairs, found by sorting each band's hashes.
+  Candidates whose estimated Jaccard similarity reaches the threshold are
+  linked, and clusters are the connected components. The cost is close
+  to linear in the number of failures.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..adapters.base import BaseAdapter
+
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_SIMILARITY = 0.5
+
+SHINGLE_BYTES = 5
+SIGNATURE_LENGTH = 64
+
+# SIGNATURE_LENGTH = bands × rows; 16 bands of 4 rows make pairs with a
+# Jaccard similarity of about 0.5 candidates
+LSH_BANDS = 16
+
+MIN_CLUSTER_SIZE = 2
+MAX_CLUSTERS = 50
+MAX_EXAMPLE_IDS = 20
+PREVIEW_CHARS = 200
+
+# Members compared when choosing a cluster's representative
+MAX_MEDOID_MEMBERS = 64
+
+_HASH_BASE = np.uint64(0x100000001B3)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_SHIFT = np.uint64(32)
+
+
+def _odd_multipliers(rng: np.random.Generator, count: int) -> np.ndarray:
+    """Random odd 64-bit multipliers for multiply-shift hashing"""
+    return rng.integers(0, 2 ** 63, count, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+
+def sample_text(value: Any) -> str:
+    """Text of a sample field (non-string values as JSON)"""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+def shingle_hashes(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash the byte shingles of several texts
+
+    Every text is padded with SHINGLE_BYTES zero bytes, so it has at least
+    one shingle (an empty text has exactly one).
+
+    Args:
+        texts: Texts to shingle
+
+    Returns:
+        (hashes, starts): 64-bit shingle hashes of all texts, concatenated,
+        and the offset of each text's first shingle
+    """
+    padding = b"\0" * SHINGLE_BYTES
+    encoded = [text.encode("utf-8") + padding for text in texts]
+    lengths = np.array([len(data) for data in encoded], dtype=np.int64)
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+
+    # Polynomial hash of every SHINGLE_BYTES window of the concatenation
+    count = len(data) - SHINGLE_BYTES + 1
+    hashes = data[:count].copy()
+    for offset in range(1, SHINGLE_BYTES):
+        hashes *= _HASH_BASE
+        hashes += data[offset:offset + count]
+
+    # Keep the first len(text) + 1 windows of each padded text; the others
+    # run into the next text
+    shingles_per_text = lengths - SHINGLE_BYTES + 1
+    starts = np.cumsum(shingles_per_text) - shingles_per_text
+    text_starts = np.cumsum(lengths) - lengths
+    keep = np.arange(shingles_per_text.sum()) + np.repeat(
+        text_starts - starts, shingles_per_text
+    )
+    return hashes[keep], starts
+
+
+def minhash_signatures(
+    texts: List[str], seed: int = 0, num_bins: int = SIGNATURE_LENGTH
+) -> np.ndarray:
+    """
+    Compute one-permutation MinHash signatures of texts
+
+    Args:
+        texts: Texts to sign
+        seed: Seed of the hash function
+        num_bins: Signature length (a power of two)
+
+    Returns:
+        texts × num_bins uint64 matrix
+    """
+    hashes, starts = shingle_hashes(texts)
+    owner = np.repeat(np.arange(len(texts)), np.diff(np.append(starts, len(hashes))))
+
+    # One seeded 64-bit mix per shingle: the top bits pick the bin, the low
+    # 32 bits are the value whose per-bin minimum is kept
+    salt = np.random.default_rng(seed).integers(0, 2 ** 63, dtype=np.uint64)
+    mixed = hashes ^ salt
+    mixed ^= mixed >> np.uint64(31)
+    mixed *= _MIX
+    mixed ^= mixed >> np.uint64(29)
+    bins = (mixed >> np.uint64(64 - int(num_bins).bit_length() + 1)).astype(np.int64)
+    values = mixed & np.uint64(0xFFFFFFFF)
+
+    empty = np.iinfo(np.uint64).max
+    signatures = np.full(len(texts) * num_bins, empty, dtype=np.uint64)
+    np.minimum.at(signatures, owner * num_bins + bins, values)
+    signatures = signatures.reshape(len(texts), num_bins)
+
+    # Densify: an empty bin takes the next non-empty bin (circularly),
+    # offset by the distance so that borrowed values stay distinguishable
+    filled = np.concatenate([signatures, signatures], axis=1)
+    column = np.arange(2 * num_bins)
+    source = np.where(filled != empty, column, 2 * num_bins)
+    source = np.minimum.accumulate(source[:, ::-1], axis=1)[:, ::-1][:, :num_bins]
+    rows = np.arange(len(texts))[:, None]
+    distance = (source - column[:num_bins]).astype(np.uint64)
+    return filled[rows, source] + (distance << _SHIFT)
+
+
+def _connected_components(size: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Label every node with the smallest node of its component"""
+    labels = np.arange(size)
+    while True:
+        previous = labels
+        linked = np.minimum(labels[src], labels[dst])
+        labels = labels.copy()
+        np.minimum.at(labels, src, linked)
+        np.minimum.at(labels, dst, linked)
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def lsh_clusters(
+    signatures: np.ndarray,
+    similarity: float = DEFAULT_SIMILARITY,
+    bands: int = LSH_BANDS,
+) -> np.ndarray:
+    """
+    Cluster MinHash signatures by banded locality-sensitive hashing
+
+    Args:
+        signatures: texts × permutations signature matrix
+        similarity: Minimum estimated Jaccard similarity of linked texts
+        bands: Number of LSH bands (must divide the signature length)
+
+    Returns:
+        Cluster label of every text
+    """
+    size, length = signatures.shape
+    if size < 2:
+        return np.arange(size)
+
+    rows = length // bands
+    rng = np.random.default_rng(length)
+    multipliers = _odd_multipliers(rng, rows)
+
+    src, dst = [], []
+    for band in range(bands):
+        band_rows = signatures[:, band * rows:(band + 1) * rows]
+        keys = (band_rows * multipliers).sum(axis=1)
+        order = np.argsort(keys, kind="stable")
+        same = keys[order[1:]] == keys[order[:-1]]
+        src.append(order[:-1][same])
+        dst.append(order[1:][same])
+
+    src, dst = np.concatenate(src), np.concatenate(dst)
+    # Drop band hash collisions and pairs that only share a band by chance
+    agreement = (signatures[src] == signatures[dst]).mean(axis=1)
+    linked = agreement >= similarity
+    return _connected_components(size, src[linked], dst[linked])
+
+
+def _representative(signatures: np.ndarray) -> int:
+    """Index of the member most similar to the others (among the first few)"""
+    members = signatures[:MAX_MEDOID_MEMBERS]
+    agreement = (members[:, None, :] == members[None, :, :]).mean(axis=2)
+    return int(np.argmax(agreement.sum(axis=1)))
+
+
+def cluster_failures(
+    ids: List[Any],
+    texts: List[str],
+    scores: List[float],
+    similarity: float = DEFAULT_SIMILARITY,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Cluster failed samples by the similarity of their texts
+
+    Args:
+        ids: Sample ids of the failures
+        texts: Text of each failure
+        scores: Primary-metric score of each failure
+        similarity: Minimum estimated Jaccard similarity of linked texts
+        seed: Seed of the MinHash hash function
+
+    Returns:
+        Summary with the number of failures, the number in clusters and
+        up to MAX_CLUSTERS clusters, largest first
+    """
+    unique_texts, inverse = np.unique(np.array(texts, dtype=object), return_inverse=True)
+    unique_signatures = minhash_signatures(list(unique_texts), seed)
+    labels = lsh_clusters(unique_signatures, similarity)[inverse]
+    signatures = unique_signatures[inverse]
+
+    cluster_labels, members_of, sizes = np.unique(
+        labels, return_inverse=True, return_counts=True
+    )
+    # Largest clusters first, ties by first member
+    first_member = np.full(len(cluster_labels), len(labels))
+    np.minimum.at(first_member, members_of, np.arange(len(labels)))
+    order = np.lexsort((first_member, -sizes))
+    order = order[sizes[order] >= MIN_CLUSTER_SIZE]
+
+    score_array = np.asarray(scores, dtype=np.float64)
+    clusters = []
+    for cluster in order[:MAX_CLUSTERS]:
+        members = np.flatnonzero(members_of == cluster)
+        representative = members[_representative(signatures[members])]
+        examples = [representative] + [
+            m for m in members[:MAX_EXAMPLE_IDS] if m != representative
+        ]
+        clusters.append(
+            {
+                "size": int(len(members)),
+                "share": round(len(members) / len(labels), 4),
+                "mean_score": round(float(score_array[members].mean()), 4),
+                "representative": ids[representative],
+                "sample_ids": [ids[m] for m in examples[:MAX_EXAMPLE_IDS]],
+                "preview": texts[representative][:PREVIEW_CHARS],
+            }
+        )
+
+    return {
+        "failures": len(labels),
+        "clustered": int(sizes[sizes >= MIN_CLUSTER_SIZE].sum()),
+        "num_clusters": int((sizes >= MIN_CLUSTER_SIZE).sum()),
+        "clusters": clusters,
+    }
+
+
+def cluster_dataset_failures(
+    adapter: BaseAdapter,
+    dataset: str,
+    metric: Optional[str],
+    threshold: float = DEFAULT_THRESHOLD,
+    include_input: bool = False,
+    similarity: float = DEFAULT_SIMILARITY,
+) -> Optional[Dict[str, Any]]:
+    """
+    Cluster the failed samples of one dataset
+
+    Args:
+        adapter: Adapter of the run
+        dataset: Dataset name
+        metric: Metric deciding failure (default: each sample's first score)
+        threshold: Samples scoring below this are failures
+        include_input: Shingle the input text together with the prediction
+        similarity: Minimum estimated Jaccard similarity of linked texts
+
+    Returns:
+        Cluster summary of the dataset, or None if it has no failures
+    """
+    ids, texts, scores = [], [], []
+    for sample in adapter.iter_all_samples(dataset, adapter.parse_workers):
+        name = metric if metric is not None else next(iter(sample.scores), None)
+        score = sample.scores.get(name)
+        if not isinstance(score, (int, float)) or score >= threshold:
+            continue
+        text = sample_text(sample.prediction)
+        if include_input:
+            text = sample_text(sample.input) + "\n" + text
+        ids.append(sample.id)
+        texts.append(text)
+        scores.append(float(score))
+
+    if not ids:
+        return None
+    return {"metric": metric, **cluster_failures(ids, texts, scores, similarity)}
+
+
+def cluster_run_failures(
+    adapter: BaseAdapter,
+    metrics: Dict[str, Optional[str]],
+    threshold: float = DEFAULT_THRESHOLD,
+    include_input: bool = False,
+    similarity: float = DEFAULT_SIMILARITY,
+) -> Dict[str, Any]:
+    """
+    Cluster the failed samples of every dataset of a run
+
+    Datasets without sample files are skipped with a warning.
+
+    Args:
+        adapter: Adapter of the run
+        metrics: Primary metric of each dataset
+        threshold: Samples scoring below this are failures
+        include_input: Shingle the input text together with the prediction
+        similarity: Minimum estimated Jaccard similarity of linked texts
+
+    Returns:
+        {"threshold", "fields", "similarity", "datasets": {dataset: summary}}
+    """
+    datasets = {}
+    for dataset, metric in metrics.items():
+        try:
+            summary = cluster_dataset_failures(
+                adapter, dataset, metric, threshold, include_input, similarity
+            )
+        except FileNotFoundError as e:
+            print(f"Warning: No samples to cluster for {dataset}: {e}")
+            continue
+        if summary is not None:
+            datasets[dataset] = summary
+
+    return {
+        "threshold": threshold,
+        "fields": ["input", "prediction"] if include_input else ["prediction"],
+        "similarity": similarity,
+        "datasets": datasets,
+    }
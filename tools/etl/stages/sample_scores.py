@@ -0,0 +1,213 @@
+"""
+Sample Scores
+
+Loads the per-sample scores of a dataset into NumPy arrays, together
+with the grouping fields (category, subset, ...) from sample metadata.
+This is the common input of the statistics stages.
+
+Builds that compare runs spill each run's scores to the build state
+directory (see core/state.py) as the run is processed, so the
+comparison stages read them back instead of parsing the samples again.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+from ..adapters.base import BaseAdapter
+
+# Metadata fields loaded as grouping columns by default
+DEFAULT_GROUP_FIELDS = ("category", "subset")
+
+
+@dataclass
+class SampleScores:
+    """Per-sample scores of one dataset"""
+    dataset: str
+    ids: np.ndarray
+    metrics: Dict[str, np.ndarray]
+    groups: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def group_label(value: Any) -> str:
+    """
+    Normalize a metadata value to a group label
+
+    Lists (hierarchical category names) are joined with "/" so they match
+    StandardCategory names; missing values become "".
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "/".join(str(v) for v in value)
+    return str(value)
+
+
+def scores_to_dict(scores: SampleScores) -> Dict[str, Any]:
+    """
+    Serialize the ids and metric scores of SampleScores (not the groups)
+
+    Returns:
+        {"ids": [...], "metrics": {name: [score or None]}}
+    """
+    return {
+        "ids": [str(sample_id) for sample_id in scores.ids],
+        "metrics": {
+            name: [None if np.isnan(v) else float(v) for v in values]
+            for name, values in scores.metrics.items()
+        },
+    }
+
+
+def scores_from_dict(dataset: str, data: Dict[str, Any]) -> SampleScores:
+    """Deserialize SampleScores written by scores_to_dict"""
+    return SampleScores(
+        dataset=dataset,
+        ids=np.array(data.get("ids", []), dtype=object),
+        metrics={
+            name: np.array(
+                [np.nan if v is None else v for v in values], dtype=np.float64
+            )
+            for name, values in data.get("metrics", {}).items()
+        },
+        groups={},
+    )
+
+
+def load_sample_scores(
+    adapter: BaseAdapter,
+    dataset: str,
+    group_fields: Sequence[str] = DEFAULT_GROUP_FIELDS,
+) -> SampleScores:
+    """
+    Load the scores of every sample of a dataset
+
+    Scores are read through the adapter's iter_sample_scores, so sample
+    texts are not decoded into samples; pass no group fields when the
+    groups are not needed, so adapters can skip the prediction files.
+
+    Args:
+        adapter: Adapter of the run
+        dataset: Dataset name
+        group_fields: Metadata fields to load as grouping columns
+
+    Returns:
+        SampleScores with one float64 array per metric (NaN where a sample
+        has no score for that metric) and one label array per group field
+    """
+    ids = []
+    scores = []
+    labels = {name: [] for name in group_fields}
+    for sample_id, sample_scores, metadata in adapter.iter_sample_scores(
+        dataset, group_fields, adapter.parse_workers
+    ):
+        ids.append(sample_id)
+        scores.append(sample_scores)
+        for name in group_fields:
+            labels[name].append(group_label(metadata.get(name)))
+
+    metric_names = []
+    for sample_scores in scores:
+        for name in sample_scores:
+            if name not in metric_names:
+                metric_names.append(name)
+
+    metrics = {}
+    for name in metric_names:
+        values = [s.get(name) for s in scores]
+        metrics[name] = np.array(
+            [v if isinstance(v, (int, float)) else np.nan for v in values],
+            dtype=np.float64,
+        )
+
+    return SampleScores(
+        dataset=dataset,
+        ids=np.array(ids, dtype=object),
+        metrics=metrics,
+        groups={name: np.array(values, dtype=object) for name, values in labels.items()},
+    )
+
+
+def load_run_scores(
+    adapter: BaseAdapter,
+    datasets: Iterable[str],
+    group_fields: Sequence[str] = DEFAULT_GROUP_FIELDS,
+) -> Dict[str, SampleScores]:
+    """
+    Load the sample scores of several datasets of a run
+
+    Datasets without sample files are skipped with a warning.
+
+    Args:
+        adapter: Adapter of the run
+        datasets: Dataset names
+        group_fields: Metadata fields to load as grouping columns
+
+    Returns:
+        SampleScores keyed by dataset name
+    """
+    scores_by_dataset = {}
+    for dataset in datasets:
+        try:
+            scores_by_dataset[dataset] = load_sample_scores(
+                adapter, dataset, group_fields
+            )
+        except FileNotFoundError as e:
+            print(f"Warning: No sample scores for {dataset}: {e}")
+    return scores_by_dataset
+
+
+def spill_run_scores(
+    scores_dir: Path, run_id: str, scores_by_dataset: Dict[str, SampleScores]
+) -> Path:
+    """
+    Write the scores of a run's datasets for the comparison stages
+
+    Only ids and metric scores are kept (see scores_to_dict). The file is
+    replaced atomically, so a crash never leaves a partial one.
+
+    Args:
+        scores_dir: Directory of spilled scores
+        run_id: Run identifier
+        scores_by_dataset: SampleScores keyed by dataset name
+
+    Returns:
+        Path to the written file
+    """
+    scores_dir = Path(scores_dir)
+    scores_dir.mkdir(parents=True, exist_ok=True)
+    path = scores_dir / f"{run_id}.json"
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {dataset: scores_to_dict(scores) for dataset, scores in scores_by_dataset.items()},
+            f,
+            separators=(",", ":"),
+        )
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_spilled_scores(
+    scores_dir: Path, run_id: str
+) -> Optional[Dict[str, SampleScores]]:
+    """
+    Read the scores spilled by spill_run_scores
+
+    Returns:
+        SampleScores keyed by dataset name (without groups), or None if
+        the run has no spilled scores
+    """
+    try:
+        with open(Path(scores_dir) / f"{run_id}.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return {dataset: scores_from_dict(dataset, scores) for dataset, scores in data.items()}
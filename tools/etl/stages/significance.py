@@ -0,0 +1,379 @@
+"""
+Paired Significance Tests
+
+Compares runs that share a dataset on the samples they have in common.
+Per-sample scores are aligned by sample id into a runs × samples matrix
+(NaN where a run has no score), and every pair of runs is tested at once:
+
+- Binary scores (0/1): McNemar's test. The discordant counts of all
+  pairs come out of a single matrix product of the correct/incorrect
+  indicator matrices.
+- Other scores: paired sign-flip permutation test of the mean score
+  difference. One matrix of random signs is shared by all pairs, and the
+  permuted means are one matrix product per block of signs and block of
+  pairs, so memory stays bounded however many runs are compared.
+
+Costs are O(pairs × samples) array operations; Python loops only run over
+pairs, never over samples.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..adapters.base import BaseAdapter
+from .sample_scores import SampleScores, load_sample_scores
+
+DEFAULT_PERMUTATIONS = 10000
+
+# Elements per block of the sign-flip matrix (~64 MB as float64)
+BLOCK_ELEMENTS = 8 * 1024 * 1024
+
+# Below this many discordant samples McNemar's test uses the exact
+# binomial distribution instead of the chi-squared approximation
+MCNEMAR_EXACT_THRESHOLD = 25
+
+
+def align_scores(
+    scores_by_run: Dict[str, SampleScores], metric: str
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Align the scores of several runs by sample id
+
+    Args:
+        scores_by_run: Sample scores keyed by run id
+        metric: Metric to align
+
+    Returns:
+        (run ids, runs × samples score matrix with NaN for missing scores)
+    """
+    run_ids = list(scores_by_run)
+    if not run_ids:
+        return run_ids, np.empty((0, 0))
+
+    # Runs of the same dataset usually list the same ids in the same order
+    first = scores_by_run[run_ids[0]].ids
+    if all(
+        len(scores.ids) == len(first) and np.array_equal(scores.ids, first)
+        for scores in scores_by_run.values()
+    ):
+        matrix = np.full((len(run_ids), len(first)), np.nan)
+        for row, run_id in enumerate(run_ids):
+            values = scores_by_run[run_id].metrics.get(metric)
+            if values is not None:
+                matrix[row] = values
+        return run_ids, matrix
+
+    ids = [scores_by_run[run_id].ids.astype(str) for run_id in run_ids]
+    unique_ids, columns = np.unique(np.concatenate(ids), return_inverse=True)
+    matrix = np.full((len(run_ids), len(unique_ids)), np.nan)
+
+    start = 0
+    for row, run_id in enumerate(run_ids):
+        stop = start + len(ids[row])
+        values = scores_by_run[run_id].metrics.get(metric)
+        if values is not None:
+            matrix[row, columns[start:stop]] = values
+        start = stop
+
+    return run_ids, matrix
+
+
+def is_binary(matrix: np.ndarray) -> bool:
+    """Whether all scores of a matrix are 0 or 1"""
+    values = matrix[~np.isnan(matrix)]
+    return bool(np.all((values == 0) | (values == 1)))
+
+
+def _mcnemar_p_value(b: int, c: int) -> Tuple[float, float]:
+    """McNemar statistic and two-sided p-value of discordant counts b, c"""
+    n = b + c
+    if n == 0:
+        return 0.0, 1.0
+    if n < MCNEMAR_EXACT_THRESHOLD:
+        tail = sum(math.comb(n, k) for k in range(min(b, c) + 1)) / 2.0 ** n
+        return float(min(b, c)), min(1.0, 2.0 * tail)
+    statistic = (abs(b - c) - 1) ** 2 / n
+    return statistic, math.erfc(math.sqrt(statistic / 2.0))
+
+
+def mcnemar_matrix(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    McNemar's test between all pairs of runs with binary scores
+
+    Args:
+        matrix: runs × samples matrix of 0/1 scores (NaN for missing)
+
+    Returns:
+        Square matrices "num_samples" (shared samples), "diff" (mean score
+        of row run minus column run), "statistic" and "p_value"
+    """
+    valid = (~np.isnan(matrix)).astype(np.float64)
+    correct = np.where(valid > 0, matrix, 0.0)
+    wrong = valid - correct
+
+    shared = valid @ valid.T
+    # only_row[i, j]: samples run i got right and run j got wrong
+    only_row = correct @ wrong.T
+    only_col = only_row.T
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        diff = np.where(shared > 0, (only_row - only_col) / shared, np.nan)
+    np.fill_diagonal(diff, np.nan)
+
+    size = len(matrix)
+    statistic = np.full((size, size), np.nan)
+    p_value = np.full((size, size), np.nan)
+    for i in range(size):
+        for j in range(i + 1, size):
+            if shared[i, j] == 0:
+                continue
+            stat, p = _mcnemar_p_value(int(only_row[i, j]), int(only_col[i, j]))
+            statistic[i, j] = statistic[j, i] = stat
+            p_value[i, j] = p_value[j, i] = p
+
+    return {
+        "num_samples": shared,
+        "diff": diff,
+        "statistic": statistic,
+        "p_value": p_value,
+    }
+
+
+def _pair_differences(
+    scores: np.ndarray, valid: np.ndarray, rows: np.ndarray, cols: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Paired differences of a block of run pairs
+
+    Args:
+        scores: runs × samples scores with 0 for missing
+        valid: runs × samples mask of present scores
+        rows: First run of each pair
+        cols: Second run of each pair
+
+    Returns:
+        (pairs × samples differences, 0 where either score is missing;
+        number of shared samples per pair)
+    """
+    shared_mask = valid[rows] & valid[cols]
+    differences = scores[rows]
+    differences -= scores[cols]
+    differences[~shared_mask] = 0.0
+    return differences, shared_mask.sum(axis=1)
+
+
+def permutation_matrix(
+    matrix: np.ndarray,
+    n_permutations: int = DEFAULT_PERMUTATIONS,
+    rng: Optional[np.random.Generator] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Paired sign-flip permutation test between all pairs of runs
+
+    Args:
+        matrix: runs × samples score matrix (NaN for missing)
+        n_permutations: Number of random sign flips
+        rng: Random generator (default: seeded with 0)
+
+    Returns:
+        Square matrices "num_samples", "diff" (mean paired difference, row
+        run minus column run), "statistic" (same as diff) and "p_value"
+    """
+    rng = rng if rng is not None else np.random.default_rng(0)
+    size, num_columns = matrix.shape
+    rows, cols = np.triu_indices(size, k=1)
+
+    valid = ~np.isnan(matrix)
+    scores = np.where(valid, matrix, 0.0)
+
+    # Pairs are blocked like permutations, so no pairs × samples array is
+    # ever allocated: the differences of a block of pairs are rebuilt for
+    # each block of signs, which costs far less than the matrix product
+    block = max(1, BLOCK_ELEMENTS // max(num_columns, 1))
+    pair_block = max(1, min(block, BLOCK_ELEMENTS // min(block, max(n_permutations, 1))))
+    pair_blocks = [
+        (start, min(start + pair_block, len(rows)))
+        for start in range(0, len(rows), pair_block)
+    ]
+
+    shared = np.zeros(len(rows), dtype=np.int64)
+    observed = np.zeros(len(rows))
+    for start, stop in pair_blocks:
+        differences, shared[start:stop] = _pair_differences(
+            scores, valid, rows[start:stop], cols[start:stop]
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            observed[start:stop] = differences.sum(axis=1) / shared[start:stop]
+    threshold = np.abs(observed) - 1e-12
+
+    exceed = np.zeros(len(rows))
+    for start in range(0, n_permutations, block):
+        stop = min(start + block, n_permutations)
+        signs = rng.integers(0, 2, size=(stop - start, num_columns)) * 2.0 - 1.0
+        for pair_start, pair_stop in pair_blocks:
+            differences, pair_shared = _pair_differences(
+                scores, valid, rows[pair_start:pair_stop], cols[pair_start:pair_stop]
+            )
+            with np.errstate(invalid="ignore", divide="ignore"):
+                permuted = (signs @ differences.T) / pair_shared
+            exceed[pair_start:pair_stop] += (
+                np.abs(permuted) >= threshold[pair_start:pair_stop]
+            ).sum(axis=0)
+
+    pair_p = (exceed + 1) / (n_permutations + 1)
+
+    result = {}
+    for name, upper, lower in (
+        ("num_samples", shared, shared),
+        ("diff", observed, -observed),
+        ("statistic", observed, -observed),
+        ("p_value", pair_p, pair_p),
+    ):
+        square = np.full((size, size), np.nan)
+        square[rows, cols] = upper
+        square[cols, rows] = lower
+        result[name] = square
+
+    result["num_samples"][np.diag_indices(size)] = valid.sum(axis=1)
+    empty = result["num_samples"] == 0
+    for name in ("diff", "statistic", "p_value"):
+        result[name][empty] = np.nan
+    return result
+
+
+def _to_json_matrix(square: np.ndarray, digits: int = 6) -> List[List[Any]]:
+    """Convert a square matrix to nested lists, NaN as None"""
+    return [
+        [None if np.isnan(v) else round(float(v), digits) + 0.0 for v in row]
+        for row in square
+    ]
+
+
+def compare_scores(
+    scores_by_run: Dict[str, SampleScores],
+    n_permutations: int = DEFAULT_PERMUTATIONS,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Compare all pairs of runs on one dataset
+
+    Args:
+        scores_by_run: Sample scores of the dataset keyed by run id
+        n_permutations: Sign flips of the permutation test
+        seed: Seed of the random generator
+
+    Returns:
+        Dictionary with the run ids and, per metric, the test used and the
+        all-pairs matrices (row run vs. column run)
+    """
+    metric_names = []
+    for scores in scores_by_run.values():
+        for name in scores.metrics:
+            if name not in metric_names:
+                metric_names.append(name)
+
+    comparison = {"runs": list(scores_by_run), "metrics": {}}
+    for metric in metric_names:
+        run_ids, matrix = align_scores(scores_by_run, metric)
+        if is_binary(matrix):
+            test = "mcnemar"
+            matrices = mcnemar_matrix(matrix)
+        else:
+            test = "paired_permutation"
+            matrices = permutation_matrix(
+                matrix, n_permutations, np.random.default_rng(seed)
+            )
+
+        comparison["metrics"][metric] = {
+            "test": test,
+            "num_samples": [
+                [int(v) for v in row] for row in matrices["num_samples"]
+            ],
+            "diff": _to_json_matrix(matrices["diff"]),
+            "statistic": _to_json_matrix(matrices["statistic"]),
+            "p_value": _to_json_matrix(matrices["p_value"]),
+        }
+        if test == "paired_permutation":
+            comparison["metrics"][metric]["permutations"] = n_permutations
+
+    return comparison
+
+
+def collect_run_scores(
+    adapters: Dict[str, BaseAdapter], min_runs: int = 2
+) -> Dict[str, Dict[str, SampleScores]]:
+    """
+    Load the sample scores of every dataset shared by at least min_runs runs
+
+    Args:
+        adapters: Adapters of the runs keyed by run id
+        min_runs: Datasets with fewer runs are not loaded
+
+    Returns:
+        {dataset: {run_id: SampleScores}}, runs in adapter order
+    """
+    runs_by_dataset: Dict[str, List[str]] = {}
+    for run_id, adapter in adapters.items():
+        for dataset in adapter.extract_meta().datasets:
+            runs_by_dataset.setdefault(dataset, []).append(run_id)
+
+    scores_by_dataset = {}
+    for dataset, run_ids in sorted(runs_by_dataset.items()):
+        if len(run_ids) < min_runs:
+            continue
+
+        scores_by_run = {}
+        for run_id in run_ids:
+            try:
+                scores_by_run[run_id] = load_sample_scores(adapters[run_id], dataset)
+            except FileNotFoundError as e:
+                print(f"Warning: No sample scores for {run_id}/{dataset}: {e}")
+        scores_by_dataset[dataset] = scores_by_run
+
+    return scores_by_dataset
+
+
+def compare_dataset_scores(
+    scores_by_dataset: Dict[str, Dict[str, SampleScores]],
+    n_permutations: int = DEFAULT_PERMUTATIONS,
+    seed: int = 0,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare the runs of every dataset that has scores of at least two runs
+
+    Args:
+        scores_by_dataset: {dataset: {run_id: SampleScores}}
+        n_permutations: Sign flips of the permutation test
+        seed: Seed of the random generator
+
+    Returns:
+        Comparison (see compare_scores) keyed by dataset name
+    """
+    comparisons = {}
+    for dataset, scores_by_run in sorted(scores_by_dataset.items()):
+        if len(scores_by_run) < 2:
+            continue
+        comparison = compare_scores(scores_by_run, n_permutations, seed)
+        comparisons[dataset] = {"dataset": dataset, **comparison}
+    return comparisons
+
+
+def compare_runs(
+    adapters: Dict[str, BaseAdapter],
+    n_permutations: int = DEFAULT_PERMUTATIONS,
+    seed: int = 0,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare a group of runs on every dataset shared by at least two runs
+
+    Args:
+        adapters: Adapters of the runs keyed by run id
+        n_permutations: Sign flips of the permutation test
+        seed: Seed of the random generator
+
+    Returns:
+        Comparison (see compare_scores) keyed by dataset name
+    """
+    return compare_dataset_scores(collect_run_scores(adapters), n_permutations, seed)
@@ -0,0 +1,138 @@
+"""
+Shared fixtures of the ETL tests
+
+Run from the repository root with:
+
+    python -m pytest tools/etl/tests
+"""
+
+import asyncio
+import http.client
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pytest
+
+# Import the ETL as the tools.etl package, as the scripts do
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from tools.etl.server import DataServer  # noqa: E402
+
+# Model directory of the runs written by write_evalscope_run
+MODEL = "org_model"
+
+CONFIG = """\
+model:
+  model_id: "org/model"
+eval:
+  datasets: ["mmlu", "gsm8k"]
+"""
+
+
+def _write_jsonl(path, records):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+
+def write_evalscope_run(raw_dir: Path, name: str, samples: int = 10) -> Path:
+    """
+    Write an evalscope run with one model and two datasets
+
+    Samples with odd ids are scored 0, the first four are in category
+    STEM, and reviews are written in reverse order.
+
+    Returns:
+        The run directory
+    """
+    run_dir = raw_dir / name
+    (run_dir / "configs").mkdir(parents=True)
+    (run_dir / "configs" / "task_config_x.yaml").write_text(CONFIG)
+    for dataset in ("mmlu", "gsm8k"):
+        report = {"dataset_name": dataset, "score": 0.5, "metrics": []}
+        (run_dir / "reports" / MODEL).mkdir(parents=True, exist_ok=True)
+        (run_dir / "reports" / MODEL / f"{dataset}.json").write_text(json.dumps(report))
+        _write_jsonl(
+            run_dir / "predictions" / MODEL / f"{dataset}.jsonl",
+            [
+                {
+                    "id": i,
+                    "input": f"q{i}",
+                    "prediction": f"a{i}",
+                    "metadata": {"category": "STEM" if i < 4 else "Other"},
+                }
+                for i in range(samples)
+            ],
+        )
+        _write_jsonl(
+            run_dir / "reviews" / MODEL / f"{dataset}.jsonl",
+            [
+                {"id": i, "sample_scores": {"accuracy": float(i % 2 == 0)}}
+                for i in reversed(range(samples))
+            ],
+        )
+    return run_dir
+
+
+
+class LocalServer:
+    """DataServer running on an event loop in a background thread"""
+
+    def __init__(self, server: DataServer):
+        self.server = server
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def start(self) -> "LocalServer":
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self.loop).result(10)
+        return self
+
+    def stop(self):
+        async def close():
+            self.server._server.close()
+            await self.server._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result(10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(10)
+        self.loop.close()
+
+    def request(
+        self,
+        path: str,
+        method: str = "GET",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Send one request over a new connection"""
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.port, timeout=10)
+        try:
+            connection.request(method, path, headers=headers or {})
+            response = connection.getresponse()
+            body = response.read()
+            return response.status, {k.lower(): v for k, v in response.getheaders()}, body
+        finally:
+            connection.close()
+
+
+@pytest.fixture
+def serve():
+    """Start DataServers on free localhost ports; stopped after the test"""
+    servers = []
+
+    def start(data_dir: Path, **options) -> LocalServer:
+        server = LocalServer(DataServer(str(data_dir), port=0, **options)).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def make_run():
+    """Write evalscope runs (see write_evalscope_run)"""
+    return write_evalscope_run
@@ -0,0 +1,86 @@
+"""Tests of the sample query service and the /api/samples endpoint"""
+
+import json
+
+import pytest
+
+from tools.etl.adapters.evalscope import EvalScopeAdapter
+from tools.etl.server.samples import SampleFilter, SampleQueryService
+
+
+def _run_id(run_dir):
+    """run_id of a single-model run"""
+    return EvalScopeAdapter(str(run_dir)).split_models()[0].extract_meta().run_id
+
+
+def test_query_pages_and_joins_reviews(tmp_path, make_run):
+    run_id = _run_id(make_run(tmp_path, "20251125_100001"))
+    service = SampleQueryService(str(tmp_path), page_size=3)
+
+    result = service.query(run_id, "mmlu", offset=2, limit=5)
+    assert result["total"] == 10
+    assert [s["id"] for s in result["samples"]] == [2, 3, 4, 5, 6]
+    assert [s["scores"]["accuracy"] for s in result["samples"]] == [1.0, 0.0, 1.0, 0.0, 1.0]
+
+
+def test_query_filters(tmp_path, make_run):
+    run_id = _run_id(make_run(tmp_path, "20251125_100001"))
+    service = SampleQueryService(str(tmp_path))
+    failures = service.query(run_id, "mmlu", sample_filter=SampleFilter(max_score=0.5))
+    assert [s["id"] for s in failures["samples"]] == [1, 3, 5, 7, 9]
+
+    stem_failures = service.query(
+        run_id, "mmlu", sample_filter=SampleFilter(max_score=0.5, category="STEM")
+    )
+    assert stem_failures["total"] == 2
+
+
+def test_offset_indexes_are_bounded(tmp_path, make_run):
+    run_id = _run_id(make_run(tmp_path, "20251125_100001"))
+    service = SampleQueryService(str(tmp_path), cache_files=1)
+
+    service.query(run_id, "mmlu")
+    service.query(run_id, "gsm8k")
+    assert len(service._line_offsets._data) == 1
+    assert len(service._id_offsets._data) == 1
+    assert service.query(run_id, "mmlu")["total"] == 10
+
+
+def test_unknown_runs_are_rescanned_at_most_once_per_interval(tmp_path, make_run):
+    run_id = _run_id(make_run(tmp_path, "20251125_100001"))
+    service = SampleQueryService(str(tmp_path), rescan_seconds=3600)
+
+    service.get_adapter(run_id)
+    for _ in range(5):
+        with pytest.raises(KeyError):
+            service.get_adapter("run_missing")
+    assert service.scans == 1
+
+    new_run_id = _run_id(make_run(tmp_path, "20251125_100002"))
+    with pytest.raises(KeyError):
+        service.get_adapter(new_run_id)
+    service.rescan_seconds = 0
+    assert service.get_adapter(new_run_id) is not None
+    assert service.scans == 2
+
+
+def test_samples_api(tmp_path, serve, make_run):
+    raw_dir = tmp_path / "raw"
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    run_id = _run_id(make_run(raw_dir, "20251125_100001"))
+    server = serve(data_dir, sample_service=SampleQueryService(str(raw_dir)))
+
+    status, headers, body = server.request(
+        f"/api/samples?run={run_id}&dataset=mmlu&offset=1&limit=2&max_score=0.5"
+    )
+    assert status == 200
+    assert headers["content-type"].startswith("application/json")
+    result = json.loads(body)
+    assert result["total"] == 5
+    assert [s["id"] for s in result["samples"]] == [3, 5]
+
+    assert server.request(f"/api/samples?run={run_id}")[0] == 400
+    assert server.request(f"/api/samples?run={run_id}&dataset=mmlu&limit=x")[0] == 400
+    assert server.request("/api/samples?run=run_missing&dataset=mmlu")[0] == 404
+    assert server.request(f"/api/samples?run={run_id}&dataset=arc")[0] == 404
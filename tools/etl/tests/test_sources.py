@@ -0,0 +1,70 @@
+"""Passes over tar archives read as runs"""
+
+import pickle
+import tarfile
+
+from tools.etl.adapters import sources
+from tools.etl.adapters.evalscope import EvalScopeAdapter
+from tools.etl.adapters.sources import TarSource
+
+RUN = "20251125_100001"
+
+
+def _archive(tmp_path, make_run, monkeypatch):
+    """Archive a run whose sample files count as large members"""
+    run_dir = make_run(tmp_path / "raw", RUN)
+    path = tmp_path / f"{RUN}.tar.gz"
+    with tarfile.open(path, "w:gz") as archive:
+        archive.add(run_dir, arcname=RUN)
+    monkeypatch.setattr(sources, "TAR_MEMORY_MEMBER_BYTES", 256)
+    return path
+
+
+def _count_passes(monkeypatch):
+    passes = []
+    open_stream = TarSource._open_stream
+
+    def counting_open_stream(self):
+        passes.append(self.location)
+        return open_stream(self)
+
+    monkeypatch.setattr(TarSource, "_open_stream", counting_open_stream)
+    return passes
+
+
+def test_samples_are_read_in_one_pass_after_listing(tmp_path, make_run, monkeypatch):
+    path = _archive(tmp_path, make_run, monkeypatch)
+    passes = _count_passes(monkeypatch)
+    adapter = EvalScopeAdapter(str(path))
+
+    for result in adapter.extract_results():
+        assert len(adapter.extract_samples(result.dataset, limit=3)) == 3
+        assert len(adapter.extract_samples(result.dataset, limit=None)) == 10
+
+    assert len(passes) == 2
+    assert sorted(adapter.source._spooled) == sorted(
+        adapter.source.glob("predictions/*/*.jsonl") + adapter.source.glob("reviews/*/*.jsonl")
+    )
+    adapter.source.close()
+
+
+def test_only_the_member_asked_for_is_spooled(tmp_path, make_run, monkeypatch):
+    path = _archive(tmp_path, make_run, monkeypatch)
+    source = TarSource(path)
+
+    review = source.glob("reviews/*/gsm8k.jsonl")[0]
+    assert source.local_path(review).read_bytes() == source.read_bytes(review)
+    assert list(source._spooled) == [review]
+    source.close()
+
+
+def test_pickled_source_keeps_its_listing(tmp_path, make_run, monkeypatch):
+    path = _archive(tmp_path, make_run, monkeypatch)
+    source = TarSource(path)
+    files = source.list_files()
+
+    passes = _count_passes(monkeypatch)
+    copy = pickle.loads(pickle.dumps(source))
+    assert copy.list_files() == files
+    assert copy.read_text("configs/task_config_x.yaml")
+    assert passes == []
@@ -0,0 +1,107 @@
+"""Tests of the static data server against localhost"""
+
+import gzip
+import json
+
+
+def _write_tree(root):
+    """A small data tree with a precompressed variant"""
+    body = json.dumps({"runs": [], "total": 0, "pad": "x" * 2000}).encode("utf-8")
+    (root / "index.json").write_bytes(body)
+    (root / "index.json.gz").write_bytes(gzip.compress(body))
+    return body
+
+
+def test_identity_etag_revalidates(tmp_path, serve):
+    _write_tree(tmp_path)
+    server = serve(tmp_path)
+
+    status, headers, _ = server.request("/index.json")
+    assert status == 200
+    assert "content-encoding" not in headers
+
+    status, _, body = server.request("/index.json", headers={"If-None-Match": headers["etag"]})
+    assert status == 304
+    assert body == b""
+
+
+def test_gzip_etag_revalidates(tmp_path, serve):
+    body = _write_tree(tmp_path)
+    server = serve(tmp_path)
+
+    status, headers, compressed = server.request(
+        "/index.json", headers={"Accept-Encoding": "gzip"}
+    )
+    assert status == 200
+    assert headers["content-encoding"] == "gzip"
+    assert headers["etag"].endswith('-gzip"')
+    assert gzip.decompress(compressed) == body
+
+    status, _, _ = server.request(
+        "/index.json",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": headers["etag"]},
+    )
+    assert status == 304
+
+    # The gzip ETag does not validate the identity representation
+    status, _, _ = server.request("/index.json", headers={"If-None-Match": headers["etag"]})
+    assert status == 200
+
+
+def test_ranges(tmp_path, serve):
+    body = _write_tree(tmp_path)
+    server = serve(tmp_path)
+
+    status, headers, part = server.request("/index.json", headers={"Range": "bytes=10-19"})
+    assert status == 206
+    assert part == body[10:20]
+    assert headers["content-range"] == f"bytes 10-19/{len(body)}"
+    assert "content-encoding" not in headers
+
+    status, _, part = server.request("/index.json", headers={"Range": "bytes=-5"})
+    assert status == 206
+    assert part == body[-5:]
+
+    status, headers, _ = server.request(
+        "/index.json", headers={"Range": f"bytes={len(body)}-"}
+    )
+    assert status == 416
+    assert headers["content-range"] == f"bytes */{len(body)}"
+
+
+def test_method_not_allowed(tmp_path, serve):
+    _write_tree(tmp_path)
+    server = serve(tmp_path)
+
+    status, headers, _ = server.request("/index.json", method="POST")
+    assert status == 405
+    assert headers["allow"] == "GET, HEAD"
+
+
+def test_missing_file(tmp_path, serve):
+    _write_tree(tmp_path)
+    server = serve(tmp_path)
+
+    assert server.request("/runs/nope/meta.json")[0] == 404
+    assert server.request("/../etc/passwd")[0] == 404
+
+
+def test_hidden_paths_are_not_served(tmp_path, serve):
+    _write_tree(tmp_path)
+    (tmp_path / ".build_journal.jsonl").write_text('{"run": "/raw/run"}\n')
+    (tmp_path / ".config_cache").mkdir()
+    (tmp_path / ".config_cache" / "abc.json").write_text('{"api_key": "secret"}')
+    (tmp_path / "runs" / "r1").mkdir(parents=True)
+    (tmp_path / "runs" / "r1" / ".hidden.json").write_text("{}")
+    server = serve(tmp_path)
+
+    for path in (
+        "/.build_journal.jsonl",
+        "/%2Ebuild_journal.jsonl",
+        "/.config_cache/abc.json",
+        "/runs/r1/.hidden.json",
+        "/runs/../.build_journal.jsonl",
+    ):
+        status, _, body = server.request(path)
+        assert status == 404, path
+        assert b"secret" not in body and b"/raw/run" not in body
@@ -0,0 +1,80 @@
+"""Request counts of storage-backed runs, measured with FakeStorage"""
+
+from tools.etl.adapters.evalscope import EvalScopeAdapter
+from tools.etl.adapters.storage import FakeStorage, StorageSnapshot, StorageSource
+
+RUNS = ("20251125_100001", "20251125_100002")
+
+# Files of one run written by write_evalscope_run
+FILES_PER_RUN = 7
+
+
+def _backend(tmp_path, make_run):
+    for name in RUNS:
+        make_run(tmp_path, name)
+    return FakeStorage.from_directory(str(tmp_path))
+
+
+def _process(source):
+    """Read a run the way a build does"""
+    for adapter in EvalScopeAdapter(source).split_models():
+        adapter.extract_meta()
+        for result in adapter.extract_results():
+            samples = adapter.extract_samples(result.dataset, limit=None)
+            assert len(samples) == 10
+
+
+def test_snapshot_lists_once(tmp_path, make_run):
+    backend = _backend(tmp_path, make_run)
+
+    for source in StorageSnapshot(backend).run_sources():
+        _process(source)
+
+    assert backend.requests["list"] == 1
+    assert backend.requests["read"] == FILES_PER_RUN * len(RUNS)
+
+
+def test_without_snapshot_lists_each_run(tmp_path, make_run):
+    backend = _backend(tmp_path, make_run)
+
+    for name in RUNS:
+        _process(StorageSource(backend, f"{name}/"))
+
+    assert backend.requests["list"] == len(RUNS)
+    assert backend.requests["read"] == FILES_PER_RUN * len(RUNS)
+
+
+def test_prefetch_reads_small_files_once(tmp_path, make_run):
+    backend = _backend(tmp_path, make_run)
+    source = StorageSource(backend, f"{RUNS[0]}/")
+
+    for _ in range(3):
+        source.read_text("configs/task_config_x.yaml")
+        source.read_text("reports/org_model/mmlu.json")
+
+    assert backend.requests["list"] == 1
+    assert backend.requests["read"] == FILES_PER_RUN
+
+
+def test_without_prefetch_reads_on_every_open(tmp_path, make_run):
+    backend = _backend(tmp_path, make_run)
+    source = StorageSource(backend, f"{RUNS[0]}/", prefetch_max_bytes=0)
+
+    for _ in range(3):
+        source.read_text("configs/task_config_x.yaml")
+        source.read_text("reports/org_model/mmlu.json")
+
+    assert backend.requests["list"] == 1
+    assert backend.requests["read"] == 6
+
+
+def test_block_reads(tmp_path, make_run):
+    backend = _backend(tmp_path, make_run)
+    path = "predictions/org_model/mmlu.jsonl"
+    size = (tmp_path / RUNS[0] / path).stat().st_size
+    source = StorageSource(
+        backend, f"{RUNS[0]}/", prefetch_max_bytes=0, block_bytes=100, readahead=1
+    )
+
+    assert source.read_bytes(path) == (tmp_path / RUNS[0] / path).read_bytes()
+    assert backend.requests["read"] == -(-size // 100)
@@ -6,6 +6,9 @@ import json
 from pathlib import Path
 from typing import Any, Dict, List
 
+from .adapters.sources import is_run_archive
+from .core.jsonl import load_jsonl as _load_jsonl
+
 
 def load_json(file_path: Path) -> Dict[str, Any]:
     """
@@ -45,13 +48,7 @@ def load_jsonl(file_path: Path) -> List[Dict[str, Any]]:
     Returns:
         List of parsed JSON objects
     """
-    data = []
-    with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                data.append(json.loads(line))
-    return data
+    return _load_jsonl(file_path)
 
 
 def save_jsonl(file_path: Path, data: List[Dict[str, Any]]):
@@ -84,3 +81,22 @@ def scan_directories(base_dir: Path, pattern: str = "*") -> List[Path]:
         return []
 
     return sorted([p for p in base_dir.glob(pattern) if p.is_dir()])
+
+
+def scan_runs(base_dir: Path, pattern: str = "*") -> List[Path]:
+    """
+    Scan run directories and run archives matching a pattern
+
+    Args:
+        base_dir: Base directory to scan
+        pattern: Glob pattern (default: "*")
+
+    Returns:
+        List of matching run directory and archive paths
+    """
+    if not base_dir.exists():
+        return []
+
+    return sorted(
+        [p for p in base_dir.glob(pattern) if p.is_dir() or is_run_archive(p)]
+    )
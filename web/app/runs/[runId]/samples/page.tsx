@@ -105,7 +105,10 @@ export default async function SamplesPage({ params, searchParams }: PageProps) {
         </div>
       </div>
 
-      <SamplesTable samples={samples} />
+      <SamplesTable
+        samples={samples}
+        blobUrl={`/data/runs/${encodeURIComponent(runId)}/samples/${encodeURIComponent(dataset)}_blobs.txt`}
+      />
     </div>
   );
 }
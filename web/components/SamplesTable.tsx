@@ -4,25 +4,80 @@ import { Sample } from '@/lib/types';
 import { formatScore } from '@/lib/utils';
 import { useState, Fragment } from 'react';
 
+// Location of a long field's full text in the dataset blob file
+interface BlobRef {
+  offset: number;
+  length: number;
+  format: 'text' | 'json';
+}
+
+type SampleRow = Sample & { blobs?: Record<string, BlobRef> };
+
 interface Props {
-  samples: Sample[];
+  samples: SampleRow[];
+  // URL of the dataset's blob file (<dataset>_blobs.txt)
+  blobUrl?: string;
+}
+
+async function fetchBlob(url: string, ref: BlobRef): Promise<any> {
+  const end = ref.offset + ref.length - 1;
+  const response = await fetch(url, {
+    headers: { Range: `bytes=${ref.offset}-${end}` },
+  });
+  if (!response.ok) {
+    throw new Error(`Failed to load ${url}: ${response.status}`);
+  }
+  let buffer = await response.arrayBuffer();
+  // Servers without Range support return the whole file
+  if (response.status === 200) {
+    buffer = buffer.slice(ref.offset, end + 1);
+  }
+  const text = new TextDecoder('utf-8').decode(buffer);
+  return ref.format === 'json' ? JSON.parse(text) : text;
 }
 
-export function SamplesTable({ samples }: Props) {
+export function SamplesTable({ samples, blobUrl }: Props) {
   const [expandedSamples, setExpandedSamples] = useState<Set<string | number>>(
     new Set()
   );
+  const [fullFields, setFullFields] = useState<
+    Record<string, Record<string, any>>
+  >({});
 
-  const toggleSample = (id: string | number) => {
+  const loadBlobs = async (sample: SampleRow) => {
+    const key = String(sample.id);
+    if (!blobUrl || !sample.blobs || fullFields[key]) return;
+    try {
+      const entries = await Promise.all(
+        Object.entries(sample.blobs).map(
+          async ([field, ref]) => [field, await fetchBlob(blobUrl, ref)] as const
+        )
+      );
+      setFullFields((prev) => ({ ...prev, [key]: Object.fromEntries(entries) }));
+    } catch (e) {
+      console.error('Failed to load full sample text:', e);
+    }
+  };
+
+  const toggleSample = (sample: SampleRow) => {
+    const id = sample.id;
     const newExpanded = new Set(expandedSamples);
     if (newExpanded.has(id)) {
       newExpanded.delete(id);
     } else {
       newExpanded.add(id);
+      loadBlobs(sample);
     }
     setExpandedSamples(newExpanded);
   };
 
+  // Full value of a field once expanded, else the inline (preview) value
+  const fieldValue = (sample: SampleRow, field: keyof Sample, isExpanded: boolean) => {
+    const full = fullFields[String(sample.id)];
+    if (isExpanded && full && field in full) return full[field];
+    return sample[field];
+  };
+
   const renderValue = (value: any): string => {
     if (typeof value === 'string') return value;
     if (Array.isArray(value)) return value.join(', ');
@@ -74,9 +129,11 @@ export function SamplesTable({ samples }: Props) {
           <tbody className="bg-white divide-y divide-gray-200">
             {samples.map((sample) => {
               const isExpanded = expandedSamples.has(sample.id);
-              const inputText = renderValue(sample.input);
-              const targetText = renderValue(sample.target);
-              const predictionText = renderValue(sample.prediction);
+              const inputText = renderValue(fieldValue(sample, 'input', isExpanded));
+              const targetText = renderValue(fieldValue(sample, 'target', isExpanded));
+              const predictionText = renderValue(
+                fieldValue(sample, 'prediction', isExpanded)
+              );
 
               return (
                 <Fragment key={sample.id}>
@@ -113,7 +170,7 @@ export function SamplesTable({ samples }: Props) {
                     </td>
                     <td className="px-6 py-4 whitespace-nowrap text-sm">
                       <button
-                        onClick={() => toggleSample(sample.id)}
+                        onClick={() => toggleSample(sample)}
                         className="text-blue-600 hover:text-blue-800"
                       >
                         {isExpanded ? 'Collapse' : 'Expand'}